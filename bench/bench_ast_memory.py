@@ -0,0 +1,78 @@
+# memory held by parse trees: bytes per slotted AST node vs the same node with a per-instance __dict__, and the total
+# traced memory of parsing a large script.
+#   python -m bench.bench_ast_memory [statements]
+import sys
+import tracemalloc
+
+from bench.bench_util import init_focal, synthetic_source
+from parser.parser import Parser
+from runtime.environment import Environment
+from runtime.tree import AST, node_attributes
+
+_STATEMENTS_PER_BLOCK = 7   # trees produced by each block of the synthetic script
+
+_twins = {}     # node class -> dict-backed class of the same name
+
+
+def dict_twin(node):
+    """
+    returns a copy of node in a class without __slots__, sharing node's attribute values
+    """
+    cls = type(node)
+    twin = _twins.get(cls)
+    if twin is None:
+        twin = _twins[cls] = type(cls.__name__, (object,), {})
+    copy = twin()
+    for k, v in node_attributes(node):
+        setattr(copy, k, v)
+    return copy
+
+
+def collect_nodes(trees):
+    nodes = []
+    seen = set()
+    stack = [t.root for t in trees]
+    while stack:
+        o = stack.pop()
+        if isinstance(o, AST):
+            if id(o) in seen:
+                continue
+            seen.add(id(o))
+            nodes.append(o)
+            stack.extend([v for k, v in node_attributes(o) if k not in ['parent', 'parent_scope']])
+        elif isinstance(o, (list, tuple)):
+            stack.extend(o)
+    return nodes
+
+
+def traced(fn):
+    """
+    returns (result, bytes retained, peak bytes) of fn()
+    """
+    tracemalloc.start()
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def main(statements=100000):
+    init_focal()
+    source = synthetic_source(-(-statements // _STATEMENTS_PER_BLOCK))
+    environment, retained, peak = traced(lambda: Parser().parse(Environment(), source))
+    nodes = collect_nodes(environment.trees)
+    tree_nodes = [n for n in nodes if not hasattr(n, '__dict__')]   # Scope derived nodes (literals, blocks) keep one
+
+    slotted = sum([sys.getsizeof(n) for n in tree_nodes])
+    twins, twin_bytes, _ = traced(lambda: [dict_twin(n) for n in tree_nodes])
+    print(f'{len(environment.trees)} statements, {len(source.splitlines())} lines, {len(nodes)} nodes '
+          f'({len(tree_nodes)} slotted)\n')
+    print(f'{"":40s} {"__dict__":>11s} {"slotted":>11s}')
+    print(f'{"bytes / tree node":40s} {twin_bytes / len(tree_nodes):11.1f} {slotted / len(tree_nodes):11.1f}')
+    print(f'{"tree nodes (MB)":40s} {twin_bytes / 2**20:11.1f} {slotted / 2**20:11.1f}')
+    print(f'\nparse: {retained / 2**20:.1f}MB retained, {peak / 2**20:.1f}MB peak, '
+          f'{retained / len(environment.trees):.0f} bytes / statement')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,96 @@
+# cost of a focal function call: copying the function's scope and deep copying its defaults on every call vs frames
+# holding the arguments alone, with the defaults bound when the function is defined.
+#   python -m bench.bench_calls [n]
+import contextlib
+import io
+import sys
+from copy import copy, deepcopy
+
+from bench.bench_util import init_focal, timeit, report
+from interpreter.compiler import ClosureInterpreter
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from interpreter.vm import VirtualMachine
+from parser.parser import Parser
+from runtime.environment import Environment
+from runtime.function import Function
+from runtime.indexdict import IndexedDict
+from runtime.scope import FunctionBase, Scope
+
+_RECURSION_LIMIT = 20000    # recursive focal functions nest several python frames per call
+
+_FACTORIAL = """
+factorial(x) := {{
+    if x == 1 then
+        return 1
+    else
+        return x * factorial(x - 1)
+}}
+factorial({n})
+"""
+
+_FIBONACCI = """
+fib(n, a=0, b=1) := {{
+    if n == 0 then
+        return a
+    else
+        return fib(n - 1, b, a + b)
+}}
+fib({n})
+"""
+
+
+def _copying_frame(fn, fields, values):
+    scope = Scope(other=fn)
+    scope.code = copy(fn.code)
+    scope.update_members(IndexedDict(fields=fields, values=values))
+    return scope
+
+
+def _copied_defaults(fn):
+    defaults = deepcopy(fn.defaults)
+    return list(defaults.keys()), list(defaults.values())
+
+
+class _copying:
+    """
+    calls copy the function's scope and deep copy its defaults, as they did before frames, while active
+    """
+    def __enter__(self):
+        self.saved = Function.frame, FunctionBase.default_arguments
+        Function.frame, FunctionBase.default_arguments = _copying_frame, _copied_defaults
+        return self
+
+    def __exit__(self, *args):
+        Function.frame, FunctionBase.default_arguments = self.saved
+
+
+def parse(source):
+    return Fixups().apply(Parser().parse(Environment(), source=source))
+
+
+def run(cls, environment):
+    with contextlib.redirect_stdout(io.StringIO()):
+        cls().apply(environment)
+    return [t.values for t in environment.trees]
+
+
+def main(n=400):
+    init_focal()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), _RECURSION_LIMIT))
+    backends = [('tree', Interpreter), ('closure', ClosureInterpreter), ('vm', VirtualMachine)]
+    scripts = [('factorial', _FACTORIAL.format(n=n)), ('fib', _FIBONACCI.format(n=n))]
+    print(f'{"time per call, " + str(n) + " calls":40s} {"copying":>11s} {"frames":>11s}')
+    for name, source in scripts:
+        for label, cls in backends:
+            environment = parse(source)
+            with _copying():
+                expected = run(cls, environment)
+                copying = timeit(lambda: run(cls, environment), repeat=5)
+            assert run(cls, environment) == expected, 'frames disagree'
+            frames = timeit(lambda: run(cls, environment), repeat=5)
+            report(f'{name}, {label}', copying / n * 1e6, frames / n * 1e6, units='us')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 400)
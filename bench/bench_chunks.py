@@ -0,0 +1,71 @@
+# a flow from a quote file to write(): the file read into one DataFrame vs read(..., chunksize=n) streamed through the
+# stages a chunk at a time (runtime/chunks.py), in time and traced peak memory.
+#   python -m bench.bench_chunks [rows]
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from bench.bench_util import init_focal, timeit, report
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from parser.parser import Parser
+from runtime.environment import Environment
+
+_COLUMNS = 20
+_CHUNKSIZE = 10000
+
+_FLOW = "read('{quotes}', format='csv'{chunks}) | delta | signal | clipbefore(_, 1, 0, 1, 0) | cumsum " \
+        "| write(_, '{signals}')"
+
+
+def quotes(fname, rows):
+    """
+    writes a random walk of quotes, one column per symbol
+    """
+    steps = np.random.default_rng(1).normal(size=(rows, _COLUMNS))
+    df = pd.DataFrame(100 + steps.cumsum(axis=0), columns=[f'c{c}' for c in range(_COLUMNS)],
+                      index=pd.date_range('2000-01-01', periods=rows, freq='min'))
+    df.to_csv(fname)
+
+
+def run(source):
+    environment = Fixups().apply(Parser().parse(Environment(), source=source))
+    with contextlib.redirect_stdout(io.StringIO()):
+        Interpreter().apply(environment)
+
+
+def peak(fn):
+    tracemalloc.start()
+    fn()
+    _, traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return traced
+
+
+def main(rows=200000):
+    init_focal()
+    with tempfile.TemporaryDirectory() as directory:
+        fname = os.path.join(directory, 'quotes.csv')
+        whole, streamed = os.path.join(directory, 'whole.csv'), os.path.join(directory, 'streamed.csv')
+        quotes(fname, rows)
+        print(f'{_COLUMNS} columns x {rows} rows, {os.path.getsize(fname) / 2**20:.1f}MB, chunks of {_CHUNKSIZE}\n')
+        print(f'{"":40s} {"whole":>11s} {"streamed":>11s}')
+        in_memory = _FLOW.format(quotes=fname, chunks='', signals=whole)
+        chunked = _FLOW.format(quotes=fname, chunks=f', chunksize={_CHUNKSIZE}', signals=streamed)
+        run(in_memory)
+        run(chunked)
+        assert pd.read_csv(whole, index_col=0).equals(pd.read_csv(streamed, index_col=0)), 'streaming changes results'
+        report('delta | signal | clipbefore | cumsum', timeit(lambda: run(in_memory), repeat=1),
+               timeit(lambda: run(chunked), repeat=1))
+        report('delta | signal | clipbefore | cumsum, peak', peak(lambda: run(in_memory)) / 2**20,
+               peak(lambda: run(chunked)) / 2**20, units='M')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,71 @@
+# evaluation cost of call heavy scripts: tree walking interpreter vs the closure compiling back end.
+#   python -m bench.bench_closures [n]
+import contextlib
+import io
+import sys
+
+from bench.bench_util import init_focal, load_corpus, timeit, report
+from interpreter.compiler import ClosureInterpreter
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from parser.parser import Parser
+from runtime.environment import Environment
+
+_RECURSION_LIMIT = 20000    # recursive focal functions nest several python frames per call
+
+_SOURCE = """
+fact(x) := {{
+    if x == 1 then
+        return 1
+    else
+        return x * fact(x - 1)
+}}
+fib(n) := {{
+    if n < 2 then
+        return n
+    else
+        return fib(n - 1) + fib(n - 2)
+}}
+poly(x) := {{
+    return (x * x + 3 * x - 2) / (x + 1) * 2 - x / 7 + (x - 1) * (x + 2)
+}}
+total(n) := {{
+    if n == 0 then
+        return 0
+    else
+        return poly(n) + total(n - 1)
+}}
+fact({n})
+fib({n} - 4)
+total({n} * 10)
+"""
+
+
+def parse(source):
+    return Fixups().apply(Parser().parse(Environment(), source=source))
+
+
+def run(cls, source):
+    environment = parse(source)
+    with contextlib.redirect_stdout(io.StringIO()):
+        cls().apply(environment)
+    return [t.values for t in environment.trees]
+
+
+def main(n=18):
+    init_focal()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), _RECURSION_LIMIT))
+    source = _SOURCE.format(n=n)
+    factorial = dict(load_corpus())['factorial.f']
+    for s in [source, factorial]:
+        assert run(Interpreter, s) == run(ClosureInterpreter, s), 'back ends disagree'
+
+    print(f'{"":40s} {"tree":>11s} {"closure":>11s}')
+    report(f'fact/fib/poly ({n})', timeit(lambda: run(Interpreter, source)),
+           timeit(lambda: run(ClosureInterpreter, source)))
+    report('factorial.f', timeit(lambda: run(Interpreter, factorial)),
+           timeit(lambda: run(ClosureInterpreter, factorial)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 18)
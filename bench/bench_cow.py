@@ -0,0 +1,97 @@
+# cost of assigning a 1M cell DataFrame in a loop: deepcopy of the frame on every Scope.define vs pandas
+# Copy-on-Write shallow copies.
+#   python -m bench.bench_cow [n]
+import contextlib
+import io
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import runtime.scope
+from bench.bench_util import init_focal, timeit, report
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from parser.parser import Parser
+from runtime.dataframe import Dataset
+from runtime.environment import Environment
+from runtime.pandas import df_set_at
+from runtime.scope import Scope, _copy_value
+
+_ROWS = 1000
+_COLUMNS = 1000
+
+
+class _deepcopying:
+    """
+    Scope.define copying every value with deepcopy, as it did before Copy-on-Write, while active
+    """
+    def __enter__(self):
+        self.saved = runtime.scope._copy_value
+        runtime.scope._copy_value = runtime.scope.deepcopy
+        return self
+
+    def __exit__(self, *args):
+        runtime.scope._copy_value = self.saved
+
+
+def make_frame():
+    return pd.DataFrame(np.arange(_ROWS * _COLUMNS, dtype=np.float64).reshape(_ROWS, _COLUMNS))
+
+
+def define_loop(frame, n):
+    scope = Scope()
+    for _ in range(n):
+        scope.define(name='a', value=frame, update=True)
+    return scope
+
+
+def script_loop(frame, n):
+    environment = Environment()
+    environment.scope.define(name='frame', value=frame)
+    environment = Fixups().apply(Parser().parse(environment, source='a = frame\n' * n))
+    with contextlib.redirect_stdout(io.StringIO()):
+        Interpreter().apply(environment)
+    return environment
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def check_isolated(frame):
+    scope = define_loop(frame, 1)
+    a = scope.find('a')
+    df_set_at(a.value, 0, -1.0)
+    assert (frame.value[0] != -1.0).all(), 'write to a copy changed the original'
+    assert (a.value[0] == -1.0).all(), 'write to a copy was lost'
+    frame.value.iloc[0, 1] = -2.0
+    assert a.value.iloc[0, 1] == 1.0, 'write to the original changed a copy'
+    frame.value.iloc[0, 1] = 1.0
+
+
+def main(n=20):
+    init_focal()
+    frame = Dataset(name='frame', value=make_frame())
+    print(f'copy on write: {runtime.scope._PANDAS_COPY_ON_WRITE}, '
+          f'shared: {np.shares_memory(_copy_value(frame.value).values, frame.value.values)}')
+    check_isolated(frame)
+
+    print(f'{"":40s} {"deepcopy":>11s} {"cow":>11s}')
+    with _deepcopying():
+        define_time = timeit(lambda: define_loop(frame, n))
+        script_time = timeit(lambda: script_loop(frame, n))
+        define_peak = peak_memory(lambda: define_loop(frame, n))
+    report(f'Scope.define x{n}', define_time, timeit(lambda: define_loop(frame, n)))
+    report(f'`a = frame` x{n}', script_time, timeit(lambda: script_loop(frame, n)))
+    report('peak memory, Scope.define (MB)', define_peak / 1e6, peak_memory(lambda: define_loop(frame, n)) / 1e6,
+           units='')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,79 @@
+# strategy scripts repeating indicators across rules: every sma() and comparison evaluated where it appears vs
+# common subexpressions evaluated once per run.
+#   python -m bench.bench_cse [rules]
+import contextlib
+import io
+import sys
+
+import pandas as pd
+
+from bench.bench_util import init_focal, timeit, report
+from interpreter.compiler import ClosureInterpreter
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from interpreter.vm import VirtualMachine
+from parser.parser import Parser
+from runtime.conversion import c_unbox
+from runtime.environment import Environment
+
+_ROWS = 5000
+_COLUMNS = 20
+
+_PRELUDE = """
+close = {{{columns}}}
+close | sma(_, 10) | close.sma10
+close | sma(_, 50) | close.sma50
+"""
+
+_RULE = """
+fast{n} = sma(close, 10) > sma(close, 50)
+up{n} = close > close.sma10
+trend{n} = delta(sma(close, 50), 1) + sma(close, 10) - close
+close | sma(_, 20) | mid{n}
+"""
+
+
+def _uncached(cls):
+    class Uncached(cls):
+        """
+        the back end without common subexpressions: each expression is evaluated where it appears
+        """
+        def _init(self, environment):
+            super()._init(environment)
+            self.common = {}
+    return Uncached
+
+
+def parse(source):
+    return Fixups().apply(Parser().parse(Environment(), source=source))
+
+
+def run(cls, environment):
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter = cls()
+        interpreter.apply(environment)
+    return interpreter, [c_unbox(t.values) for t in environment.trees]
+
+
+def same(a, b):
+    return all([x.equals(y) if isinstance(x, pd.DataFrame) else x == y for x, y in zip(a, b)])
+
+
+def main(rules=20):
+    init_focal()
+    columns = ', '.join([f"'c{c}': {c * _ROWS}..{(c + 1) * _ROWS}" for c in range(_COLUMNS)])
+    environment = parse(_PRELUDE.format(columns=columns) + ''.join([_RULE.format(n=n) for n in range(rules)]))
+    print(f'{rules * 4} rules, {len(environment.trees)} statements\n')
+    print(f'{"":40s} {"each":>11s} {"once":>11s}')
+    for label, cls in [('tree', Interpreter), ('closure', ClosureInterpreter), ('vm', VirtualMachine)]:
+        _, expected = run(_uncached(cls), environment)
+        interpreter, values = run(cls, environment)
+        assert len(environment.common) > 0 and same(expected, values), 'common subexpressions change results'
+        each = timeit(lambda: run(_uncached(cls), environment))
+        once = timeit(lambda: run(cls, environment))
+        report(f'{label}', each, once)
+    print(f'\n{interpreter.common_values.stats}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,109 @@
+# binary operator dispatch: type names mapped through type2native and _type2idx into the table on every operation vs
+# the operator function cached by (op, type(l), type(r)), and binary_dispatcher's inline cache per node.
+#   python -m bench.bench_dispatch [n]
+import contextlib
+import io
+import sys
+
+import runtime.evaluate
+from bench.bench_util import init_focal, timeit, report
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from parser.parser import Parser
+from runtime import eval_assignment, eval_binops, eval_boolean
+from runtime.environment import Environment
+from runtime.evaluate import binary_dispatcher
+from runtime.token import Token
+from runtime.token_ids import TK
+from runtime.tree import BinOp
+
+_STATEMENT = "x{n} = ({n} + 1) * 2.5 - {n} / 4 + ({n} * 3 - 1) * ({n} + 7) > {n} and {n} <= 100\n"
+
+_MODULES = [(eval_binops, eval_binops.type2native, eval_binops._binops_dispatch_table, eval_binops.binops_dispatch_fn),
+            (eval_boolean, eval_boolean._type2native, eval_boolean._boolean_dispatch_table,
+             eval_boolean.boolean_dispatch_fn),
+            (eval_assignment, eval_assignment._type2native, eval_assignment._assign_dispatch_table,
+             eval_assignment.assign_dispatch_fn)]
+
+
+# eval_binops_dispatch as it was: type names through type2native and _type2idx into the table, per operation
+def _by_name(node, left, right):
+    l_value = left
+    if hasattr(left, 'value'):
+        l_value = left.value
+    l_ty = eval_binops.type2native[type(l_value).__name__]
+    r_value = right
+    if hasattr(right, 'value'):
+        r_value = right.value
+    r_ty = eval_binops.type2native[type(r_value).__name__]
+    type2idx = eval_binops._type2idx
+    if l_ty in type2idx and r_ty in type2idx:
+        return eval_binops._binops_dispatch_table[node.op][type2idx[r_ty]][type2idx[l_ty]](l_value, r_value)
+
+
+def check_tables():
+    """
+    the cached lookup picks the function the table does for every operator and pair of type names
+    """
+    count = 0
+    for module, type2native, table, dispatch_fn in _MODULES:
+        classes = [type(name, (), {}) for name in type2native]     # the tables only see the type's name
+        for op in table:
+            for l_cls in classes:
+                for r_cls in classes:
+                    l_ty, r_ty = type2native[l_cls.__name__], type2native[r_cls.__name__]
+                    expected = None
+                    if l_ty in module._type2idx and r_ty in module._type2idx:
+                        expected = table[op][module._type2idx[r_ty]][module._type2idx[l_ty]]
+                    assert dispatch_fn(op, l_cls, r_cls) is expected, f'{op.name}({l_cls.__name__}, {r_cls.__name__})'
+                    count += 1
+    return count
+
+
+def parse(source):
+    return Fixups().apply(Parser().parse(Environment(), source=source))
+
+
+def run(environment):
+    with contextlib.redirect_stdout(io.StringIO()):
+        Interpreter().apply(environment)
+    return [t.values for t in environment.trees]
+
+
+def operations(dispatch, node, pairs, n):
+    for _ in range(n):
+        for left, right in pairs:
+            dispatch(node, left, right)
+
+
+def inline(operation, pairs, n):
+    for _ in range(n):
+        for left, right in pairs:
+            operation(left, right)
+
+
+def main(n=100000):
+    init_focal()
+    print(f'{check_tables()} (operator, type, type) entries agree with the tables\n')
+    node = BinOp(left=None, op=Token(tid=TK.ADD, lex='+'), right=None)
+    operation = binary_dispatcher(node)
+    monomorphic, mixed = [(1, 2)], [(1, 2), (1.5, 2), (True, 1), (1, 2.5)]
+    print(f'{"":40s} {"by name":>11s} {"cached":>11s}')
+    for label, pairs in [('int + int', monomorphic), ('mixed +', mixed)]:
+        by_name = timeit(lambda: operations(_by_name, node, pairs, n))
+        report(f'{label} x{n * len(pairs)}', by_name, timeit(lambda: operations(eval_binops.eval_binops_dispatch,
+                                                                                node, pairs, n)))
+        report(f'{label}, inline cache', by_name, timeit(lambda: inline(operation, pairs, n)))
+
+    environment = parse(''.join([_STATEMENT.format(n=n) for n in range(2000)]))
+    dispatch = runtime.evaluate.eval_binops_dispatch
+    runtime.evaluate.eval_binops_dispatch = _by_name
+    expected = run(environment)
+    by_name = timeit(lambda: run(environment))
+    runtime.evaluate.eval_binops_dispatch = dispatch
+    assert run(environment) == expected, 'dispatch disagrees'
+    report('tree walker, 2000 statements', by_name, timeit(lambda: run(environment)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
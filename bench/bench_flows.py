@@ -0,0 +1,73 @@
+# indicator chains over a quote panel: each flow stage building its own DataFrame vs runs of stages with kernels fused
+# into one pass over the values (interpreter/flows.py), in time and traced peak memory.
+#   python -m bench.bench_flows [columns]
+import contextlib
+import io
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from bench.bench_util import init_focal, timeit, report
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from parser.parser import Parser
+from runtime.conversion import c_unbox
+from runtime.environment import Environment
+
+_ROWS = 5000
+
+_FLOWS = [
+    ('delta | signal | clipbefore', 'close | delta | signal | clipbefore(_, 1, 0, 1, 0) | signals'),
+    ('delta | signal', 'close | delta | signal | entries'),
+    ('shift | delta(2) | cumsum | clip', 'close | shift(_, 1) | delta(_, 2) | cumsum | clip(_, -5, 5) | drift'),
+]
+
+
+def panel(columns):
+    """
+    a random walk of quotes, one column per symbol
+    """
+    steps = np.random.default_rng(1).normal(size=(_ROWS, columns))
+    return pd.DataFrame(100 + steps.cumsum(axis=0), columns=[f'c{c}' for c in range(columns)],
+                        index=pd.date_range('2000-01-01', periods=_ROWS))
+
+
+def parse(source, close):
+    environment = Fixups().apply(Parser().parse(Environment(), source=source))
+    environment.globals.define(name='close', value=close)
+    return environment
+
+
+def run(environment, fuse):
+    init_focal().fuse_flows = fuse
+    with contextlib.redirect_stdout(io.StringIO()):
+        Interpreter().apply(environment)
+    return [c_unbox(t.values) for t in environment.trees]
+
+
+def peak(fn):
+    tracemalloc.start()
+    fn()
+    _, traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return traced
+
+
+def main(columns=100):
+    init_focal()
+    close = panel(columns)
+    print(f'{columns} columns x {_ROWS} rows, {close.memory_usage().sum() / 2**20:.1f}MB\n')
+    print(f'{"":40s} {"staged":>11s} {"fused":>11s}')
+    for label, flow in _FLOWS:
+        environment = parse(flow, close)
+        staged, fused = run(environment, False)[-1], run(environment, True)[-1]
+        assert isinstance(fused, pd.DataFrame) and staged.equals(fused), 'fusing changes results'
+        report(label, timeit(lambda: run(environment, False), repeat=1), timeit(lambda: run(environment, True)))
+        report(f'{label}, peak', peak(lambda: run(environment, False)) / 2**20,
+               peak(lambda: run(environment, True)) / 2**20, units='M')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,57 @@
+# evaluating scripts of derived constants: trees as parsed vs after Fixups folds operators over literals and removes
+# the branches of ifs with a literal test.
+#   python -m bench.bench_folding [statements]
+import contextlib
+import io
+import sys
+
+from bench.bench_util import init_focal, timeit, report
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from parser.parser import Parser
+from runtime.environment import Environment
+
+_STATEMENT = """
+period{n} = 365d / 12 + 1w * 2 - 1h
+size{n} = 10% * 2 * (1 + {n}) - 0.5 * 3
+limit{n} = if period{n} > 30d then 1d * 5 else 2d
+bound{n} = if 1 < 2 then 1000 * 1.5 else 0
+"""
+
+
+class _Unfolded(Fixups):
+    """
+    Fixups without folding: operators and ifs are visited but left as they are.  (no ranges or parameter lists here)
+    """
+    def process_binops(self, node, label=None):
+        return self.visit_binary_node(node, label)
+
+    def process_trinops(self, node, label=None):
+        return self.visit_trinary_node(node, label)
+
+    def process_unops(self, node, label=None):
+        node.expr = self.visit(node.expr)
+        return node
+
+
+def parse(fixups, source):
+    return fixups.apply(Parser().parse(Environment(), source=source))
+
+
+def run(environment):
+    with contextlib.redirect_stdout(io.StringIO()):
+        Interpreter().apply(environment)
+    return [t.values for t in environment.trees]
+
+
+def main(statements=500):
+    init_focal()
+    source = ''.join([_STATEMENT.format(n=n) for n in range(statements)])
+    unfolded, folded = parse(_Unfolded(), source), parse(Fixups(), source)
+    assert run(unfolded) == run(folded), 'folding changes results'
+    print(f'{"":40s} {"unfolded":>11s} {"folded":>11s}')
+    report(f'interpret, {statements * 4} statements', timeit(lambda: run(unfolded)), timeit(lambda: run(folded)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
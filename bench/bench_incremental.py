@@ -0,0 +1,124 @@
+# cost of re-parsing a long script after a one line edit: full parse vs the console's incremental front end.
+#   python -m bench.bench_incremental [blocks]
+import contextlib
+import io
+import random
+import sys
+
+from bench.bench_util import init_focal, load_corpus, synthetic_source, timeit, report
+from interpreter.fixups import Fixups
+from interpreter.incremental import IncrementalParser
+from parser.parser import Parser
+from runtime.environment import Environment
+from runtime.tree import AST, node_attributes
+
+
+def full_parse(source):
+    return Fixups().apply(Parser().parse(Environment(), source=source))
+
+
+def dump(trees):
+    out = []
+    for t in trees:
+        _dump(t.root, out, set())
+        out.append(('tree', t.start, t.length))
+    return out
+
+
+def _dump(o, out, seen):
+    if isinstance(o, AST):
+        loc = o.location
+        out.append((type(o).__name__, o.tid, o.lexeme, None if loc is None else (loc.line, loc.offset)))
+        if id(o) in seen:
+            return
+        seen.add(id(o))
+        for k, v in node_attributes(o):
+            if k not in ['parent', 'parent_scope', 'location', 'tid', 'lexeme', '_num']:  # _num: visitor sequence
+                _dump(v, out, seen)
+    elif isinstance(o, (list, tuple)):
+        for v in o:
+            _dump(v, out, seen)
+    elif isinstance(o, dict):
+        for k, v in o.items():
+            out.append(k)
+            _dump(v, out, seen)
+    elif o is None or isinstance(o, (int, float, str, bool)):
+        out.append(o)
+
+
+def edit(lines, rnd):
+    lines = list(lines)
+    i = rnd.randrange(len(lines) + 1)
+    op = rnd.randrange(4)
+    if op == 0 and i < len(lines):
+        lines[i] = f'z{i} = {i} * 2 + x'    # replace a line
+    elif op == 1 and i < len(lines):
+        del lines[i]
+    elif op == 2:
+        lines.insert(i, f'w{i} = (a + {i}) / 2; v{i} = w{i}')
+    else:
+        lines.insert(i, '')
+    return lines
+
+
+def verify(name, source, edits, rnd):
+    env = Environment()
+    inc = IncrementalParser(Parser(), Fixups())
+    try:
+        inc.parse(env, source)
+    except Exception:
+        return 0    # the script does not parse as it stands
+    lines = source.split('\n')
+    for _ in range(edits):
+        lines = edit(lines, rnd)
+        source = '\n'.join(lines)
+        try:
+            expected = dump(full_parse(source).trees)
+        except Exception:
+            continue    # the edit broke the script: the next parse is a full one
+        env = inc.parse(env, source)
+        if dump(env.trees) != expected:
+            raise AssertionError(f'{name}: incremental trees differ from a full parse')
+    return 1
+
+
+def main(blocks=500):
+    init_focal()
+    rnd = random.Random(5)
+    corpus = [(n, s) for n, s in load_corpus() if not n.endswith('.t')]
+    with contextlib.redirect_stdout(io.StringIO()):     # syntax warnings for broken edits
+        count = sum([verify(name, source, 10, rnd) for name, source in corpus])
+        verify('synthetic', synthetic_source(20), 50, rnd)
+    print(f'verified incremental parses over {count} scripts and a synthetic script\n')
+
+    source = synthetic_source(blocks)
+    lines = source.split('\n')
+    middle = len(lines) // 2
+    edited = list(lines)
+    edited[middle] = 'trade_size = position * 20%'
+    inserted = list(lines)
+    inserted.insert(middle, 'z = 1')
+    print(f'synthetic source: {len(lines)} lines\n')
+
+    def reparse(new_lines):
+        env = Environment()
+        inc = IncrementalParser(Parser(), Fixups())
+        inc.parse(env, source)
+        new_source = '\n'.join(new_lines)
+        return timeit(lambda: full_parse(new_source), repeat=1), _time_incremental(inc, env, source, new_source)
+
+    print(f'{"":40s} {"full":>11s} {"incr":>11s}')
+    report('edit one line', *reparse(edited))
+    report('insert one line', *reparse(inserted))
+
+
+def _time_incremental(inc, env, source, new_source):
+    # alternate between the two versions so that every timed parse is an incremental one
+    def toggle():
+        inc.parse(env, new_source)
+        inc.parse(env, source)
+    return timeit(toggle) / 2
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,102 @@
+# keyed access to a 10k member scope: IndexedDict scanning its key list vs its hash index.
+#   python -m bench.bench_indexdict [members]
+import sys
+
+from bench.bench_util import init_focal, timeit, report
+from runtime.indexdict import IndexedDict
+from runtime.scope import Scope
+
+
+class _ScanningDict(IndexedDict):
+    """
+    IndexedDict as it was before the hash index: keyed access searches the key list
+    """
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self._values[key]
+        if key not in self._fields:
+            raise KeyError(f'Key {key} not in dictionary')
+        return self._values[self._fields.index(key)]
+
+    def __setitem__(self, key, value):
+        if isinstance(key, int):
+            self._values[key] = value
+        elif key in self._fields:
+            self._values[self._fields.index(key)] = value
+        else:
+            self._fields.append(key)
+            self._values.append(value)
+
+    def remove(self, key):
+        if key in self._fields:
+            idx = self._fields.index(key)
+            del self._fields[idx]
+            del self._values[idx]
+
+    def slot_of(self, key):
+        return self._fields.index(key) if key in self._fields else None
+
+
+def fill(cls, names):
+    d = cls()
+    for idx, name in enumerate(names):
+        d[name] = idx
+    return d
+
+
+def lookups(d, names):
+    total = 0
+    for name in names:
+        total += d[name]
+    return total
+
+
+def contains(d, names):
+    return sum([1 for name in names if name in d])
+
+
+def updates(d, names):
+    for idx, name in enumerate(names):
+        d[name] = idx + 1
+    return d
+
+
+def finds(scope, names):
+    return [scope.find(name) for name in names]
+
+
+def removes(cls, names, count=100):
+    d = fill(cls, names)
+    for name in names[:count]:
+        d.remove(name)
+    return d
+
+
+def main(members=10000):
+    init_focal()
+    names = [f'name{n}' for n in range(members)]
+    misses = [f'missing{n}' for n in range(members)]
+    scanning, indexed = fill(_ScanningDict, names), fill(IndexedDict, names)
+    assert lookups(scanning, names) == lookups(indexed, names), 'lookups disagree'
+    assert removes(_ScanningDict, names).keys() == removes(IndexedDict, names).keys(), 'removes disagree'
+    scanning_scope = Scope(members=fill(_ScanningDict, names))
+    indexed_scope = Scope(members=fill(IndexedDict, names))
+
+    print(f'{"":40s} {"scan":>11s} {"index":>11s}')
+    report(f'build, {members} members', timeit(lambda: fill(_ScanningDict, names)),
+           timeit(lambda: fill(IndexedDict, names)))
+    report(f'd[key] x{members}', timeit(lambda: lookups(scanning, names)), timeit(lambda: lookups(indexed, names)))
+    report(f'key in d (misses) x{members}', timeit(lambda: contains(scanning, misses)),
+           timeit(lambda: contains(indexed, misses)))
+    report(f'd[key] = value x{members}', timeit(lambda: updates(scanning, names)),
+           timeit(lambda: updates(indexed, names)))
+    report(f'Scope.find x{members}', timeit(lambda: finds(scanning_scope, names)),
+           timeit(lambda: finds(indexed_scope, names)))
+    report('remove x100', timeit(lambda: removes(_ScanningDict, names)), timeit(lambda: removes(IndexedDict, names)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,43 @@
+# compares the character-at-a-time lexer with the run-scanning fast path.
+#   python -m bench.bench_lexer [blocks]
+import sys
+
+from bench.bench_util import load_corpus, synthetic_source, timeit, report
+from parser.lexer import Lexer
+
+
+def lex(source, fast):
+    return [t for t in Lexer(source, fast=fast)]
+
+
+def _token_key(t):
+    return t.id, t.t_class, t.lexeme, t.value, t.location.line, t.location.offset, t.is_reserved
+
+
+def verify(name, source):
+    slow = [_token_key(t) for t in lex(source, fast=False)]
+    fast = [_token_key(t) for t in lex(source, fast=True)]
+    if slow != fast:
+        raise AssertionError(f'{name}: token streams differ')
+    return len(slow)
+
+
+def main(blocks=2000):
+    corpus = load_corpus()
+    count = 0
+    for name, source in corpus:
+        count += verify(name, source)
+    print(f'verified {count} tokens over {len(corpus)} test cases')
+
+    source = synthetic_source(blocks)
+    ntokens = verify('synthetic', source)
+    print(f'synthetic source: {len(source.splitlines())} lines, {ntokens} tokens\n')
+
+    print(f'{"":40s} {"char":>11s} {"fast":>11s}')
+    corpus_source = '\n'.join([s for _, s in corpus])
+    report('test corpus', timeit(lambda: lex(corpus_source, False)), timeit(lambda: lex(corpus_source, True)))
+    report('synthetic', timeit(lambda: lex(source, False)), timeit(lambda: lex(source, True)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
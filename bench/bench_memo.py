@@ -0,0 +1,67 @@
+# memoized focal functions: a doubly recursive fib with and without `memo`, and keying a call by a DataFrame argument,
+# its identity and version, vs hashing its contents.
+#   python -m bench.bench_memo [n]
+import contextlib
+import io
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bench.bench_util import init_focal, timeit, report
+from interpreter.compiler import ClosureInterpreter
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from interpreter.vm import VirtualMachine
+from parser.parser import Parser
+from runtime.environment import Environment
+from runtime.memo import memo_key, touch
+
+_RECURSION_LIMIT = 20000
+
+_FIBONACCI = """
+{memo}fib(n) := {{
+    if n < 2 then
+        return n
+    else
+        return fib(n - 1) + fib(n - 2)
+}}
+fib({n})
+"""
+
+
+def parse(source):
+    return Fixups().apply(Parser().parse(Environment(), source=source))
+
+
+def run(cls, environment):
+    with contextlib.redirect_stdout(io.StringIO()):
+        cls().apply(environment)
+    return [t.values for t in environment.trees]
+
+
+def hashed_key(df):
+    return tuple(pd.util.hash_pandas_object(df).to_numpy())
+
+
+def main(n=20):
+    init_focal()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), _RECURSION_LIMIT))
+    backends = [('tree', Interpreter), ('closure', ClosureInterpreter), ('vm', VirtualMachine)]
+    print(f'{"":40s} {"plain":>11s} {"memo":>11s}')
+    for label, cls in backends:
+        plain, memo = parse(_FIBONACCI.format(memo='', n=n)), parse(_FIBONACCI.format(memo='memo ', n=n))
+        assert run(cls, plain)[-1] == run(cls, memo)[-1], 'memo disagrees'
+        report(f'fib({n}), {label}', timeit(lambda: run(cls, plain), repeat=3), timeit(lambda: run(cls, memo)))
+
+    df = pd.DataFrame(np.random.default_rng(0).random((100000, 8)))
+    key = memo_key(['df'], [df])
+    assert memo_key(['df'], [df]) == key, 'identity keys differ'
+    touch(df)
+    assert memo_key(['df'], [df]) != key, 'a written DataFrame keeps its key'
+    print(f'\n{"key, " + str(df.shape) + " DataFrame":40s} {"hash":>11s} {"identity":>11s}')
+    report('memo_key', timeit(lambda: hashed_key(df)), timeit(lambda: memo_key(['df'], [df])))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,56 @@
+# start-up cost of a script: lex + parse + fixups vs loading the trees from the on-disk parse cache.
+#   python -m bench.bench_parsecache [blocks]
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+from bench.bench_util import init_focal, load_corpus, synthetic_source, timeit, report
+from interpreter.fixups import Fixups
+from interpreter.parsecache import ParseCache
+from parser.parser import Parser
+from runtime.environment import Environment
+
+
+def parse(environment, source):
+    return Fixups().apply(Parser().parse(environment, source=source))
+
+
+def main(blocks=200):
+    init_focal()
+    corpus = []
+    with contextlib.redirect_stdout(io.StringIO()):     # syntax warnings
+        for name, source in load_corpus():
+            try:
+                parse(Environment(), source)
+                corpus.append(source)
+            except Exception:
+                pass
+    synthetic = synthetic_source(blocks)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ParseCache(directory)
+        for source in corpus + [synthetic]:
+            cache.parse(Environment(), source, 'fixups', parse)
+        size = sum([os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory)])
+        print(f'{len(corpus)} test scripts and a synthetic script of {len(synthetic.splitlines())} lines: '
+              f'{size // 1024}K cached\n')
+
+        def run_corpus(fn):
+            with contextlib.redirect_stdout(io.StringIO()):
+                for source in corpus:
+                    fn(Environment(), source)
+
+        def cached(environment, source):
+            return cache.parse(environment, source, 'fixups', parse)
+
+        print(f'{"":40s} {"parse":>11s} {"cached":>11s}')
+        report('test scripts', timeit(lambda: run_corpus(parse)), timeit(lambda: run_corpus(cached)))
+        report('synthetic script', timeit(lambda: parse(Environment(), synthetic)),
+               timeit(lambda: cached(Environment(), synthetic)))
+        assert cache.misses == len(corpus) + 1
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
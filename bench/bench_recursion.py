@@ -0,0 +1,73 @@
+# recursive focal functions at large depths: the closure back end, recursing on the python stack, vs the bytecode vm's
+# frame stack and tail calls.  the vm runs the deepest cases under python's default recursion limit.
+#   python -m bench.bench_recursion [depth]
+import contextlib
+import io
+import sys
+
+from bench.bench_util import init_focal, timeit, report
+from interpreter.compiler import ClosureInterpreter
+from interpreter.fixups import Fixups
+from interpreter.vm import VirtualMachine
+from parser.parser import Parser
+from runtime.environment import Environment
+
+_RECURSION_LIMIT = 50000    # python frames for the closure back end, which takes several per focal call
+_CLOSURE_DEPTH = 4000       # deepest closure back end run under _RECURSION_LIMIT, with room to spare
+
+_FACTORIAL = """
+factorial(x) := {{
+    if x == 1 then
+        return 1
+    else
+        return x * factorial(x - 1)
+}}
+factorial({n})
+"""
+
+# tail recursive
+_FIBONACCI = """
+fib(n, a=0, b=1) := {{
+    if n == 0 then
+        return a
+    else
+        return fib(n - 1, b, a + b)
+}}
+fib({n})
+"""
+
+
+def parse(source):
+    return Fixups().apply(Parser().parse(Environment(), source=source))
+
+
+def run(cls, environment):
+    with contextlib.redirect_stdout(io.StringIO()):
+        cls().apply(environment)
+    return [t.values for t in environment.trees]
+
+
+def main(depth=100000):
+    init_focal()
+    limit = sys.getrecursionlimit()
+    scripts = [('factorial', _FACTORIAL), ('fib', _FIBONACCI)]
+
+    print(f'{"":40s} {"closure":>11s} {"vm":>11s}')
+    sys.setrecursionlimit(max(limit, _RECURSION_LIMIT))
+    for name, script in scripts:
+        for n in [min(depth // 100, _CLOSURE_DEPTH), min(depth // 10, _CLOSURE_DEPTH)]:
+            environment = parse(script.format(n=n))
+            assert run(ClosureInterpreter, environment) == run(VirtualMachine, environment), 'back ends disagree'
+            report(f'{name}({n})', timeit(lambda: run(ClosureInterpreter, environment), repeat=1),
+                   timeit(lambda: run(VirtualMachine, environment), repeat=1))
+    sys.setrecursionlimit(limit)
+
+    print(f'\nvm only, python recursion limit {limit}')
+    for name, script in scripts:
+        environment = parse(script.format(n=depth))
+        elapsed = timeit(lambda: run(VirtualMachine, environment), repeat=1)
+        print(f'{name + "(" + str(depth) + ")":40s} {elapsed:10.4f}s {elapsed / depth * 1e6:10.4f}us per call')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
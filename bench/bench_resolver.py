@@ -0,0 +1,82 @@
+# name lookup from deep recursion and nested blocks: walking the scope chain by name vs addresses bound by the Resolver.
+#   python -m bench.bench_resolver [depth]
+import contextlib
+import io
+import sys
+
+from bench.bench_util import init_focal, timeit, report
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from interpreter.resolver import Resolver
+from parser.parser import Parser
+from runtime.environment import Environment
+
+_RECURSION_LIMIT = 20000    # recursive focal functions nest several python frames per call
+
+_RECURSIVE = """
+scale = 3
+offset = 1
+walk(n) := {{
+    if n == 0 then
+        return offset
+    else
+        return walk(n - 1) + scale
+}}
+walk({n})
+walk({n})
+walk({n})
+"""
+
+
+class _unresolved:
+    """
+    the Resolver binds nothing while active: every name is searched for by name
+    """
+    def __enter__(self):
+        self.saved = Resolver.apply
+        Resolver.apply = lambda resolver, environment=None: environment
+        return self
+
+    def __exit__(self, *args):
+        Resolver.apply = self.saved
+
+
+def nested_source(depth, count=50):
+    inner = '; '.join([f'x{n} = ' + ' + '.join(['scale * offset'] * 8) for n in range(0, 8)])
+    return 'scale = 3\noffset = 1\n' + '\n'.join(['{' * depth + inner + '}' * depth] * count) + '\n'
+
+
+def parse(source):
+    return Fixups().apply(Parser().parse(Environment(), source=source))
+
+
+def run(environment):
+    with contextlib.redirect_stdout(io.StringIO()):
+        Interpreter().apply(environment)
+    return [t.values for t in environment.trees]
+
+
+def values(source):
+    return [v.value if hasattr(v, 'value') else v for v in run(parse(source))]
+
+
+def main(depth=800):
+    init_focal()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), _RECURSION_LIMIT))
+    cases = [(f'recursion, depth {n}', _RECURSIVE.format(n=n)) for n in [depth // 16, depth // 4, depth]]
+    cases += [(f'nested blocks, depth {n}', nested_source(n)) for n in [1, depth // 80, depth // 20]]
+    for label, source in cases:
+        with _unresolved():
+            expected = values(source)
+        assert values(source) == expected, 'resolved lookups disagree'
+
+    print(f'{"":40s} {"by name":>11s} {"resolved":>11s}')
+    for label, source in cases:
+        environment = parse(source)
+        with _unresolved():
+            baseline = timeit(lambda: run(environment))
+        report(label, baseline, timeit(lambda: run(environment)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 800)
@@ -0,0 +1,73 @@
+# indicator flows over a quote panel with disjoint sinks, run in order vs independent trees run at once on a pool of
+# threads (interpreter/schedule.py).  results and printed output are checked to be those of the run in order.
+#   python -m bench.bench_schedule [columns] [workers]
+import contextlib
+import io
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bench.bench_util import init_focal, timeit, report
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from interpreter.schedule import plan_trees
+from parser.parser import Parser
+from runtime.conversion import c_unbox
+from runtime.environment import Environment
+
+_ROWS = 5000
+
+_SCRIPT = """
+close | sma(_, 10) | close.sma10
+close | sma(_, 20) | close.sma20
+close | sma(_, 50) | close.sma50
+close | sma(_, 100) | close.sma100
+close | delta | signal | entries
+close | shift(_, 1) | delta(_, 2) | cumsum | drift
+print('indicators')
+close.sma10 - close.sma20 | signal | cross
+close.sma50 - close.sma100 | signal | trend
+"""
+
+
+def panel(columns):
+    """
+    a random walk of quotes, one column per symbol
+    """
+    steps = np.random.default_rng(1).normal(size=(_ROWS, columns))
+    return pd.DataFrame(100 + steps.cumsum(axis=0), columns=[f'c{c}' for c in range(columns)],
+                        index=pd.date_range('2000-01-01', periods=_ROWS))
+
+
+def parse(close):
+    environment = Fixups().apply(Parser().parse(Environment(), source=_SCRIPT))
+    environment.globals.define(name='close', value=close)
+    return environment
+
+
+def run(close, workers):
+    init_focal().workers = workers
+    environment = parse(close)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        Interpreter().apply(environment)
+    return [c_unbox(t.values) for t in environment.trees], out.getvalue()
+
+
+def main(columns=200, workers=4):
+    init_focal()
+    close = panel(columns)
+    environment = parse(close)
+    levels = plan_trees(environment, environment.trees)
+    print(f'{columns} columns x {_ROWS} rows, {len(environment.trees)} trees in {len(levels)} levels: {levels}\n')
+    print(f'{"":40s} {"in order":>11s} {f"{workers} workers":>11s}')
+    (ordered, ordered_out), (scheduled, scheduled_out) = run(close, 1), run(close, workers)
+    assert ordered_out == scheduled_out, 'scheduling changes output'
+    for a, b in zip(ordered, scheduled):
+        assert a.equals(b) if isinstance(a, pd.DataFrame) else a == b, 'scheduling changes results'
+    report('indicator flows', timeit(lambda: run(close, 1)), timeit(lambda: run(close, workers)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, int(sys.argv[2]) if len(sys.argv) > 2 else 4)
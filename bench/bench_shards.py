@@ -0,0 +1,82 @@
+# a strategy over a wide quote panel, run in one process vs on shards of its symbols in worker processes
+# (interpreter/shards.py).  the panel stands in for yahoo() (no network access); the joined sinks are checked to be
+# those of the run in one process.
+#   python -m bench.bench_shards [symbols] [shards]
+import contextlib
+import io
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bench.bench_util import init_focal, timeit, report
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from parser.parser import Parser
+from runtime.conversion import c_unbox
+from runtime.environment import Environment
+from runtime.yahoo import use_panel
+
+_ROWS = 1250    # 5 years of days
+
+_SCRIPT = """
+print('loading')
+quotes = yahoo(symbols='portfolio.csv', span=-5y)
+(open, close, high, low, atr, volume, first, last) = quotes
+atr | delay(_, 1d) | atr.plus1
+close | sma(_, 10) | close.sma10
+close | sma(_, 20) | close.sma20
+close.sma10 - close.sma20 | signal | clipbefore(_, 1, 0, 1, 0) | signals
+signals | mul(_, -atr.plus1) | trades
+trades | cumsum | results
+"""
+
+_SINKS = [('results',), ('close', 'sma10'), ('close', 'sma20')]
+
+
+def panel(symbols):
+    """
+    random walks of quotes, one column per symbol, as get_yahoo returns them
+    """
+    rng = np.random.default_rng(1)
+    index = pd.date_range('2000-01-01', periods=_ROWS)
+    columns = [f's{c}' for c in range(symbols)]
+    close = pd.DataFrame(100 + rng.normal(size=(_ROWS, symbols)).cumsum(axis=0), index=index, columns=columns)
+    spread = pd.DataFrame(rng.uniform(0, 1, size=(_ROWS, symbols)), index=index, columns=columns)
+    volume = pd.DataFrame(rng.integers(1000, 100000, size=(_ROWS, symbols)), index=index, columns=columns)
+    return {'open': close.shift(1).bfill(), 'close': close, 'high': close + spread, 'low': close - spread,
+            'atr': close, 'volume': volume, 'first': {c: index[0] for c in columns},
+            'last': {c: index[-1] for c in columns}}
+
+
+def run(shards):
+    init_focal().shards = shards
+    environment = Fixups().apply(Parser().parse(Environment(), source=_SCRIPT))
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        Interpreter().apply(environment)
+    return [_find(environment.globals, path) for path in _SINKS], out.getvalue()
+
+
+def _find(scope, path):
+    symbol = scope.find(name=path[0])
+    for name in path[1:]:
+        symbol = symbol.find(name=name, local=True)
+    return c_unbox(symbol)
+
+
+def main(symbols=1000, shards=4):
+    init_focal()
+    use_panel(panel(symbols))
+    print(f'{symbols} symbols x {_ROWS} rows\n')
+    print(f'{"":40s} {"1 process":>11s} {f"{shards} shards":>11s}')
+    (whole, whole_out), (joined, joined_out) = run(1), run(shards)
+    assert whole_out == joined_out, 'sharding changes output'
+    for a, b in zip(whole, joined):
+        assert a.equals(b), 'sharding changes results'
+    report('strategy', timeit(lambda: run(1), repeat=1), timeit(lambda: run(shards), repeat=1))
+    use_panel(None)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000, int(sys.argv[2]) if len(sys.argv) > 2 else 4)
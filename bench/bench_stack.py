@@ -0,0 +1,98 @@
+# node throughput of the tree walker on expression heavy scripts: the deque backed RuntimeStack, checking for
+# underflow before each pop, vs the list backed stack catching it, with pop2 / popn.
+#   python -m bench.bench_stack [statements]
+import contextlib
+import io
+import sys
+from collections import deque
+
+from bench.bench_util import init_focal, timeit, report
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from parser.parser import Parser
+from runtime import exceptions
+from runtime.environment import Environment
+from runtime.stack import RuntimeStack
+
+_STATEMENT = """
+x{n} = ({n} + 1) * 2 - {n} / 4 + ({n} * 3 - 1) * ({n} + 7)
+y{n} = [x{n}, x{n} + 1, x{n} * 2, x{n} - 3, {n} > 10 and {n} < 1000]
+"""
+
+
+class _CheckedStack(RuntimeStack):
+    """
+    RuntimeStack as it was before: a deque, with push a method and each pop checking for underflow first
+    """
+    def __init__(self):
+        super().__init__()
+        self._stack = deque()
+        del self.push
+
+    def is_empty(self):
+        return True if len(self._stack) == 0 else False
+
+    def push(self, x):
+        self._stack.append(x)
+
+    def pop(self):
+        if self.is_empty():
+            exceptions.runtime_error(f'Stack underflow', loc=None)
+        return self._stack.pop()
+
+    def pop2(self):
+        top = self.pop()
+        return self.pop(), top
+
+    def popn(self, n):
+        return list(reversed([self.pop() for _ in range(0, n)]))
+
+
+def parse(source):
+    return Fixups().apply(Parser().parse(Environment(), source=source))
+
+
+def run(environment, stack):
+    environment.stack = stack
+    interpreter = Interpreter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.apply(environment)
+    return interpreter._count, [t.values for t in environment.trees]
+
+
+def main(statements=2000):
+    init_focal()
+    environment = parse(''.join([_STATEMENT.format(n=n) for n in range(statements)]))
+    nodes, expected = run(environment, _CheckedStack())
+    assert run(environment, RuntimeStack()) == (nodes, expected), 'stacks disagree'
+    print(f'{nodes} nodes in {len(environment.trees)} trees\n')
+
+    checked = timeit(lambda: run(environment, _CheckedStack()))
+    fast = timeit(lambda: run(environment, RuntimeStack()))
+    print(f'{"":40s} {"checked":>11s} {"fast":>11s}')
+    report('interpret', checked, fast)
+    print(f'{"nodes / second":40s} {nodes / checked:10.0f}  {nodes / fast:10.0f}')
+
+    stack = RuntimeStack()
+    old = _CheckedStack()
+    report('push, pop x1e6', timeit(lambda: _push_pop(old)), timeit(lambda: _push_pop(stack)))
+    report('push, push, pop2 x1e6', timeit(lambda: _push_pop2(old)), timeit(lambda: _push_pop2(stack)))
+
+
+def _push_pop(stack, n=1000000):
+    push, pop = stack.push, stack.pop
+    for i in range(n):
+        push(i)
+        pop()
+
+
+def _push_pop2(stack, n=1000000):
+    push, pop2 = stack.push, stack.pop2
+    for i in range(n):
+        push(i)
+        push(i)
+        pop2()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
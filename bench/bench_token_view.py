@@ -0,0 +1,91 @@
+# Token allocations made by AST.token over parse + fixups + run of the test corpus: a new Token per access vs the
+# cached token view.
+#   python -m bench.bench_token_view
+import contextlib
+import io
+
+from bench.bench_util import init_focal, load_corpus, timeit, report
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from parser.parser import Parser
+from runtime.environment import Environment
+from runtime.token import Token
+from runtime.token_data import _tk2type
+from runtime.tree import AST
+
+
+# AST.token as it was: a new Token on every access
+def _uncached_token(self):
+    if self.tid:
+        return Token(tid=self.tid, tcl=_tk2type[self.tid], lex=self.lexeme, loc=self.location)
+    else:
+        return Token.NONE(self.location)
+
+
+class _counting:
+    """
+    counts Token constructions, AST.token reads and the Tokens those reads construct while active
+    """
+    def __init__(self, fget):
+        self.fget = fget
+        self.tokens = 0
+        self.reads = 0
+        self.views = 0
+        self.saved = None
+
+    def __enter__(self):
+        self.saved = Token.__init__, AST.token
+        init, fget = Token.__init__, self.fget
+
+        def counting_init(token, *args, **kwargs):
+            self.tokens += 1
+            init(token, *args, **kwargs)
+
+        def counting_token(node):
+            tokens = self.tokens
+            token = fget(node)
+            self.reads += 1
+            self.views += self.tokens - tokens
+            return token
+        Token.__init__ = counting_init
+        AST.token = property(counting_token)
+        return self
+
+    def __exit__(self, *args):
+        Token.__init__, AST.token = self.saved
+
+
+def run_corpus(corpus):
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, source in corpus:
+            try:
+                Interpreter().apply(Fixups().apply(Parser().parse(Environment(), source=source)))
+            except Exception:   # scripts exercising errors
+                pass
+
+
+def main():
+    init_focal()
+    corpus = [(name, source) for name, source in load_corpus() if 'yahoo' not in name]    # no network access
+    cached_token = AST.token
+    with _counting(_uncached_token) as uncached:
+        run_corpus(corpus)
+    with _counting(cached_token.fget) as cached:
+        run_corpus(corpus)
+    try:
+        AST.token = property(_uncached_token)
+        uncached_time = timeit(lambda: run_corpus(corpus))
+    finally:
+        AST.token = cached_token
+    cached_time = timeit(lambda: run_corpus(corpus))
+
+    print(f'{len(corpus)} test scripts: parse + fixups + run\n')
+    print(f'{"":40s} {"uncached":>11s} {"cached":>11s}')
+    print(f'{"AST.token reads":40s} {uncached.reads:11d} {cached.reads:11d}')
+    print(f'{"Tokens built by AST.token":40s} {uncached.views:11d} {cached.views:11d}')
+    print(f'{"Token allocations (all)":40s} {uncached.tokens:11d} {cached.tokens:11d}')
+    report('time', uncached_time, cached_time)
+
+
+if __name__ == '__main__':
+    main()
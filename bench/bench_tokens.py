@@ -0,0 +1,59 @@
+# retained memory and allocations per token: slotted tokens with interned lexemes vs the dict-backed layout.
+#   python -m bench.bench_tokens [blocks]
+import sys
+import tracemalloc
+
+from bench.bench_util import synthetic_source, report
+from parser.lexer import Lexer
+
+
+# replica of the previous token layout: per-instance __dict__ on the token and its location, one lexeme per token
+class _DictLoc:
+    def __init__(self, line, offset):
+        self.line = line
+        self.offset = offset
+
+
+class _DictToken:
+    def __init__(self, tk):
+        self.id = tk.id
+        self.t_class = tk.t_class
+        self.lexeme = ''.join(list(tk.lexeme))   # defeat interning / single character caching
+        self.value = tk.value
+        self.location = _DictLoc(tk.location.line, tk.location.offset)
+        self.is_reserved = tk.is_reserved
+
+
+def measure(fn):
+    """
+    returns (bytes, allocations) retained by the result of fn()
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = fn()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    size = sum([s.size_diff for s in stats])
+    count = sum([s.count_diff for s in stats])
+    del result
+    return size, count
+
+
+def main(blocks=1000):
+    source = synthetic_source(blocks)
+    tokens = [t for t in Lexer(source)]
+    ntokens = len(tokens)
+    print(f'synthetic source: {len(source.splitlines())} lines, {ntokens} tokens\n')
+
+    dict_size, dict_count = measure(lambda: [_DictToken(t) for t in tokens])
+    del tokens
+    slot_size, slot_count = measure(lambda: [t for t in Lexer(source)])
+
+    print(f'{"":40s} {"dict":>11s} {"slots":>11s}')
+    report('bytes / token', dict_size / ntokens, slot_size / ntokens, units='B')
+    report('allocations / token', dict_count / ntokens, slot_count / ntokens, units=' ')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,41 @@
+# peak token memory and time of the eager TokenStream vs the on-demand LazyTokenStream.
+#   python -m bench.bench_tokenstream [blocks]
+import sys
+import tracemalloc
+
+from bench.bench_util import synthetic_source, timeit, report
+from parser.tokenstream import TokenStream, LazyTokenStream
+from runtime.token_ids import TK
+
+
+def drain(stream):
+    n = 0
+    while stream.peek().id != TK.EOF:
+        stream.read1()
+        n += 1
+    return n
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(blocks=2000):
+    source = synthetic_source(blocks)
+    ntokens = drain(TokenStream(source))
+    assert ntokens == drain(LazyTokenStream(source))
+    print(f'synthetic source: {len(source.splitlines())} lines, {ntokens} tokens\n')
+
+    print(f'{"":40s} {"eager":>11s} {"lazy":>11s}')
+    report('drain time', timeit(lambda: drain(TokenStream(source))), timeit(lambda: drain(LazyTokenStream(source))))
+    eager = peak_memory(lambda: drain(TokenStream(source))) / 1024
+    lazy = peak_memory(lambda: drain(LazyTokenStream(source))) / 1024
+    report('peak token memory', eager, lazy, units='K')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,74 @@
+# shared helpers for the benchmark scripts.  run benchmarks from the repository root, e.g.:
+#   python -m bench.bench_lexer
+import glob
+import os
+import time
+
+from interpreter.focal import _option_defaults
+from runtime.exceptions import getLogFacility
+from runtime.options import getOptions
+
+_CASES_DIRECTORY = './test/cases'
+_CASE_EXTENSIONS = ['.t', '.f', '.p']
+
+# a mix of the constructs found in the strategy scripts: declarations, flows, function defs, literals, comments.
+_SYNTHETIC_BLOCK = """# generated block {n}
+def atr{n} = (high + low) / 2; med{n} = (close + open) /2
+trade_size{n} = position * 10%
+any:{{ close >| sma(10), close >| sma(20) }}:(threshold=0.01) | signal >> delay(1d) | atr{n} => buy
+x{n} = 1..10 | reshape(_, 2, 5)
+f{n}(x) := {{
+    if x == 1 then
+        return 1
+    else
+        return x * f{n}(x - 1)
+}}
+y{n} = f{n}(5) + 3.14159 * 2 - 'a string literal' == "another one"
+"""
+
+
+def init_focal(options=None):
+    """
+    registers the 'focal' log facility (output discarded) and options used by the parser, fixups and interpreter
+    """
+    getLogFacility('focal', file=open(os.devnull, 'w'))
+    defaults = dict(_option_defaults)
+    defaults.update(options or {})
+    return getOptions('focal', defaults=defaults)
+
+
+def load_corpus():
+    """
+    returns a list of (name, source) tuples for every test case script
+    """
+    corpus = []
+    for fname in sorted(glob.glob(os.path.join(_CASES_DIRECTORY, '*'))):
+        if os.path.splitext(fname)[1] in _CASE_EXTENSIONS:
+            with open(fname) as f:
+                corpus.append((os.path.basename(fname), f.read()))
+    return corpus
+
+
+def synthetic_source(blocks=1000):
+    """
+    generates a large script of roughly 10 statements per block
+    """
+    return ''.join([_SYNTHETIC_BLOCK.format(n=n) for n in range(blocks)])
+
+
+def timeit(fn, repeat=3):
+    """
+    returns the best wall-clock time of `repeat` calls to fn()
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(label, baseline, other, units='s'):
+    speedup = baseline / other if other else float('inf')
+    print(f'{label:40s} {baseline:10.4f}{units} {other:10.4f}{units}   x{speedup:.2f}')
@@ -0,0 +1,62 @@
+# visit throughput of NodeVisitor dispatch over a large synthetic tree: per visit method lookup vs the dispatch cache.
+#   python -m bench.bench_visitor [blocks]
+import sys
+
+from bench.bench_util import init_focal, synthetic_source, timeit, report
+from interpreter.visitor import TreeFilter, DEFAULT_NODE, _defaultNodeTypeMappings
+from parser.parser import Parser
+from runtime.environment import Environment
+
+
+_walkerNodeMappings = dict(_defaultNodeTypeMappings, IfThenElse='visit_conditional')
+
+
+class _Walker(TreeFilter):
+    def __init__(self):
+        super().__init__(mapping=_walkerNodeMappings)
+
+    def apply(self, trees=None):
+        super().apply(trees)
+        for t in trees:
+            self.visit(t.root)
+        return self._count
+
+    def visit_node(self, node, label=None):
+        super().visit_node(node, label)
+
+    def visit_conditional(self, node, label=None):
+        self.visit_node(node, label)
+        self.visit(node.test)
+        self.visit(node.then)
+        self.visit(node.els)
+
+
+# the dispatch NodeVisitor.visit did before the cache: an f-string, a map2name lookup and a getattr per node
+class _UncachedWalker(_Walker):
+    def visit(self, node):
+        if node is not None:
+            label = type(node).__name__
+            method_name = f'{self.node2name(label)}'
+            visitor = getattr(self, method_name, None)
+            if visitor is None:
+                method_name = DEFAULT_NODE
+                visitor = getattr(self, method_name, self.generic_visit)
+            return visitor(node, label)
+
+
+def main(blocks=500):
+    init_focal()
+    trees = Parser().parse(Environment(), synthetic_source(blocks)).trees
+    nodes = _Walker().apply(trees)
+    assert nodes == _UncachedWalker().apply(trees)
+    print(f'{nodes} nodes in {len(trees)} trees\n')
+
+    uncached = timeit(lambda: _UncachedWalker().apply(trees))
+    cached = timeit(lambda: _Walker().apply(trees))
+    print(f'{"":40s} {"uncached":>11s} {"cached":>11s}')
+    report('walk', uncached, cached)
+    print(f'{"nodes / second":40s} {nodes / uncached:10.0f}  {nodes / cached:10.0f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
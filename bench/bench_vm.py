@@ -0,0 +1,83 @@
+# throughput of the bytecode VM vs the tree walking interpreter, in evaluated nodes per second.
+#   python -m bench.bench_vm [n]
+import contextlib
+import io
+import pickle
+import sys
+
+from bench.bench_util import init_focal, load_corpus, timeit, report
+from interpreter.fixups import Fixups
+from interpreter.interpreter import Interpreter
+from interpreter.vm import VirtualMachine
+from parser.parser import Parser
+from runtime.environment import Environment
+
+_RECURSION_LIMIT = 20000    # recursive focal functions nest several python frames per call
+
+_SOURCE = """
+fib(n) := {{
+    if n < 2 then
+        return n
+    else
+        return fib(n - 1) + fib(n - 2)
+}}
+poly(x) := {{
+    return (x * x + 3 * x - 2) / (x + 1) * 2 - x / 7 + (x - 1) * (x + 2)
+}}
+total(n) := {{
+    if n == 0 then
+        return 0
+    else
+        return poly(n) + total(n - 1)
+}}
+fib({n})
+total({n} * 20)
+"""
+
+
+def parse(source):
+    return Fixups().apply(Parser().parse(Environment(), source=source))
+
+
+def run(interpreter, source):
+    environment = parse(source)
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.apply(environment)
+    return [t.values for t in environment.trees]
+
+
+def run_code(source, shipped):
+    vm = VirtualMachine()
+    environment = parse(source)
+    vm._init(environment)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [vm.run(code) for code in pickle.loads(shipped)]
+
+
+def main(n=16):
+    init_focal()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), _RECURSION_LIMIT))
+    source = _SOURCE.format(n=n)
+    factorial = dict(load_corpus())['factorial.f']
+    for s in [source, factorial]:
+        assert run(Interpreter(), s) == run(VirtualMachine(), s), 'back ends disagree'
+
+    tree = Interpreter()
+    run(tree, source)
+    ops = tree._count       # nodes evaluated by the tree walker
+    baseline = timeit(lambda: run(Interpreter(), source))
+    vm = timeit(lambda: run(VirtualMachine(), source))
+    print(f'{"":40s} {"tree":>11s} {"vm":>11s}')
+    report(f'fib/poly ({n})', baseline, vm)
+    report('factorial.f', timeit(lambda: run(Interpreter(), factorial)),
+           timeit(lambda: run(VirtualMachine(), factorial)))
+    print(f'{"nodes / second":40s} {ops / baseline:10.0f}  {ops / vm:10.0f}')
+
+    # compiled code is pickled once and run in a fresh VM, as when shipped to a worker process
+    shipped = pickle.dumps(VirtualMachine().compile(parse(source)))
+    assert run_code(source, shipped) == run(VirtualMachine(), source)
+    print(f'\n{len(shipped)} bytes of pickled code for {len(source.splitlines())} lines')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 16)
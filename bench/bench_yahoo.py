@@ -0,0 +1,77 @@
+# quotes of a portfolio fetched one symbol at a time vs on a pool of threads sharing a session (runtime/yahoo.py
+# QuoteFetcher), from a local stub of the yahoo download server.  the stub answers after a delay, and with a 503 to
+# the first request for every few symbols, so retries are run too.  the quotes are checked to be the same both ways.
+#   python -m bench.bench_yahoo [symbols] [workers]
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import runtime.yahoo as yahoo
+from bench.bench_util import timeit, report
+from runtime.yahoo import QuoteFetcher
+
+_LATENCY = 0.02     # seconds the stub takes to answer
+_ROWS = 1250
+_UNAVAILABLE = 7    # every 7th symbol is answered 503 the first time
+
+_quotes = 'Date,Open,High,Low,Close,Adj Close,Volume\n' + ''.join(
+    [f'2000-01-{1 + d % 28:02d},{d},{d + 1},{d - 1},{d},{d},{1000 + d}\n' for d in range(_ROWS)])
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    answers /download/<symbol>?... with the same quotes for every symbol
+    """
+    unavailable = set()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        time.sleep(_LATENCY)
+        symbol = self.path.split('?')[0].rsplit('/', 1)[-1]
+        with self.lock:
+            retry = int(symbol[1:]) % _UNAVAILABLE == 0 and symbol not in self.unavailable
+            self.unavailable.add(symbol)
+        if retry:
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = _quotes.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(symbols, workers):
+    StubHandler.unavailable = set()
+    with QuoteFetcher(workers=workers, backoff=0.01) as fetcher:
+        return fetcher.fetch_all(symbols, 0, 1, yahoo.DAILY)
+
+
+def main(count=200, workers=16):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = yahoo.yahoo_base
+    yahoo.yahoo_base = f'http://127.0.0.1:{server.server_address[1]}/download'
+    try:
+        symbols = [f's{c}' for c in range(count)]
+        print(f'{count} symbols, {_LATENCY * 1000:.0f}ms per request\n')
+        print(f'{"":40s} {"1 worker":>11s} {f"{workers} workers":>11s}')
+        one, pooled = run(symbols, 1), run(symbols, workers)
+        assert list(pooled.keys()) == symbols, 'pooling changes the order of the symbols'
+        assert all([q is not None and q.equals(pooled[s]) for s, q in one.items()]), 'pooling changes quotes'
+        report('fetch quotes', timeit(lambda: run(symbols, 1), repeat=1), timeit(lambda: run(symbols, workers)))
+    finally:
+        yahoo.yahoo_base = base
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, int(sys.argv[2]) if len(sys.argv) > 2 else 16)
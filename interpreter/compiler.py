@@ -0,0 +1,324 @@
+from interpreter.interpreter import Interpreter
+from runtime.conversion import c_unbox
+from runtime.environment import Environment
+from runtime.exceptions import runtime_strict_warning
+from runtime.function import Function
+from runtime.indexdict import IndexedDict
+from runtime.literals import Literal
+from runtime.scope import Block, Scope, Object, FunctionBase
+from runtime.token import Token
+from runtime.token_ids import TK
+from runtime.tree import AST, Ref, Assign, Define, FnRef, Generate, IfThenElse, node_attributes
+
+from runtime.eval_unary import is_true
+from runtime.evaluate import binary_dispatcher, evaluate_unary_operation, find_symbol, reduce_ref
+
+_COMPILE_BINOP = '_compile_binop'
+_COMPILE_BLOCK = '_compile_block'
+_COMPILE_CONDITIONAL = '_compile_conditional'
+_COMPILE_DEFINE = '_compile_define'
+_COMPILE_FNCALL = '_compile_fncall'
+_COMPILE_GET = '_compile_get'
+_COMPILE_LITERAL = '_compile_literal'
+_COMPILE_REF = '_compile_ref'
+_COMPILE_RETURN = '_compile_return'
+_COMPILE_UNOP = '_compile_unop'
+
+# node types with a closure translation.  anything else is run through the tree walker (see _compile_fallback)
+_compilerNodeMappings = {
+    'Assign': _COMPILE_BINOP,
+    'BinOp': _COMPILE_BINOP,
+    'Block': _COMPILE_BLOCK,
+    'Bool': _COMPILE_LITERAL,
+    'Category': _COMPILE_LITERAL,
+    'DateDiff': _COMPILE_LITERAL,
+    'DateTime': _COMPILE_LITERAL,
+    'Define': _COMPILE_DEFINE,
+    'DefineChainProd': _COMPILE_BINOP,
+    'DefineVal': _COMPILE_DEFINE,
+    'DefineVar': _COMPILE_DEFINE,
+    'Duration': _COMPILE_LITERAL,
+    'Enumeration': _COMPILE_LITERAL,
+    'Float': _COMPILE_LITERAL,
+    'FnCall': _COMPILE_FNCALL,
+    'FnRef': _COMPILE_FNCALL,
+    'Get': _COMPILE_GET,
+    'IfThenElse': _COMPILE_CONDITIONAL,
+    'Index': _COMPILE_BINOP,
+    'Int': _COMPILE_LITERAL,
+    'Literal': _COMPILE_LITERAL,
+    'Percent': _COMPILE_LITERAL,
+    'Ref': _COMPILE_REF,
+    'Return': _COMPILE_RETURN,
+    'Str': _COMPILE_LITERAL,
+    'Time': _COMPILE_LITERAL,
+    'UnaryOp': _COMPILE_UNOP,
+}
+
+# the tree walker's handlers for these leave zero or several values on the RuntimeStack, or consume values pushed by
+# earlier statements.  statements and function bodies containing them are left to the tree walker as a whole.
+_IRREGULAR_NODES = [
+    'ApplyChainProd',
+    'Dict',
+    'Flow',
+    'IndexSet',
+    'NamedTuple',
+    'PropCall',
+    'PropRef',
+    'PropSet',
+    'Set',
+]
+
+
+class ClosureInterpreter(Interpreter):
+    """
+    Closure compiling back end.  Each tree is translated once into nested Python closures, one per node, that return
+    the value the tree walker would have pushed.  Visitor dispatch and the shape of each node are resolved at compile
+    time, operators cache their operator function per node (binary_dispatcher).  Intermediates are passed as return
+    values rather than through the RuntimeStack.
+
+    Node types without a translation are compiled to a closure that runs the tree walker on that sub-tree, so the
+    two back ends are interchangeable.  Function bodies are compiled on their first call from compiled code.
+    """
+    def __init__(self, mapping=None):
+        super().__init__(mapping)
+        self._compiled = {}     # id(node) -> (node, closure) for function bodies, keeps node alive while cached
+
+    def apply(self, environment=None):
+        if self.option.verbose:     # the node trace comes from the tree walker
+            return super().apply(environment)
+        self._init(environment)
+        if environment is None:
+            return None
+        assert environment.trees is not None, "empty trees passed via Environment to apply"
+
+        self.run_trees(environment.trees)
+        return environment
+
+    def run_tree(self, t):
+        root = t.root
+        if type(root).__name__ not in _compilerNodeMappings or not _is_regular(root):
+            self.visit(root)
+            return self.stack.peek()
+        v = self.compile(root)()
+        self.stack.push(v)      # results stay on the stack as with the tree walker (`_`, flows)
+        return v
+
+    def compile(self, node):
+        """
+        returns a closure evaluating node.  node must be regular (see _is_regular)
+        """
+        method = _compilerNodeMappings.get(type(node).__name__)
+        if method is None or id(node) in self.common:     # common subexpressions are cached by the tree walker
+            return self._compile_fallback(node)
+        return getattr(self, method)(node)
+
+    def compile_code(self, code):
+        entry = self._compiled.get(id(code))
+        if entry is None or entry[0] is not code:
+            fn = self.compile(code) if _is_regular(code) else self._compile_fallback(code)
+            entry = self._compiled[id(code)] = (code, fn)
+        return entry[1]
+
+    def call_function(self, fn, fields, values):
+        restore = Environment.enter(fn.frame(fields, values))
+        value = self.compile_code(fn.code)()
+        Environment.leave(restore)
+        return value
+
+    # -------------------
+    # translations
+    # -------------------
+    def _compile_fallback(self, node):
+        visit = self.visit
+
+        def interpret():
+            visit(node)
+            return self.stack.pop()
+        return interpret
+
+    def _compile_literal(self, node):
+        value = node.value
+
+        def literal():
+            return value
+        return literal
+
+    def _compile_get(self, node):
+        def get():
+            symbol = find_symbol(Environment.current.scope, node)
+            if symbol is None:
+                runtime_strict_warning(f'Symbol `{node.token.lexeme}` referenced before initialized', loc=node.token.location)
+            elif isinstance(symbol, FunctionBase) and symbol.arity == 0:
+                return symbol.invoke(self)      # parameterless functions (like 'today') are reduced
+            return symbol
+        return get
+
+    def _compile_ref(self, node):
+        def ref():
+            return reduce_ref(ref=node)
+        return ref
+
+    def _compile_binop(self, node):
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+        dispatch = binary_dispatcher(node)
+
+        def binop():
+            r_value = right()
+            return dispatch(left(), r_value)
+        return binop
+
+    def _compile_unop(self, node):
+        expr = self.compile(node.expr)
+
+        def unop():
+            return evaluate_unary_operation(node, expr())
+        return unop
+
+    def _compile_return(self, node):
+        return self.compile(node.expr)
+
+    def _compile_conditional(self, node):
+        test = self.compile(node.test)
+        then = self.compile(node.then)
+        els = self.compile(node.els)
+
+        def conditional():
+            if is_true(c_unbox(test()), tid=None):
+                return then()
+            return els()
+        return conditional
+
+    def _compile_block(self, node):
+        items = [n for n in node.items() or [] if n is not None]
+        if not items:
+            return self._compile_fallback(node)
+        items = [self.compile(n) for n in items]
+        last = items.pop()
+        block = Block(loc=node.token.location)
+
+        def run_block():
+            restore = Environment.enter(Scope(other=block))
+            for item in items:
+                item()
+            value = last()
+            Environment.leave(restore)
+            return value
+        return run_block
+
+    def _compile_define(self, node):
+        left = node.left
+        if type(left) is not Ref or isinstance(node.right, Block):
+            return self._compile_fallback(node)
+        right = self.compile(node.right)
+
+        def define():
+            # the tree walker leaves the symbol it visits on the left on the stack
+            self.stack.push(reduce_ref(ref=left))
+            return reduce_ref(ref=left, value=right(), update=True)
+        return define
+
+    def _compile_fncall(self, node):
+        params = _compile_parameters(self, node.right)
+        fnode = self.compile(node.left)
+        name = node.left.name
+        resolve = self._resolve
+
+        def fncall():
+            fn = fnode()
+            assert fn is not None, f'Function {name} is undefined'
+            fields = []
+            values = []
+            if getattr(fn, 'defaults', None) is not None:
+                fields, values = fn.default_arguments()
+            for idx, param in params:
+                key, value = param()
+                resolve(idx, key, value, fields, values)
+            if type(fn) is Function:
+                return self.call_function(fn, fields, values)
+            return fn.invoke(self, IndexedDict(fields=fields, values=values))
+        return fncall
+
+
+# -----------------------------------
+# helpers
+# -----------------------------------
+def _is_regular(root):
+    seen = set()
+    stack = [root]
+    while stack:
+        o = stack.pop()
+        if isinstance(o, AST):
+            if id(o) in seen:
+                continue
+            seen.add(id(o))
+            if type(o).__name__ in _IRREGULAR_NODES:
+                return False
+            if isinstance(o, Ref) and o.tid == TK.ANON:
+                return False
+            if isinstance(o, IfThenElse) and o.els is None:
+                return False
+            if isinstance(o, FnRef) and o.right is None:     # arguments are taken from the stack
+                return False
+            if isinstance(o, Define) and isinstance(o.left, Generate):
+                return False
+            stack.extend([v for k, v in node_attributes(o) if k not in ['parent', 'parent_scope']])
+        elif isinstance(o, (list, tuple)):
+            stack.extend(o)
+    return True
+
+
+# Interpreter.reduce_parameters for call sites: each argument is compiled to a closure returning (name, value)
+def _compile_parameters(interpreter, args):
+    if isinstance(args, Generate):
+        args = args.values()
+    params = []
+    for idx in range(0, len(args)):
+        ref = args[idx]
+        if isinstance(ref, Define):
+            param = _compile_named(interpreter.compile(ref.left), interpreter.compile(ref.right))
+        elif isinstance(ref, Assign):
+            param = _compile_assigned(ref.left, interpreter.compile(ref.right))
+        elif isinstance(ref, Literal) or ref is None:
+            param = _compile_constant(ref)
+        else:
+            param = _compile_positional(interpreter.compile(ref))
+        params.append((idx, param))
+    return params
+
+
+def _compile_named(left, right):
+    def named():
+        value = right()
+        key = left()
+        if isinstance(key, Object):
+            key = key.name
+        return key, c_unbox(value)
+    return named
+
+
+def _compile_assigned(left, right):
+    def assigned():
+        value = right()
+        sym = reduce_ref(ref=left)
+        if isinstance(sym, Object):
+            name = sym.name
+        elif isinstance(sym, Token):    # tokens are keywords / intrinsics
+            name = sym.lexeme
+        else:
+            assert False, "Unexpected argument type in Define"
+        return name, c_unbox(value)
+    return assigned
+
+
+def _compile_constant(ref):
+    def constant():
+        return None, c_unbox(ref)
+    return constant
+
+
+def _compile_positional(expr):
+    def positional():
+        return None, c_unbox(expr())
+    return positional
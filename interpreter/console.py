@@ -184,7 +184,7 @@ def do_load_script(console, args):
 def do_parse(console, args=None):
     source = console.environment.source
     focal = console.focal
-    console.environment = focal.parser.parse(environment=console.environment, source=source)
+    console.environment = focal.parse_script(console.environment, source)
     if console.option.verbose:
         show_tree(console)
     if console.option.auto_run:
@@ -340,7 +340,7 @@ def load_script(console, fname):
 def parse_script(console):
     source = console.environment.source
     focal = console.focal
-    console.environment = focal.parser.parse(environment=console.environment, source=source)
+    console.environment = focal.parse_script(console.environment, source)
     if console.option.verbose:
         show_tree(console)
 
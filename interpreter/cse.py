@@ -0,0 +1,237 @@
+# common subexpression elimination: pure expressions found more than once in a program are evaluated once per run
+
+import numpy as np
+import pandas as pd
+
+from interpreter.resolver import _children
+from interpreter.visitor import NodeVisitor
+from runtime.conversion import c_unbox
+from runtime.environment import Environment
+from runtime.intrinsics import IntrinsicFunction, is_pure_intrinsic
+from runtime.memo import values_key
+from runtime.scope import FunctionBase
+from runtime.token_ids import TK
+from runtime.tree import AST, Assign, BinOp, FnCall, Generate, PropRef, Ref
+
+from runtime.evaluate import _dispatch_lookups, find_symbol
+
+_KEY_CALL = 'key_call'
+_KEY_LITERAL = 'key_literal'
+_KEY_NAME = 'key_name'
+_KEY_OPERATION = 'key_operation'
+_KEY_PROPREF = 'key_propref'
+
+_cseNodeMappings = {
+    'BinOp': _KEY_OPERATION,
+    'Bool': _KEY_LITERAL,
+    'Category': _KEY_LITERAL,
+    'DateDiff': _KEY_LITERAL,
+    'DateTime': _KEY_LITERAL,
+    'Duration': _KEY_LITERAL,
+    'Enumeration': _KEY_LITERAL,
+    'Float': _KEY_LITERAL,
+    'FnCall': _KEY_CALL,
+    'Get': _KEY_NAME,
+    'Int': _KEY_LITERAL,
+    'Literal': _KEY_LITERAL,
+    'Percent': _KEY_LITERAL,
+    'PropRef': _KEY_PROPREF,
+    'Ref': _KEY_NAME,
+    'Str': _KEY_LITERAL,
+    'Time': _KEY_LITERAL,
+}
+
+_ANON = ('_',)      # the key of `_`, the value piped into a call
+
+_VECTOR_TYPES = [pd.DataFrame, pd.Series, np.ndarray]
+
+
+class Common:
+    """
+    A pure expression found more than once in the program.  Its value depends only on the values of the names and
+    properties it reads (leaves), on `_` if it takes the piped value (anon), and on the intrinsics it calls still
+    being the intrinsics (functions)
+    """
+    __slots__ = ('node', 'key', 'leaves', 'functions', 'anon')
+
+    def __init__(self, node, key):
+        self.node = node        # keeps id(node) from being reused while the table is in use
+        self.key = key
+        self.leaves = []
+        self.functions = []
+        self.anon = key_count(key, _ANON)
+        self._collect(node)
+
+    def value_key(self, interpreter):
+        """
+        returns the key of the expression's value, from its key and the values it reads now.  None if one of those
+        can't be keyed or isn't a variable's value.  None as well unless one is a DataFrame, Series or array: on
+        scalars the expression is cheaper than keying it
+        """
+        scope = Environment.current.scope
+        for ref in self.functions:
+            if not isinstance(find_symbol(scope, ref), IntrinsicFunction):
+                return None
+        values = []
+        if self.anon:
+            if interpreter.stack.is_empty():
+                return None
+            values.append(c_unbox(interpreter.stack.peek()))
+        for leaf in self.leaves:
+            base = leaf
+            while isinstance(base, PropRef):
+                base = base.left
+            symbol = find_symbol(scope, base)
+            if symbol is None or isinstance(symbol, FunctionBase):
+                return None     # left to the interpreter: warnings, parameterless functions
+            if leaf is not base:
+                depth = interpreter.stack.depth()
+                interpreter.visit(leaf)
+                if interpreter.stack.depth() == depth:
+                    return None     # a property the interpreter can't read
+                symbol = interpreter.stack.pop()
+            value = c_unbox(symbol)
+            if value is None:
+                return None
+            values.append(value)
+        if not any([type(v) in _VECTOR_TYPES for v in values]):
+            return None
+        key = values_key(values)
+        return None if key is None else (self.key, key)
+
+    def _collect(self, node):
+        if isinstance(node, FnCall):
+            self.functions.append(node.left)
+            for arg in _arguments(node):
+                self._collect(arg.right if isinstance(arg, Assign) else arg)
+        elif type(node) is BinOp:
+            self._collect(node.left)
+            self._collect(node.right)
+        elif isinstance(node, PropRef) or (isinstance(node, Ref) and node.tid != TK.ANON):
+            self.leaves.append(node)
+
+
+class CommonSubexpressions(NodeVisitor):
+    """
+    Keys every pure expression in the program by its structure: calls to pure intrinsics (see is_pure_intrinsic),
+    binary operators of the operator tables, names, properties, literals and `_` as a call argument.  Expressions with
+    a key seen in more than one place are entered in Environment.common, as a Common.
+
+    Values are not known here: the interpreter keys an expression's value by its key and the values it reads when it
+    is evaluated (see Interpreter.process_common), so names bound to other values in between, or DataFrames written to
+    in place (see memo.touch), evaluate it again.
+    """
+    def __init__(self):
+        super().__init__(mapping=_cseNodeMappings)
+        self.keys = {}      # id(node) -> key, None for impure nodes
+        self.seen = set()
+        self.found = {}     # key -> [node], calls and operators
+
+    def apply(self, environment=None):
+        if environment is None:
+            return None
+        roots = [t.root for t in environment.trees]
+        keyed = environment.common_trees
+        if len(roots) == len(keyed) and all([a is b for a, b in zip(roots, keyed)]):
+            return environment.common    # trees are keyed once, until they change
+        self.keys = {}
+        self.seen = set()
+        self.found = {}
+        for root in roots:
+            self.visit(root)
+        environment.common = {id(n): Common(n, key) for key, nodes in self.found.items() if len(nodes) > 1
+                              and key_count(key, _ANON) <= 1 for n in nodes}
+        environment.common_trees = roots
+        return environment.common
+
+    def visit(self, node):
+        key = id(node)
+        if key not in self.keys:    # nodes are held under several names (FnCall.ref and .left, ...)
+            self.keys[key] = super().visit(node)
+        return self.keys[key]
+
+    def visit_node(self, node, label=None):
+        for name, child in _children(node):
+            self._visit_children(child)
+        return None
+
+    def visit_list(self, items, label=None):
+        self._visit_children(items)
+        return None
+
+    def key_call(self, node, label=None):
+        args = [self._key_argument(arg) for arg in _arguments(node)]
+        self.visit_node(node, label)
+        if not is_pure_intrinsic(node.left.name) or None in args:
+            return None
+        return self._found(node, ('()', node.left.name, tuple(args)))
+
+    def key_literal(self, node, label=None):
+        key = values_key([node.value])
+        return None if key is None else (type(node).__name__, key)
+
+    def key_name(self, node, label=None):
+        if node.tid == TK.ANON:
+            return None     # `_` only as a call argument, see _key_argument
+        return node.name,
+
+    def key_operation(self, node, label=None):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        if node.op not in _dispatch_lookups or left is None or right is None:
+            return None
+        return self._found(node, (node.op, left, right))
+
+    def key_propref(self, node, label=None):
+        left = self.visit(node.left)
+        right = node.right
+        if left is None or not isinstance(node.left, (Ref, PropRef)) or not isinstance(right, Ref) \
+                or right.tid == TK.ANON:
+            return None
+        return '.', left, right.name
+
+    # -------------------
+    # helpers
+    # -------------------
+    def _found(self, node, key):
+        self.found.setdefault(key, []).append(node)
+        return key
+
+    def _key_argument(self, arg):
+        if isinstance(arg, Ref) and arg.tid == TK.ANON:
+            return _ANON
+        if isinstance(arg, Assign) and isinstance(arg.left, Ref):
+            right = self.visit(arg.right)
+            return None if right is None else ('=', arg.left.name, right)
+        return self.visit(arg)
+
+    def _visit_children(self, value):
+        if isinstance(value, AST):
+            self.visit(value)
+        elif isinstance(value, (list, tuple)):
+            if id(value) in self.seen:      # blocks hold their items under several names
+                return
+            self.seen.add(id(value))
+            for v in value:
+                if isinstance(v, AST):
+                    self.visit(v)
+                elif isinstance(v, (list, tuple)):
+                    self._visit_children(v)
+
+
+def key_count(key, part):
+    """
+    returns the number of times part occurs in key
+    """
+    if key == part:
+        return 1
+    if isinstance(key, tuple):
+        return sum([key_count(k, part) for k in key])
+    return 0
+
+
+def _arguments(node):
+    args = node.right
+    if isinstance(args, Generate):
+        args = args.values()
+    return [] if args is None else args
@@ -4,16 +4,17 @@ from abc import ABC
 
 from runtime.conversion import c_unbox, c_type
 from runtime.environment import Environment
+from runtime.exceptions import FocalError
 from runtime.factory import to_lit
-from runtime.tree import AST, BinOp, Generate, FnCall
+from runtime.tree import AST, BinOp, Generate, FnCall, IfThenElse
 from runtime.literals import Literal, Bool
 from runtime.collections import List
 from runtime.token import Token
 from runtime.token_ids import TK
 
-from runtime.eval_boolean import _boolean_dispatch_table, eval_boolean_dispatch
-from runtime.eval_binops import _binops_dispatch_table, eval_binops_dispatch
-from runtime.eval_unary import decrement_literal, increment_literal, negate_literal, not_literal
+from runtime.eval_boolean import _boolean_dispatch_table, boolean_dispatch_fn
+from runtime.eval_binops import _binops_dispatch_table, binops_dispatch_fn
+from runtime.eval_unary import decrement_literal, increment_literal, negate_literal, not_literal, is_true
 from runtime.evaluate import _INTRINSIC_VALUE_TYPES
 
 from interpreter.modifytree import TreeModifier
@@ -63,6 +64,7 @@ _fixupNodeTypeMappings = {
     'Int': VALUE_NODE,
     'List': 'convert_tuples',
     'Literal': VALUE_NODE,
+    'Memo': UNARY_NODE,
     'NamedTuple': SEQUENCE_NODE,
     'Node': DEFAULT_NODE,
     'Percent': VALUE_NODE,
@@ -87,7 +89,8 @@ _fixupNodeTypeMappings = {
 # parameter lists with TK.ASSIGN -> TK.TUPLE
 # :<assignment> -> :<parameter_list>(<assign>)
 # symbol scoping
-# constant expression elimination
+# constant expression elimination: operators over literals are folded with the runtime's dispatch tables
+# dead branch elimination: if with a literal test -> the branch taken
 #
 
 class Fixups(TreeModifier, ABC):
@@ -157,7 +160,7 @@ class Fixups(TreeModifier, ABC):
     def process_binops(self, node, label=None):
         rnode = self.visit_binary_node(node, label)
         if node is not None:
-            tkid = node.token.id
+            tkid = node.tid
             if isinstance(node, FnCall) and node.ref.name == 'range':
                 rnode = Generate(TK.RANGE, items=node.right, loc=node.token.location)
                 rnode.parent = node.parent
@@ -170,8 +173,9 @@ class Fixups(TreeModifier, ABC):
                 return self.convert_coln_plist(node, label)
             if isinstance(node.left, Literal) and isinstance(node.right, Literal):
                 if is_supported_binop(node.op):
-                    rnode = _fixup_binary_operation(rnode)
-                    rnode = _lift(rnode, to_lit(rnode.value, other=rnode))
+                    folded, value = _fold_binary_operation(rnode)
+                    if folded:
+                        rnode = _lift(rnode, to_lit(value, other=rnode))
         return rnode
 
     def process_command(self, node, label=None):
@@ -187,13 +191,10 @@ class Fixups(TreeModifier, ABC):
 
     def process_trinops(self, node, label=None):
         rnode = self.visit_trinary_node(node, label)
-        if node is not None:
-            tkid = node.token.id
-            # this would translate the 'if' into a statement if the test reduces to a literal
-            if isinstance(node.test, Literal):
-                # rnode = _fixup_binary_operation(rnode)
-                # rnode = _lift(rnode, Literal.lit(rnode.value, other=rnode))
-                pass
+        if isinstance(rnode, IfThenElse) and isinstance(rnode.test, Literal):
+            branch = rnode.then if is_true(c_unbox(rnode.test), tid=None) else rnode.els
+            if branch is not None:      # an if without else leaves its test's value when false
+                rnode = _lift(rnode, branch)
         return rnode
 
     def process_unops(self, node, label=None):
@@ -255,33 +256,24 @@ def _fixup_coln_plist(node, target):
     return plist
 
 
-# no identifiers
-def _fixup_binary_operation(node):
-    op = node.op
+# no identifiers.  returns (True, the operation's value), or (False, None) when the operation is left to run time: the
+# operator is invalid for the operands' types or evaluating it fails, the error is reported when the operation runs
+def _fold_binary_operation(node):
     l_value = node.left.value
-    l_ty = type(l_value).__name__
     r_value = node.right.value
-    r_ty = type(r_value).__name__
-
     if l_value is None or r_value is None:
-        return node
-
-    if l_ty not in _INTRINSIC_VALUE_TYPES or r_ty not in _INTRINSIC_VALUE_TYPES:
-        return node
-
-    node.value = eval_binops_dispatch_fixup(node)
-    return node
+        return True, None
+    if type(l_value).__name__ not in _INTRINSIC_VALUE_TYPES or type(r_value).__name__ not in _INTRINSIC_VALUE_TYPES:
+        return True, None
+    lookup = binops_dispatch_fn if node.op in _binops_dispatch_table else boolean_dispatch_fn
+    fn = lookup(node.op, type(l_value), type(r_value))
+    if fn is None or fn.__name__.startswith('_invalid_'):
+        return False, None
+    try:
+        return True, fn(l_value, r_value)
+    except (FocalError, ArithmeticError, TypeError, ValueError):
+        return False, None
 
 
 def is_supported_binop(op):
     return op in _binops_dispatch_table or op in _boolean_dispatch_table
-
-
-def eval_binops_dispatch_fixup(node):
-    if node is None:
-        return None
-    if node.op in _binops_dispatch_table:
-        return eval_binops_dispatch(node, node.left, node.right)
-    if node.op in _boolean_dispatch_table:
-        return eval_boolean_dispatch(node, node.left, node.right)
-    return node.value
\ No newline at end of file
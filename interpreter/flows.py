@@ -0,0 +1,94 @@
+# flows (a | b | c ...) planned once per run: consecutive stages calling an intrinsic that has a kernel
+# (runtime/kernels.py) on the value piped in are fused into one pass over the DataFrame's values.  a DataFrame is built
+# at the end of each run of stages, before the stage naming a sink, printing or calling anything else.
+
+from runtime.conversion import c_unbox
+from runtime.environment import Environment
+from runtime.intrinsics import IntrinsicFunction
+from runtime.kernels import floats, fusable, fuse, kernel, kernel_arguments, writes
+from runtime.literals import Literal
+from runtime.token_ids import TK
+from runtime.tree import FnCall, Ref
+
+from interpreter.cse import _arguments
+
+
+class FusedStages:
+    """
+    A run of consecutive flow stages calling intrinsics with kernels, each taking the value piped in as its DataFrame
+    and literals for its other arguments
+    """
+    __slots__ = ('stages', 'names', 'kernels', 'floats', 'copy')
+
+    def __init__(self):
+        self.stages = []
+        self.names = []
+        self.kernels = []   # [(kernel, args)]
+        self.floats = False
+        self.copy = False
+
+    def add(self, stage, name, args):
+        if not self.stages:
+            self.floats = floats(name)
+            self.copy = writes(name)
+        self.stages.append(stage)
+        self.names.append(name)
+        self.kernels.append((kernel(name), args))
+
+    def evaluate(self, stack, release=None):
+        """
+        returns the value of the stages for the value on top of stack, which is left there.  None if the stages can't
+        be fused for that value, or their names no longer are the intrinsics: the interpreter runs them one by one.
+        the kernels are run through release if given (see Interpreter.release)
+        """
+        scope = Environment.current.scope
+        for name in self.names:
+            if not isinstance(scope.find(name=name), IntrinsicFunction):
+                return None
+        if stack.is_empty():
+            return None
+        value = c_unbox(stack.peek())
+        if not fusable(value, self.floats):
+            return None
+        if release is not None:
+            return release(fuse, value, self.kernels, copy=self.copy)
+        return fuse(value, self.kernels, copy=self.copy)
+
+
+def plan_flow(stages):
+    """
+    returns the stages of a flow, with each run of stages that may be fused replaced by a FusedStages
+    """
+    plan = []
+    run = None
+    for stage in stages:
+        fused = _fused_stage(stage)
+        if fused is None:
+            run = None
+            plan.append(stage)
+            continue
+        if run is None:
+            run = FusedStages()
+            plan.append(run)
+        run.add(stage, *fused)
+    return plan
+
+
+def _fused_stage(stage):
+    """
+    returns (intrinsic name, kernel arguments) of a stage: `| delta`, or `| clipbefore(_, 1, 0, 1, 0)` with `_` for
+    the DataFrame and literals.  None for other stages
+    """
+    if type(stage) is Ref:
+        args = kernel_arguments(stage.name, [])
+        return None if args is None else (stage.name, args)
+    if type(stage) is not FnCall or not isinstance(stage.left, Ref):
+        return None
+    args = _arguments(stage)
+    if len(args) == 0 or not isinstance(args[0], Ref) or args[0].tid != TK.ANON:
+        return None
+    if not all([isinstance(arg, Literal) for arg in args[1:]]):
+        return None
+    name = stage.left.name
+    args = kernel_arguments(name, [c_unbox(arg) for arg in args[1:]])
+    return None if args is None else (name, args)
@@ -1,24 +1,43 @@
+from interpreter.compiler import ClosureInterpreter
 from interpreter.fixups import Fixups
+from interpreter.incremental import IncrementalParser
 from interpreter.interpreter import Interpreter
+from interpreter.parsecache import ParseCache
+from interpreter.vm import VirtualMachine
 from parser.parser import Parser
 from runtime.environment import Environment
 from runtime.exceptions import getLogFacility, runtime_error, runtime_warning
-from runtime.options import getOptions
+from runtime.options import getOptions, getOption
 
 
 _option_defaults = {
     'auto_listback': True,  # automatically show source after load
     'auto_parse': True,     # automatically parse upon load
     'auto_run': False,      # automatically run after parsing
+    'backend': 'tree',      # execution back end: 'tree' (tree walker), 'closure' (closures), 'vm' (bytecode)
+    'cse_size': 256,        # values of common subexpressions kept per run (interpreter/cse.py), 0: disabled
     'file': None,           # auto run a script file
     'force_errors': False,  # option_force_errors forces warnings into errors
+    'fuse_flows': True,     # run flow stages with kernels as one pass over a DataFrame's values (interpreter/flows.py)
+    'incremental': False,   # re-parse only the statements that changed since the previous parse
     'focal': None,          # HACK: be able to access Focal without circular imports
     'log_filename': './focal.log',
+    'memo_size': 128,       # results cached per memoized function (memo f(x) := ...)
+    'parse_cache': None,    # directory for cached parse trees (keyed by source hash and VERSION), None: disabled
     'print_tokens': False,
+    'shards': 1,            # processes running a program on shards of yahoo()'s symbols (interpreter/shards.py)
     'step_wise': False,     # console: run line by line (for test scripts)
+    'stream_tokens': False, # lex on demand through a bounded token window instead of up front
     'strict': False,        # option_strict forces variables to be defined before they are used
     'throw_errors': True,
     'verbose': False,
+    'workers': 1,           # threads running independent trees at once (interpreter/schedule.py), 1: trees in order
+}
+
+_backends = {
+    'closure': ClosureInterpreter,
+    'tree': Interpreter,
+    'vm': VirtualMachine,
 }
 
 
@@ -32,16 +51,53 @@ class Focal:
         self.option = getOptions('focal', options=options, defaults=_option_defaults)
         self.fixups = Fixups()
         self.parser = Parser()
-        self.interpreter = Interpreter()
+        self.interpreter = _backends[getOption('focal', 'backend', 'tree')]()
         self.environment = Environment()         # target environment
         self.logger.set_lines = self.environment.lines
         self.option.focal = self
+        self.incremental = IncrementalParser(self.parser, self.fixups)
+        self.incremental_scripts = IncrementalParser(self.parser)     # parse only, see parse_script
+        self.cache = None
 
     def parse(self, source):
         target = self.environment
-        self.environment = self.fixups.apply(self.parser.parse(target, source=source))
+        cache = self._get_cache()
+        if getOption('focal', 'incremental', False):
+            full = None if cache is None else lambda e, s: cache.parse(e, s, 'fixups', self._parse)
+            self.environment = self.incremental.parse(target, source, full=full)
+        elif cache is not None:
+            self.environment = cache.parse(target, source, 'fixups', self._parse)
+        else:
+            self.environment = self._parse(target, source)
         return self.environment
 
+    def parse_script(self, environment, source):
+        """
+        parse only (no fixups), as the console does for script files.  re-parses only the statements edited since the
+        last script parsed into environment, with the 'incremental' option
+        """
+        cache = self._get_cache()
+        if getOption('focal', 'incremental', False):
+            full = None if cache is None else lambda e, s: cache.parse(e, s, 'parse', self._parse_only)
+            return self.incremental_scripts.parse(environment, source, full=full)
+        if cache is not None:
+            return cache.parse(environment, source, 'parse', self._parse_only)
+        return self._parse_only(environment, source)
+
+    def _parse(self, environment, source):
+        return self.fixups.apply(self.parser.parse(environment, source=source))
+
+    def _parse_only(self, environment, source):
+        return self.parser.parse(environment, source=source)
+
+    def _get_cache(self):
+        directory = getOption('focal', 'parse_cache', None)
+        if directory is None:
+            return None
+        if self.cache is None or self.cache.directory != directory:
+            self.cache = ParseCache(directory)
+        return self.cache
+
     def run(self):
         try:
             target = self.environment
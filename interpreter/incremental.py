@@ -0,0 +1,212 @@
+from dataclasses import dataclass
+
+from parser.tokenstream import LazyTokenStream, TokenStream
+from runtime.exceptions import FocalError
+from runtime.token import Token
+from runtime.token_ids import TK
+from runtime.tree import AST, node_attributes
+
+_CONTEXT_CHUNKS = 2     # parser look-ahead is two tokens: re-parse this many unchanged chunks on each side of an edit
+
+
+@dataclass
+class _Chunk:
+    """
+    A run of source lines holding one or more complete statements.  No statement crosses a chunk boundary.
+    """
+    def __init__(self, first, last, trees):
+        self.first = first      # first source line
+        self.last = last        # last source line (inclusive)
+        self.trees = trees
+
+
+class IncrementalParser:
+    """
+    Incremental front end for the console: keeps the source lines and post-fixup trees of the previous parse and,
+    when the source is edited, re-lexes, re-parses and re-applies fixups to the changed statements only.  Trees for
+    unchanged statements are reused as-is in Environment.trees.  Without fixups the trees are those straight from the
+    parser, as the console runs script files.
+
+    Statement boundaries depend on at most two tokens of look-ahead, so the re-parsed region is widened by
+    _CONTEXT_CHUNKS unchanged chunks on each side and the boundary with the trailing reused chunks is verified.
+    Anything unexpected falls back to a full parse.
+    """
+    def __init__(self, parser, fixups=None):
+        self.parser = parser
+        self.fixups = fixups
+        self.full = None
+        self._reset()
+
+    def parse(self, environment, source, full=None):
+        """
+        returns environment holding the trees for source.  environment must hold the trees of the previous parse for
+        them to be reused, else the source is parsed in full: by full(environment, source) if given (the parse cache)
+        """
+        self.full = full
+        lines = source.split('\n')      # the lexer counts lines on '\n' only
+        if self.chunks is None or environment.trees is not self.trees:
+            return self._parse_full(environment, source, lines)
+        if lines == self.lines:
+            environment.set(source=source, tokens=environment.tokens, trees=self.trees, current=True)
+            self.trees = environment.trees
+            return environment
+        try:
+            return self._parse_changes(environment, source, lines)
+        except Exception:
+            self._reset()
+            raise
+
+    def _reset(self):
+        self.source = None
+        self.lines = None
+        self.chunks = None
+        self.trees = None
+        self.reparsed = 0   # lines re-parsed by the last parse (instrumentation)
+
+    def _parse_full(self, environment, source, lines):
+        self._reset()
+        if self.full is not None:
+            environment = self.full(environment, source)
+            tokens = LazyTokenStream(source)    # the trees may come from the cache, not the parser
+            tokens.seek(0, TokenStream.SEEK.TAIL)
+        else:
+            environment = self._parse(environment, source)
+            tokens = self.parser.tokens
+        chunks = _build_chunks(environment.trees) if _lines_match(tokens, source) else None
+        self._commit(environment, source, lines, chunks, tokens=environment.tokens)
+        self.reparsed = len(lines)
+        return environment
+
+    def _parse_changes(self, environment, source, lines):
+        old = self.lines
+        p = _common_prefix(old, lines)
+        s = _common_suffix(old, lines, limit=min(len(old), len(lines)) - p)
+        old_end = len(old) - s
+        delta = len(lines) - len(old)
+
+        # chunks[:k] end before the edit, chunks[j:] start after it; chunks[k:j] overlap it.
+        chunks = self.chunks
+        n = len(chunks)
+        k = 0
+        while k < n and chunks[k].last < p:
+            k += 1
+        j = k
+        while j < n and chunks[j].first < max(old_end, p):
+            j += 1
+        lo = max(0, k - _CONTEXT_CHUNKS)
+        hi = min(n, j + _CONTEXT_CHUNKS)
+        first = 0 if lo == 0 else chunks[lo].first
+        end = len(lines) if hi == n else chunks[hi - 1].last + 1 + delta
+
+        # pad with newlines so that token locations (and error carets) line up with the full source
+        fragment = '\n' * first + '\n'.join(lines[first:end])
+        if end < len(lines):
+            fragment += '\n'   # terminate a trailing comment as the following line would
+        try:
+            environment = self._parse(environment, fragment)
+        except FocalError:
+            return self._parse_full(environment, source, lines)     # the edit may open a statement closed further on
+        if not _lines_match(self.parser.tokens, fragment):
+            return self._parse_full(environment, source, lines)
+        reparsed = _build_chunks(environment.trees)
+        if reparsed is None or (j < hi and not _starts_chunk(reparsed, chunks[j].first + delta)):
+            return self._parse_full(environment, source, lines)
+
+        tail = chunks[hi:]
+        if delta != 0:
+            _shift_chunks(tail, delta)
+        self._commit(environment, source, lines, chunks[:lo] + reparsed + tail)
+        self.reparsed = end - first
+        return environment
+
+    def _parse(self, environment, source):
+        environment = self.parser.parse(environment, source=source)
+        return environment if self.fixups is None else self.fixups.apply(environment)
+
+    def _commit(self, environment, source, lines, chunks, tokens=None):
+        trees = environment.trees if chunks is None else [t for c in chunks for t in c.trees]
+        tokens = tokens if tokens is not None else LazyTokenStream(source)
+        environment.set(source=source, tokens=tokens, trees=trees, current=True)
+        self.source = source
+        self.lines = lines
+        self.chunks = chunks    # None: multi-line comments / strings, line spans unreliable, always parse in full
+        self.trees = environment.trees
+
+
+# -----------------------------------
+# helpers
+# -----------------------------------
+def _build_chunks(trees):
+    chunks = []
+    for t in trees:
+        if t.start is None:
+            return None
+        last = t.start + t.length - 1
+        if chunks and t.start <= chunks[-1].last:
+            chunks[-1].last = max(chunks[-1].last, last)
+            chunks[-1].trees.append(t)
+        else:
+            chunks.append(_Chunk(t.start, last, [t]))
+    return chunks
+
+
+def _starts_chunk(chunks, line):
+    for c in chunks:
+        if c.first == line:
+            return True
+    return False
+
+
+def _common_prefix(a, b):
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _common_suffix(a, b, limit):
+    i = 0
+    while i < limit and a[-1 - i] == b[-1 - i]:
+        i += 1
+    return i
+
+
+# the lexer only counts line breaks outside of comments and quoted strings: the statement line spans are only
+# usable when every '\n' in the source was counted.  (a comment running up to the end of the source counts one more.)
+# tokens is at the end of the source.
+def _lines_match(tokens, source):
+    tk = tokens.peek()
+    return tk.id == TK.EOF and tk.location.line >= source.count('\n')
+
+
+def _shift_chunks(chunks, delta):
+    moved = set()
+    for c in chunks:
+        for t in c.trees:
+            t.start += delta
+            _shift_locations(t.root, delta, c.first, c.last, moved)
+        c.first += delta
+        c.last += delta
+
+
+# moves the locations of the nodes in a tree by delta lines.  only locations inside the chunk's line span belong to
+# the source text: keyword and intrinsic tokens carry their own (0, 0) locations and values may be shared.
+def _shift_locations(root, delta, first, last, moved):
+    seen = set()
+    stack = [root]
+    while stack:
+        o = stack.pop()
+        if isinstance(o, AST):
+            if id(o) in seen:
+                continue
+            seen.add(id(o))
+            loc = o.location
+            if isinstance(loc, Token.Loc) and first <= loc.line <= last and id(loc) not in moved:
+                moved.add(id(loc))
+                loc.line += delta
+            stack.extend([v for k, v in node_attributes(o) if k not in ['parent', 'parent_scope']])
+        elif isinstance(o, (list, tuple)):
+            stack.extend(o)
+        elif isinstance(o, dict):
+            stack.extend(o.values())
@@ -1,4 +1,3 @@
-from copy import deepcopy
 from logging import getLogger
 
 from interpreter.version import VERSION
@@ -9,9 +8,10 @@ from runtime.environment import Environment
 from runtime.exceptions import getLogFacility
 from runtime.indexdict import IndexedDict
 from runtime.literals import Literal
-from runtime.options import getOptions
+from runtime.memo import MemoTable
+from runtime.options import getOptions, getOption
 from runtime.scope import Block, Scope, Object, FunctionBase
-from runtime.function import Function
+from runtime.function import Function, MemoFunction
 from runtime.token import Token
 from runtime.token_ids import TK
 from runtime.tree import Ref, Assign, Define, Generate, PropRef, ApplyChainProd
@@ -21,6 +21,11 @@ from runtime.evaluate import reduce_value, evaluate_binary_operation, evaluate_u
     evaluate_set, reduce_get, reduce_propref, reduce_ref, update_ref
 from runtime.intrinsics import invoke_generator, tk2generator
 
+from interpreter.cse import CommonSubexpressions
+from interpreter.flows import FusedStages, plan_flow
+from interpreter.resolver import Resolver
+from interpreter.schedule import Scheduler
+from interpreter.shards import Shards
 from interpreter.visitor import TreeFilter
 
 
@@ -47,6 +52,7 @@ _PROCESS_CONDITIONAL = 'process_conditional'
 _PROCESS_INDEX = 'process_index'
 _PROCESS_INDEX_SET = 'process_index_set'
 _PROCESS_LIST = 'process_list_object'
+_PROCESS_MEMO = 'process_memo'
 _PROCESS_PROPCALL = 'process_propcall'
 _PROCESS_PROPREF = 'process_propref'
 _PROCESS_PROPSET = 'process_propset'
@@ -93,6 +99,7 @@ _interpreterVisitNodeMappings = {
     'Int': _VISIT_LITERAL,
     'List': _PROCESS_LIST,
     'Literal': _VISIT_LITERAL,
+    'Memo': _PROCESS_MEMO,
     'NamedTuple': _PROCESS_SET,
     'Node': _VISiT_LEAF,
     'Percent': _VISIT_LITERAL,
@@ -120,6 +127,12 @@ class Interpreter(TreeFilter):
         m = dict(_interpreterVisitNodeMappings if mapping is None else mapping)
         super().__init__(mapping=m, apply_parent_fixups=True)
         self.stack = None
+        self.common = {}            # id(node) -> Common, see process_common
+        self.common_values = None   # values of common subexpressions in this run
+        self.flows = None           # id(Flow) -> (Flow, plan) when flows are fused, see process_flow
+        self.schedule = None        # runs independent trees at once, see interpreter/schedule.py
+        self.shards = None          # runs a program on shards of a quote panel's symbols, see interpreter/shards.py
+        self.release = None         # runs a pure computation without the interpreter lock, in trees run at once
         self.option = getOptions('focal')
         self.logger = getLogFacility('focal')
         self.version = VERSION
@@ -130,13 +143,26 @@ class Interpreter(TreeFilter):
             return None
         assert environment.trees is not None, "empty trees passed via Environment to apply"
 
-        for t in environment.trees:
-            v = self.visit(t.root)
-            if v is None:
-                v = self.stack.peek()
-            t.values = v
+        self.run_trees(environment.trees)
         return environment
 
+    def run_trees(self, trees):
+        if self.shards is not None and self.shards.run(self, trees):
+            return
+        if self.schedule is not None:
+            return self.schedule.run(self, trees)
+        for t in trees:
+            t.values = self.run_tree(t)
+
+    def run_tree(self, t):
+        """
+        returns the value of tree t, left on the stack
+        """
+        v = self.visit(t.root)
+        if v is None:
+            v = self.stack.peek()
+        return v
+
     # default
     def visit_node(self, node, label=None):
         self.unbox_node(node, label)
@@ -179,22 +205,23 @@ class Interpreter(TreeFilter):
         self.process_binop(node, label)
 
     def process_binop(self, node, label=None):
+        if self.common and id(node) in self.common:
+            return self.process_common(node, self._process_binop)
+        self._process_binop(node)
+
+    def _process_binop(self, node):
         self._print_node(node)
         self.indent()
         self.visit(node.right)
         self.visit(node.left)
         self.dedent()
-        l_value = self.stack.pop()
-        r_value = self.stack.pop()
-        l_value = evaluate_binary_operation(node, l_value, r_value)
-        self.stack.push(l_value)
+        r_value, l_value = self.stack.pop2()
+        self.stack.push(evaluate_binary_operation(node, l_value, r_value))
 
     # Block
     def process_block(self, node, label=None):
         self._print_node(node)
-        block = Block(loc=node.token.location)
-        scope = Scope(other=block)
-        restore = Environment.enter(scope)
+        restore = Environment.enter(Scope(members={}))     # the scope of an empty Block
         value = self._process_sequence(node)    # UNDONE: likely don't want to evaluate the block, just push it.
         Environment.leave(restore)
         if value is not None:
@@ -310,35 +337,80 @@ class Interpreter(TreeFilter):
         if values is None:
             self.stack.push(node)
         else:
-            for idx in range(0, len(values)):
-                n = values[idx]
-                if n is None:
-                    continue
-                if isinstance(n, ApplyChainProd):
-                    n = n.left
-                if isinstance(n, Ref):
-                    symbol = Environment.current.scope.find(name=n.name)
-                    if symbol is not None:
-                        if isinstance(symbol, FunctionBase):
-                            self.evaluate_invoke(n.name, symbol)
-                        else:
-                            self.stack.push(symbol)
-                    else:
-                        result = self.stack.pop()
-                        var = reduce_ref(ref=n, value=result, update=True)
-                        self.stack.push(var)
-                elif isinstance(n, PropRef):
-                    self.visit(n)
-                    var = self.stack.pop()
-                    result = self.stack.pop()
-                    var.value = result
-                    self.stack.push(var)
-                else:
-                    self.visit(n)
+            for step in self._flow_plan(node, values):
+                if isinstance(step, FusedStages):
+                    self._process_fused(step)
+                elif step is not None:
+                    self._process_stage(step)
         self.dedent()
 
+    def _flow_plan(self, node, values):
+        if self.flows is None:
+            return values
+        plan = self.flows.get(id(node))
+        if plan is None or plan[0] is not node:
+            plan = self.flows[id(node)] = (node, plan_flow(values))
+        return plan[1]
+
+    # stages with kernels run as one pass over the values piped in, one by one for values kernels don't take
+    def _process_fused(self, step):
+        value = step.evaluate(self.stack, self.release)
+        if value is None:
+            for n in step.stages:
+                self._process_stage(n)
+            return
+        for n in step.stages:
+            self._print_node(n)
+        self.stack.pop()
+        self.stack.push(value)
+
+    def _process_stage(self, n):
+        if isinstance(n, ApplyChainProd):
+            n = n.left
+        if isinstance(n, Ref):
+            symbol = Environment.current.scope.find(name=n.name)
+            if symbol is not None:
+                if isinstance(symbol, FunctionBase):
+                    self.evaluate_invoke(n.name, symbol)
+                else:
+                    self.stack.push(symbol)
+            else:
+                result = self.stack.pop()
+                var = reduce_ref(ref=n, value=result, update=True)
+                self.stack.push(var)
+        elif isinstance(n, PropRef):
+            self.visit(n)
+            var = self.stack.pop()
+            result = self.stack.pop()
+            var.value = result
+            self.stack.push(var)
+        else:
+            self.visit(n)
+
+    # a pure expression found more than once in the program (see interpreter/cse.py), evaluated by process(node)
+    # once for the values it reads
+    def process_common(self, node, process):
+        common = self.common[id(node)]
+        key = common.value_key(self)
+        if key is None:
+            return process(node)
+        found, value = self.common_values.get(key)
+        if found:
+            self._print_node(node)
+            if common.anon:
+                self.stack.pop()    # `_`, as the call would have
+            self.stack.push(value)
+            return
+        process(node)
+        self.common_values.put(key, self.stack.peek())
+
     # FnCall
     def process_fncall(self, node, label=None):
+        if self.common and id(node) in self.common:
+            return self.process_common(node, self._process_fncall)
+        self._process_fncall(node)
+
+    def _process_fncall(self, node):
         self._print_node(node)
         self.indent()
         self.visit(node.left)
@@ -350,6 +422,18 @@ class Interpreter(TreeFilter):
     def process_fnref(self, node, label=None):
         self.process_fncall(node, label)
 
+    # Memo
+    def process_memo(self, node, label=None):
+        self._print_node(node)
+        self.indent()
+        self.visit(node.expr)
+        fn = self.stack.pop()
+        self.dedent()
+        if not isinstance(fn, MemoFunction):
+            fn = MemoFunction(other=fn, size=getOption('focal', 'memo_size', None))
+            update_ref(name=fn.name, value=fn)
+        self.stack.push(fn)
+
     # Generator
     def process_generator(self, node, label=None):
         self._print_node(node)
@@ -524,19 +608,24 @@ class Interpreter(TreeFilter):
         result = fnode.invoke(self, args)
         self.stack.push(result)
 
+    def call_function(self, fn, fields, values):
+        """
+        runs Function fn in a frame holding its arguments, returns its value
+        """
+        restore = Environment.enter(fn.frame(fields, values))
+        self.visit(fn.code)
+        Environment.leave(restore)
+        return self.stack.pop()
+
     def reduce_parameters(self, scope=None, fn=None, args=None, define=False):
         _values = []
         _fields = []
-        _defaults = {}
         if scope is not None:
             restore = Environment.enter(scope)
         if fn is None:
             fn = scope
-        if hasattr(fn, 'defaults'):
-            if fn.defaults is not None:
-                _defaults = deepcopy(fn.defaults)
-                _fields = list(_defaults.keys())
-                _values = list(_defaults.values())
+        if getattr(fn, 'defaults', None) is not None:
+            _fields, _values = fn.default_arguments()
         if args is not None:
             if isinstance(args, Generate):
                 args = args.values()
@@ -575,8 +664,7 @@ class Interpreter(TreeFilter):
                                 name = ref.name
                         self._resolve(idx, name, c_unbox(val), _fields, _values)
         else:
-            for idx in range(0, fn.arity):
-                val = self.stack.pop()
+            for idx, val in enumerate(reversed(self.stack.popn(fn.arity))):   # the first argument is on top
                 self._resolve(idx, None, c_unbox(val), _fields, _values)
         if scope is not None:
             Environment.leave(restore)
@@ -604,12 +692,12 @@ class Interpreter(TreeFilter):
         values = []
         if items is None:
             return seq
-        for idx in range(0, len(items)):
-            n = items[idx]
+        visit, pop = self.visit, self.stack.pop
+        for n in items:
             if n is None:
                 continue
-            self.visit(n)
-            values.append(self.stack.pop())
+            visit(n)
+            values.append(pop())
         self.dedent()
         return values
 
@@ -619,6 +707,15 @@ class Interpreter(TreeFilter):
         self.keywords = self.environment.keywords
         self.globals = self.environment.globals
         self.stack = self.environment.stack
+        Resolver().apply(environment)
+        size = getattr(self.option, 'cse_size', None)    # None: the MemoTable default, as memo_size
+        self.common = CommonSubexpressions().apply(environment) if size != 0 else {}
+        self.common_values = MemoTable(size)
+        self.flows = {} if getattr(self.option, 'fuse_flows', True) else None
+        workers = getattr(self.option, 'workers', 1)
+        self.schedule = Scheduler(workers) if workers > 1 and not self.option.verbose else None
+        shards = getattr(self.option, 'shards', 1)
+        self.shards = Shards(shards) if shards > 1 and not self.option.verbose else None
 
     def _print_indented(self, message):
         if self.option.verbose:
@@ -628,6 +725,8 @@ class Interpreter(TreeFilter):
     def _print_node(self, node, label=None):
         op = ''
         self._count += 1
+        if not self.option.verbose:
+            return
         if hasattr(node, 'token'):
             tk = node.token.format()
         else:
@@ -0,0 +1,90 @@
+import gc
+import hashlib
+import os
+import pickle
+import sys
+import zlib
+
+from interpreter.version import VERSION
+from parser.tokenstream import LazyTokenStream
+
+_CACHE_EXTENSION = '.fc'
+_CACHE_MAGIC = b'FOCAL-TREES\x05'
+_RECURSION_LIMIT = 20000    # deeply nested trees need more than the default 1000 frames to pickle
+
+
+class ParseCache:
+    """
+    On-disk cache of parse trees, similar to __pycache__.  Entries are keyed by a hash of the interpreter VERSION,
+    the parse stage ('parse': trees straight from the parser, 'fixups': after Fixups) and the source text, so an
+    edited script or a new interpreter version simply misses.  Unreadable or stale entries are ignored and replaced.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, environment, source, stage, parse):
+        """
+        returns environment holding the trees for source, from the cache if possible, else from parse(environment,
+        source), which are then stored.
+        """
+        path = self._path(source, stage)
+        trees = self._load(path)
+        if trees is not None:
+            self.hits += 1
+            environment.set(source=source, tokens=LazyTokenStream(source), trees=trees, current=True)
+            return environment
+        self.misses += 1
+        environment = parse(environment, source)
+        self._store(path, environment.trees)
+        return environment
+
+    def _path(self, source, stage):
+        key = hashlib.sha256(f'{VERSION}:{stage}:'.encode() + source.encode()).hexdigest()
+        return os.path.join(self.directory, key + _CACHE_EXTENSION)
+
+    def _load(self, path):
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+        if not data.startswith(_CACHE_MAGIC):
+            return None
+        enabled = gc.isenabled()
+        gc.disable()    # unpickling allocates tens of thousands of nodes: collecting along the way costs more than the load
+        try:
+            with _recursion_limit(_RECURSION_LIMIT):
+                return pickle.loads(zlib.decompress(data[len(_CACHE_MAGIC):]))
+        except Exception:       # truncated or written by an incompatible build: parse again and overwrite
+            return None
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _store(self, path, trees):
+        try:
+            with _recursion_limit(_RECURSION_LIMIT):
+                data = _CACHE_MAGIC + zlib.compress(pickle.dumps(trees, protocol=pickle.HIGHEST_PROTOCOL))
+            os.makedirs(self.directory, exist_ok=True)
+            temp = f'{path}.{os.getpid()}'
+            with open(temp, 'wb') as file:
+                file.write(data)
+            os.replace(temp, path)     # atomic: concurrent runs never see a partial entry
+        except Exception:       # caching is best effort
+            pass
+
+
+class _recursion_limit:
+    def __init__(self, limit):
+        self.limit = limit
+        self.saved = None
+
+    def __enter__(self):
+        self.saved = sys.getrecursionlimit()
+        if self.saved < self.limit:
+            sys.setrecursionlimit(self.limit)
+
+    def __exit__(self, *args):
+        sys.setrecursionlimit(self.saved)
@@ -0,0 +1,210 @@
+# bind names to scope addresses ahead of execution
+
+from interpreter.visitor import NodeVisitor
+from runtime.indexdict import IndexedDict
+from runtime.scope import Address, Block
+from runtime.token_ids import TK
+from runtime.tree import AST, Assign, Generate, Get, Ref, _slot_names
+
+_RESOLVE_BLOCK = 'resolve_block'
+_RESOLVE_CALL = 'resolve_call'
+_RESOLVE_DEFINE = 'resolve_define'
+_RESOLVE_DEFINE_FN = 'resolve_define_fn'
+_RESOLVE_NAME = 'resolve_name'
+_RESOLVE_SET = 'resolve_set'
+
+_resolverNodeMappings = {
+    'Block': _RESOLVE_BLOCK,
+    'Define': _RESOLVE_DEFINE,
+    'DefineFn': _RESOLVE_DEFINE_FN,
+    'DefineVal': _RESOLVE_DEFINE,
+    'DefineValFn': _RESOLVE_DEFINE_FN,
+    'DefineVar': _RESOLVE_DEFINE,
+    'DefineVarFn': _RESOLVE_DEFINE_FN,
+    'Dict': _RESOLVE_SET,
+    'FnCall': _RESOLVE_CALL,
+    'FnRef': _RESOLVE_CALL,
+    'Get': _RESOLVE_NAME,
+    'NamedTuple': _RESOLVE_SET,
+    'Ref': _RESOLVE_NAME,
+    'Set': _RESOLVE_SET,
+}
+
+# members looked up in whatever object the left hand side evaluates to.  names in these are left to by-name lookup
+_DYNAMIC_MEMBERS = {
+    'IndexSet': ['member', 'right'],
+    'PropCall': ['member'],
+    'PropRef': ['right'],
+    'PropSet': ['member', 'right'],
+}
+_DYNAMIC_OPS = [TK.DEF, TK.REF]
+
+_NOT_CHILDREN = {'parent', 'parent_scope', '_token', 'tid', 'lexeme', 'location', '_num', 'op', 'name', 'address',
+                 'is_lvalue'}
+
+
+class Resolver(NodeVisitor):
+    """
+    Binds each Ref and Get to an Address ahead of execution.  The resolver follows the scopes the interpreter will
+    create (blocks, function calls, object definitions and sets) and addresses a name found in one of them by its
+    depth.  Names bound in none of them are addressed in the global or keyword scope, by slot.
+
+    Scoping is dynamic: a function body runs in a scope whose parent is the caller's.  Names bound outside the global
+    scope anywhere in the program are recorded in Environment.local_names, global addresses of those names are not
+    used (see find_symbol) and they are searched for by name from the current scope.
+    """
+    def __init__(self):
+        super().__init__(mapping=_resolverNodeMappings)
+        self.scopes = []        # names bound in each enclosing scope, innermost last
+        self.seen = set()
+        self.local_names = None
+        self.keyword_slots = None
+        self.global_slots = None
+
+    def apply(self, environment=None):
+        if environment is None:
+            return None
+        self.local_names = environment.local_names
+        self.keyword_slots = _slots(environment.keywords)
+        self.global_slots = _slots(environment.globals)
+        self.seen = set()
+        resolved = environment.resolved
+        for t in environment.trees:
+            if resolved.get(id(t.root)) is not t.root:     # trees are bound once, when first run
+                self.visit(t.root)
+        environment.resolved = {id(t.root): t.root for t in environment.trees}
+        return environment
+
+    def visit_node(self, node, label=None):
+        if id(node) in self.seen:
+            return
+        self.seen.add(id(node))
+        dynamic = _DYNAMIC_MEMBERS.get(type(node).__name__, [])
+        if getattr(node, 'op', None) in _DYNAMIC_OPS:
+            dynamic = ['right']
+        for key, value in _children(node):
+            if key in dynamic:
+                self._unresolve(value)
+            elif isinstance(value, AST):
+                self.visit(value)
+            elif isinstance(value, (list, tuple)):
+                self._visit_children(value)
+
+    def visit_list(self, items, label=None):
+        self._visit_children(items)
+
+    def resolve_block(self, node, label=None):
+        if id(node) in self.seen:
+            return
+        self.seen.add(id(node))
+        self.scopes.append(set())
+        self._visit_children(node.items())
+        self.scopes.pop()
+
+    def resolve_call(self, node, label=None):
+        args = node.right
+        if isinstance(args, Generate):
+            args = args.values()
+        if args is not None:
+            for idx in range(0, len(args)):     # named arguments are bound in the called function's scope
+                arg = args[idx]
+                if isinstance(arg, Assign) and isinstance(arg.left, Ref):
+                    self.local_names.add(arg.left.name)
+        self.visit_node(node, label)
+
+    def resolve_define(self, node, label=None):
+        if not isinstance(node.right, Block):
+            self.visit_node(node, label)
+            return
+        self.seen.add(id(node))
+        self.visit(node.left)
+        self.resolve_block(node.right)     # object definition: the block's definitions are made in the object
+
+    def resolve_define_fn(self, node, label=None):
+        self.seen.add(id(node))
+        self.visit(node.left)
+        self.scopes.append(set())   # the call's scope, holding the parameters
+        self._visit_children(node.args)
+        self._visit_children(node.right)
+        self.scopes.pop()
+
+    def resolve_set(self, node, label=None):
+        self.scopes.append(set())   # sets are evaluated in a scope of their own
+        self.visit_node(node, label)
+        self.scopes.pop()
+
+    def resolve_name(self, node, label=None):
+        if id(node) in self.seen:
+            return
+        self.seen.add(id(node))
+        if node.tid == TK.ANON:
+            node.address = None
+            return
+        name = node.name
+        for depth in range(0, len(self.scopes)):
+            if name in self.scopes[-1 - depth]:
+                node.address = Address(depth)
+                return
+        if self.scopes and not isinstance(node, Get):   # defined in the current scope
+            self.scopes[-1].add(name)
+            self.local_names.add(name)
+            node.address = Address(0)
+            return
+        node.address = self._global_address(name, is_global=len(self.scopes) > 0)
+
+    # -------------------
+    # helpers
+    # -------------------
+    def _global_address(self, name, is_global):
+        if name in self.keyword_slots:
+            return Address(1, self.keyword_slots[name], is_global)
+        return Address(0, self.global_slots.get(name), is_global)
+
+    def _visit_children(self, value):
+        if isinstance(value, AST):
+            self.visit(value)
+        elif isinstance(value, (list, tuple)):
+            if id(value) in self.seen:     # blocks hold their items under several names
+                return
+            self.seen.add(id(value))
+            for v in value:
+                if isinstance(v, AST):
+                    self.visit(v)
+                elif isinstance(v, (list, tuple)):
+                    self._visit_children(v)
+
+    def _unresolve(self, value):
+        stack = [value]
+        while stack:
+            o = stack.pop()
+            if isinstance(o, AST):
+                if id(o) in self.seen:
+                    continue
+                self.seen.add(id(o))
+                if isinstance(o, Ref):
+                    o.address = None
+                    self.local_names.add(o.name)
+                stack.extend([v for k, v in _children(o)])
+            elif isinstance(o, (list, tuple)):
+                stack.extend(o)
+
+
+def _slots(scope):
+    members = scope.members()
+    if not isinstance(members, IndexedDict):
+        return {}
+    return {k: idx for idx, k in enumerate(members.keys())}
+
+
+_child_slots = {}   # class -> slot names that may hold sub-trees
+
+
+def _children(node):
+    cls = type(node)
+    names = _child_slots.get(cls)
+    if names is None:
+        names = _child_slots[cls] = [k for k in _slot_names(cls) if k not in _NOT_CHILDREN]
+    items = [(k, getattr(node, k, None)) for k in names]
+    if hasattr(node, '__dict__'):
+        items.extend([(k, v) for k, v in vars(node).items() if k not in _NOT_CHILDREN])
+    return items
@@ -0,0 +1,493 @@
+# independent trees run at once: the names and properties each tree reads and writes (Ref, Get, PropRef) are found
+# ahead of the run, and trees are run by levels, each after the trees before it that it conflicts with.  the
+# interpreter runs one tree at a time, under a lock it lets go of while a pure intrinsic or fused flow computes, so the
+# pandas and numpy work of independent trees overlaps.  output and stack pushes are kept per tree and committed in the
+# trees' order.
+import copy
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from interpreter.cse import _arguments
+from interpreter.resolver import _DYNAMIC_OPS, _children
+from interpreter.visitor import NodeVisitor
+from runtime.exceptions import getLogFacility
+from runtime.intrinsics import IntrinsicFunction, is_pure_intrinsic
+from runtime.scope import Block, FunctionBase
+from runtime.stack import RuntimeStack
+from runtime.token_ids import TK
+from runtime.tree import AST, ApplyChainProd, Assign, Generate, PropRef, Ref
+
+_EFFECTS_CALL = 'effects_call'
+_EFFECTS_DEFINE = 'effects_define'
+_EFFECTS_FLOW = 'effects_flow'
+_EFFECTS_GET = 'effects_get'
+_EFFECTS_INDEX = 'effects_index'
+_EFFECTS_LITERAL = 'effects_literal'
+_EFFECTS_OPERATION = 'effects_operation'
+_EFFECTS_PROPREF = 'effects_propref'
+_EFFECTS_REF = 'effects_ref'
+_EFFECTS_SEQUENCE = 'effects_sequence'
+_EFFECTS_SLICE = 'effects_slice'
+_EFFECTS_UNARY = 'effects_unary'
+
+# nodes a tree run at once with others may hold.  any other node makes it a barrier, run on its own
+_effectsNodeMappings = {
+    'Assign': _EFFECTS_DEFINE,
+    'BinOp': _EFFECTS_OPERATION,
+    'Bool': _EFFECTS_LITERAL,
+    'Category': _EFFECTS_LITERAL,
+    'DateDiff': _EFFECTS_LITERAL,
+    'DateTime': _EFFECTS_LITERAL,
+    'Define': _EFFECTS_DEFINE,
+    'DefineVal': _EFFECTS_DEFINE,
+    'DefineVar': _EFFECTS_DEFINE,
+    'Duration': _EFFECTS_LITERAL,
+    'Enumeration': _EFFECTS_LITERAL,
+    'Float': _EFFECTS_LITERAL,
+    'Flow': _EFFECTS_FLOW,
+    'FnCall': _EFFECTS_CALL,
+    'Generate': _EFFECTS_SEQUENCE,
+    'GenerateRange': _EFFECTS_SEQUENCE,
+    'Get': _EFFECTS_GET,
+    'Index': _EFFECTS_INDEX,
+    'Int': _EFFECTS_LITERAL,
+    'List': _EFFECTS_SEQUENCE,
+    'Literal': _EFFECTS_LITERAL,
+    'Percent': _EFFECTS_LITERAL,
+    'PropRef': _EFFECTS_PROPREF,
+    'Ref': _EFFECTS_REF,
+    'Slice': _EFFECTS_SLICE,
+    'Str': _EFFECTS_LITERAL,
+    'Time': _EFFECTS_LITERAL,
+    'Tuple': _EFFECTS_SEQUENCE,
+    'UnaryOp': _EFFECTS_UNARY,
+}
+
+_OUTPUT_INTRINSICS = {'print'}      # impure for their output only, which is kept per tree
+
+_FUNCTION = 'function'      # a focal function: it may read or write anything
+_INTRINSIC = 'intrinsic'
+_VARIABLE = 'variable'      # bound before the tree runs
+_UNBOUND = 'unbound'
+
+_FN_NODES = ['DefineFn', 'DefineValFn', 'DefineVarFn']
+_BINDING_NODES = ['Assign', 'Combine', 'Define', 'DefineVal', 'DefineVar'] + _FN_NODES
+
+
+class Effects:
+    """
+    The names and properties a tree reads and writes, as paths: ('close',) for `close`, ('close', 'sma10') for
+    `close.sma10`.  A barrier is run on its own, after every tree before it and before every tree after it
+    """
+    __slots__ = ('reads', 'writes', 'barrier')
+
+    def __init__(self):
+        self.reads = set()
+        self.writes = set()
+        self.barrier = False
+
+
+class TreeEffects(NodeVisitor):
+    """
+    Finds the Effects of each tree of a program, in order.  Names are told apart as the interpreter will find them
+    when the tree runs: from the global scope now, the names trees before it write and the functions the program
+    defines.  Anything that can't be told, or that may read or write what isn't found here (focal functions, impure
+    intrinsics, blocks, conditionals, `_` taken from the tree before), makes the tree a barrier.
+    """
+    def __init__(self, environment):
+        super().__init__(mapping=_effectsNodeMappings)
+        self.globals = environment.globals
+        self.functions = set()     # names bound to focal functions by the program
+        self.bound = set()         # names the program defines or assigns
+        self.written = set()       # paths written by the trees analysed so far
+        self.effects = None
+        self.anon = False          # `_` is the value piped into a flow stage
+
+    def apply(self, trees):
+        roots = [t.root for t in trees]
+        for root in roots:
+            self._bindings(root)
+        found = []
+        for root in roots:
+            self.effects = Effects()
+            self.anon = False
+            self.visit(root)
+            self.written.update(self.effects.writes)
+            found.append(self.effects)
+        return found
+
+    def visit_node(self, node, label=None):
+        self.effects.barrier = True
+
+    def effects_call(self, node, label=None):
+        if not isinstance(node.left, Ref) or not self._callable(node.left.name):
+            self.effects.barrier = True
+            return
+        for arg in _arguments(node):
+            if isinstance(arg, Assign) and isinstance(arg.left, Ref):
+                self._read(arg.left.name)      # a named argument: bound to None if it isn't, as `name` is
+                arg = arg.right
+            self.visit(arg)
+
+    def effects_define(self, node, label=None):
+        if node.op in _DYNAMIC_OPS or isinstance(node.right, Block):
+            self.effects.barrier = True
+            return
+        self.visit(node.right)
+        lefts = node.left.values() if isinstance(node.left, Generate) else [node.left]
+        for left in lefts:
+            path = self._path(left)
+            if path is None:
+                self.effects.barrier = True
+                return
+            if type(node) is Assign:
+                self.effects.reads.add(path)    # +=, ...
+            self._write(path)
+
+    def effects_flow(self, node, label=None):
+        stages = node.values()
+        if stages is None:
+            return
+        anon = self.anon
+        for idx, stage in enumerate(stages):
+            self.anon = idx > 0
+            if isinstance(stage, ApplyChainProd):
+                stage = stage.left
+            if isinstance(stage, Ref) and stage.tid != TK.ANON:
+                self._stage(stage.name, first=idx == 0)
+            elif isinstance(stage, PropRef):
+                path = self._path(stage)
+                if path is None or idx == 0:    # binds the value the tree before left
+                    self.effects.barrier = True
+                else:
+                    self._read(path[0])
+                    self._write(path)
+            else:
+                self.visit(stage)
+        self.anon = anon
+
+    def effects_get(self, node, label=None):
+        if node.tid == TK.ANON:
+            self._anon()
+            return
+        kind = self._kind(node.name)
+        if kind == _FUNCTION or (kind == _INTRINSIC and not self._callable(node.name)):
+            self.effects.barrier = True     # parameterless functions are called
+        elif kind != _INTRINSIC:
+            self._read(node.name)
+
+    def effects_index(self, node, label=None):
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def effects_literal(self, node, label=None):
+        pass
+
+    def effects_operation(self, node, label=None):
+        if node.op in _DYNAMIC_OPS:
+            self.effects.barrier = True
+            return
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def effects_propref(self, node, label=None):
+        path = self._path(node)
+        if path is None:
+            self.effects.barrier = True
+            return
+        self.effects.reads.add(path)
+
+    def effects_ref(self, node, label=None):
+        if node.tid == TK.ANON:
+            self._anon()
+        elif self._kind(node.name) in [_FUNCTION, _INTRINSIC]:
+            self.effects.barrier = True
+        else:
+            self._read(node.name)
+
+    def effects_sequence(self, node, label=None):
+        values = node.values()
+        for value in values if values is not None else []:
+            if value is not None:
+                self.visit(value)
+
+    def effects_slice(self, node, label=None):
+        for value in [node.start, node.end, node.step]:
+            if value is not None:
+                self.visit(value)
+
+    def effects_unary(self, node, label=None):
+        self.visit(node.expr)
+
+    # -------------------
+    # helpers
+    # -------------------
+    def _anon(self):
+        if not self.anon:
+            self.effects.barrier = True     # `_` outside a flow stage is the value the tree before left
+
+    def _bindings(self, root):
+        stack = [root]
+        seen = set()
+        while stack:
+            o = stack.pop()
+            if isinstance(o, AST):
+                if id(o) in seen:
+                    continue
+                seen.add(id(o))
+                if type(o).__name__ in _BINDING_NODES:
+                    lefts = o.left.values() if isinstance(o.left, Generate) else [o.left]
+                    names = [left.name for left in lefts if isinstance(left, Ref)]
+                    self.bound.update(names)
+                    right = o.right
+                    if type(o).__name__ in _FN_NODES or (isinstance(right, Ref) and right.name in self.functions):
+                        self.functions.update(names)
+                stack.extend([v for k, v in _children(o)])
+            elif isinstance(o, (list, tuple)):
+                stack.extend(o)
+
+    def _callable(self, name):
+        return self._kind(name) == _INTRINSIC and (is_pure_intrinsic(name) or name in _OUTPUT_INTRINSICS)
+
+    def _kind(self, name):
+        if name in self.functions:
+            return _FUNCTION
+        symbol = self.globals.find(name=name)
+        if isinstance(symbol, IntrinsicFunction):
+            return _FUNCTION if name in self.bound else _INTRINSIC
+        if isinstance(symbol, FunctionBase) or isinstance(getattr(symbol, 'value', None), FunctionBase):
+            return _FUNCTION
+        if symbol is not None or (name,) in self.written:
+            return _VARIABLE
+        return _UNBOUND
+
+    def _path(self, node):
+        names = []
+        while isinstance(node, PropRef):
+            if not isinstance(node.right, Ref) or node.right.tid == TK.ANON:
+                return None
+            names.append(node.right.name)
+            node = node.left
+        if not isinstance(node, Ref) or node.tid == TK.ANON:
+            return None
+        names.append(node.name)
+        return tuple(reversed(names))
+
+    def _read(self, name):
+        self.effects.reads.add((name,))
+
+    def _stage(self, name, first):
+        """
+        a flow stage naming name: calls a function, pushes a variable or binds the value piped in to it
+        """
+        kind = self._kind(name)
+        if kind == _FUNCTION or kind == _INTRINSIC:
+            if first or not self._callable(name):
+                self.effects.barrier = True
+        elif kind == _VARIABLE:
+            self._read(name)
+        elif first:
+            self.effects.barrier = True     # binds the value the tree before left
+        else:
+            self._write((name,))
+
+    def _write(self, path):
+        self.effects.writes.add(path)
+
+
+def plan_trees(environment, trees):
+    """
+    returns the indices of trees by levels, to run one level after another: the trees of a level conflict with none
+    of the others, each comes after the trees before it that it conflicts with.  barriers are alone in their level
+    """
+    levels = []
+    reads = {}      # name -> {path: level of its last reader}
+    writes = {}     # name -> {path: level of its last writer}
+    floor = 0
+    for idx, effects in enumerate(TreeEffects(environment).apply(trees)):
+        if effects.barrier:
+            level = len(levels)
+            floor = level + 1
+        else:
+            level = floor
+            for path in effects.reads:
+                level = max(level, _after(writes, path, _read_conflicts))
+            for path in effects.writes:
+                level = max(level, _after(writes, path, _conflicts), _after(reads, path, _write_conflicts))
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(idx)
+        for table, paths in [(reads, effects.reads), (writes, effects.writes)]:
+            for path in paths:
+                found = table.setdefault(path[0], {})
+                found[path] = max(found.get(path, level), level)
+    return levels
+
+
+class Scheduler:
+    """
+    Runs a program's trees on a pool of threads, a level of plan_trees at a time.  Each tree runs on a copy of the
+    interpreter with a stack of its own; its output (stdout, the log file) and what it leaves on the stack are
+    committed in the trees' order once the trees before it are, so they are those of a run in order, as is the order
+    of the global names the trees of a level bind.  The first
+    error in the trees' order is raised after its level: the trees of that level after it have run, later levels don't.
+    """
+    def __init__(self, workers):
+        self.workers = workers
+
+    def run(self, interpreter, trees):
+        levels = plan_trees(interpreter.environment, trees) if len(trees) > 1 else None
+        if levels is None or len(levels) == len(trees):
+            for t in trees:     # nothing to run at once
+                t.values = interpreter.run_tree(t)
+            return
+        lock = InterpreterLock(interpreter.environment)
+        runs = [None] * len(trees)
+        committed = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for level in levels:
+                if len(level) == 1 and level[0] == committed:
+                    t = trees[committed]
+                    t.values = interpreter.run_tree(t)
+                    committed += 1
+                    continue
+                for idx in level:
+                    runs[idx] = TreeRun(interpreter, trees[idx], lock)
+                lock.start()
+                try:
+                    list(pool.map(TreeRun.run, [runs[idx] for idx in level]))
+                finally:
+                    lock.stop()
+                    _bind_in_order(interpreter.environment.globals, [runs[idx] for idx in level])
+                while committed < len(trees) and runs[committed] is not None:
+                    runs[committed].commit(interpreter.stack)
+                    committed += 1
+
+
+class InterpreterLock:
+    """
+    Held by the tree running in the interpreter, which is given its scope, stack and output while it holds it
+    """
+    def __init__(self, environment):
+        self.lock = threading.Lock()
+        self.environment = environment
+        self.logger = getLogFacility('focal')
+        self.scope = None
+        self.stack = None
+        self.stdout = None
+        self.file = None
+        self.bound = 0      # global names bound when the lock was acquired
+
+    def start(self):
+        self.scope = self.environment.scope
+        self.stack = self.environment.stack
+        self.stdout = sys.stdout
+        self.file = self.logger.file
+
+    def stop(self):
+        self.environment.scope = self.scope
+        self.environment.stack = self.stack
+        sys.stdout = self.stdout
+        self.logger.file = self.file
+
+    def acquire(self, run):
+        self.lock.acquire()
+        self.bound = len(self.environment.globals.members())
+        self.environment.scope = run.scope
+        self.environment.stack = run.stack
+        sys.stdout = run.out
+        self.logger.file = run.log
+
+    def release(self, run):
+        run.scope = self.environment.scope
+        members = self.environment.globals.members()
+        run.bound.extend([members.key_at(slot) for slot in range(self.bound, len(members))])
+        sys.stdout = self.stdout
+        self.logger.file = self.file
+        self.lock.release()
+
+
+class TreeRun:
+    """
+    A tree run at once with others, on a copy of the interpreter
+    """
+    __slots__ = ('tree', 'interpreter', 'lock', 'scope', 'stack', 'out', 'log', 'error', 'bound')
+
+    def __init__(self, interpreter, tree, lock):
+        self.tree = tree
+        self.lock = lock
+        self.scope = interpreter.environment.scope
+        self.stack = RuntimeStack()
+        self.out = io.StringIO()
+        self.log = io.StringIO() if lock.logger.file is not None else None
+        self.error = None
+        self.bound = []         # global names the tree bound, in order
+        self.interpreter = copy.copy(interpreter)
+        self.interpreter.stack = self.stack
+        self.interpreter.release = self.release
+
+    def run(self):
+        self.lock.acquire(self)
+        try:
+            self.tree.values = self.interpreter.run_tree(self.tree)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.lock.release(self)
+
+    def release(self, fn, *args, **kwargs):
+        """
+        returns fn(*args, **kwargs), run without the lock: fn must only read its arguments
+        """
+        self.lock.release(self)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.lock.acquire(self)
+
+    def commit(self, stack):
+        sys.stdout.write(self.out.getvalue())
+        if self.log is not None:
+            self.lock.logger.file.write(self.log.getvalue())
+            self.lock.logger.flush()
+        stack.push_all(self.stack.popn(self.stack.depth()))
+        if self.error is not None:
+            raise self.error
+
+
+def _bind_in_order(scope, runs):
+    """
+    moves the names runs bound in scope to its end, in the runs' order, as running them in order binds them
+    """
+    names = [name for run in runs for name in run.bound]
+    members = scope.members()
+    symbols = [members[name] for name in names]
+    members.remove(names)
+    for name, symbol in zip(names, symbols):
+        members[name] = symbol
+
+
+def _after(table, path, conflicts):
+    """
+    returns the level after the last of the paths in table that path conflicts with, 0 if none
+    """
+    level = 0
+    for other, found in table.get(path[0], {}).items():
+        if conflicts(path, other):
+            level = max(level, found + 1)
+    return level
+
+
+def _conflicts(path, other):
+    n = min(len(path), len(other))
+    return path[:n] == other[:n]
+
+
+def _read_conflicts(read, written):
+    return _conflicts(read, written) and not (len(read) == 1 and len(written) > 1)    # members don't change a value
+
+
+def _write_conflicts(written, read):
+    return _read_conflicts(read, written)
@@ -0,0 +1,337 @@
+# per-symbol runs of a script over a wide quote panel: the trees up to the one loading the panel with yahoo() run here,
+# then the symbol columns of the panel's frames are split into shards and each shard runs the rest of the script in a
+# worker process, from the global scope the trees before yahoo() left, its yahoo() returning the shard's columns.  the
+# frames' values are put in shared memory once, columns contiguous, so a worker maps its shard's columns instead of
+# being sent a copy.  the per-symbol frames each shard is left with (close.sma10, signals, ...) are joined, in the
+# symbols' order, into the global scope here.  names still bound to the panel's frames (close, quotes.close, ...) are
+# sent back as the panel's keys, and bound here to the whole panel's frames.
+import contextlib
+import io
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from interpreter.resolver import _children
+from parser.parser import ParseTree
+from runtime.conversion import c_unbox
+from runtime.environment import Environment
+from runtime.exceptions import getLogFacility
+from runtime.options import getOptions
+from runtime.scope import FunctionBase, Scope
+from runtime.tree import AST, FnCall, Ref
+from runtime.yahoo import forget_panel, loaded_panel, use_panel
+
+_PANEL_FUNCTIONS = ['yahoo']    # intrinsics loading a panel, see runtime/yahoo.py use_panel
+_SHARED_KINDS = 'biuf'          # dtype kinds put in shared memory, other frames are sent to the workers pickled
+
+
+class Shards:
+    """
+    Runs a program loading a quote panel in shards of its symbols, on a pool of processes.  A program without a
+    yahoo() call isn't run here (run returns False).  The trees before the yahoo() call are run here only, and a
+    program whose global scope can't be sent to the workers then (a name bound to chunks read from a file, ...) is run
+    here in one process.  Each shard's output is written in the shards' order after they have all run; the first
+    error in that order is raised then.  Frames that aren't per-symbol (columns other than the shard's symbols:
+    counts, totals, ...) are the shard's own and aren't joined.
+    """
+    def __init__(self, shards, workers=None):
+        self.shards = shards
+        self.workers = min(shards, os.cpu_count() or 1) if workers is None else workers
+
+    def run(self, interpreter, trees):
+        last = _panel_tree(trees)
+        if last is None:
+            return False
+        forget_panel()
+        roots = pickle.dumps([t.root for t in trees[last:]], protocol=pickle.HIGHEST_PROTOCOL)   # before running them
+        for t in trees[:last]:
+            t.values = interpreter.run_tree(t)
+        scope = _pickle_scope(interpreter.environment.globals)
+        t = trees[last]
+        t.values = interpreter.run_tree(t)
+        panel = loaded_panel()
+        symbols = _symbols(panel)
+        if scope is None or symbols is None or len(symbols) < 2:
+            for t in trees[last + 1:]:      # nothing to split
+                t.values = interpreter.run_tree(t)
+            return True
+        bounds = _bounds(len(symbols), self.shards)
+        shared = {}
+        try:
+            frames = {}
+            for key, value in panel.items():
+                if isinstance(value, pd.DataFrame) and value.columns.equals(symbols) and value.dtypes.nunique() == 1 \
+                        and value.dtypes.iloc[0].kind in _SHARED_KINDS:
+                    shared[key], frames[key] = _share(value)
+            jobs = [ShardJob(roots, scope, type(interpreter), _options(), list(panel.keys()), frames,
+                             _panel_items(panel, frames, symbols, lo, hi), lo, hi) for lo, hi in bounds]
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(_run_shard, job) for job in jobs]
+                results = [f.exception() or f.result() for f in futures]
+        finally:
+            for shm in shared.values():
+                shm.close()
+                shm.unlink()
+        sinks = {}
+        for result, (lo, hi) in zip(results, bounds):
+            if isinstance(result, Exception):
+                raise result
+            sys.stdout.write(result[1])
+            for path, value in result[0].items():
+                sinks.setdefault(path, []).append((value, lo, hi))
+        _define_sinks(interpreter.environment.globals, _join_sinks(sinks, _panel_frames(panel), len(bounds)))
+        return True
+
+
+class SharedFrame:
+    """
+    A DataFrame whose values are in a shared memory block, columns contiguous
+    """
+    __slots__ = ('name', 'shape', 'dtype', 'index', 'columns')
+
+    def __init__(self, name, frame):
+        self.name = name
+        self.shape = frame.shape
+        self.dtype = frame.dtypes.iloc[0]
+        self.index = frame.index
+        self.columns = frame.columns
+
+    def attach(self, lo, hi):
+        """
+        returns (block, frame of columns lo:hi mapped from the block)
+        """
+        if sys.version_info >= (3, 13):
+            shm = SharedMemory(name=self.name, track=False)
+        else:       # registered again with the tracker of the forked worker's parent, which unregisters it on unlink
+            shm = SharedMemory(name=self.name)
+        values = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf, order='F')[:, lo:hi]
+        return shm, pd.DataFrame(values, index=self.index, columns=self.columns[lo:hi], copy=False)
+
+
+class ShardJob:
+    """
+    A shard's run: the program's trees from the yahoo() call on and the global scope before it (pickled), the
+    interpreter class and options to run them with, and its part of the panel: the panel's keys in order, SharedFrames
+    and the other panel items, cut to symbols lo:hi
+    """
+    __slots__ = ('roots', 'scope', 'backend', 'options', 'keys', 'frames', 'items', 'lo', 'hi')
+
+    def __init__(self, roots, scope, backend, options, keys, frames, items, lo, hi):
+        self.roots = roots
+        self.scope = scope
+        self.backend = backend
+        self.options = options
+        self.keys = keys
+        self.frames = frames
+        self.items = items
+        self.lo = lo
+        self.hi = hi
+
+
+def _run_shard(job):
+    """
+    runs in a worker: returns _find_sinks of the global scope, and the output
+    """
+    blocks = []
+    attached = {}
+    try:
+        for key, frame in job.frames.items():
+            shm, attached[key] = frame.attach(job.lo, job.hi)
+            blocks.append(shm)
+        panel = {key: attached[key] if key in attached else job.items[key] for key in job.keys}   # as unpacked
+        option = getOptions('focal', options=job.options)
+        option.update(job.options)
+        option.shards = 1
+        symbols = attached[next(iter(job.frames))].columns if job.frames else None
+        use_panel(panel)
+        out = io.StringIO()
+        logger = getLogFacility('focal', file=sys.stderr)   # the parent's, when forked: kept off its log file
+        file = logger.file
+        with contextlib.redirect_stdout(out), open(os.devnull, 'w') as logger.file:
+            try:
+                environment = Environment()
+                scope = pickle.loads(job.scope)
+                environment.keywords, environment.globals, environment.scope = scope.parent_scope, scope, scope
+                environment.set(trees=[ParseTree(root) for root in pickle.loads(job.roots)], current=True)
+                job.backend().apply(environment)
+            finally:
+                logger.file = file
+        return _find_sinks(environment.globals, symbols, _panel_frames(panel)), out.getvalue()
+    finally:
+        use_panel(None)
+        for shm in blocks:
+            try:
+                shm.close()
+            except BufferError:     # frames of the shard are still held: the mapping goes with the worker
+                pass
+
+
+# -------------------
+# helpers
+# -------------------
+def _bounds(count, shards):
+    """
+    returns [(lo, hi)] splitting count columns in shards as even as can be
+    """
+    edges = np.linspace(0, count, min(shards, count) + 1).astype(int)
+    return [(int(lo), int(hi)) for lo, hi in zip(edges[:-1], edges[1:])]
+
+
+def _define_sinks(scope, values):
+    """
+    binds each path to its frame in the scope, members (close.sma10) after the names they are members of.  a path to,
+    or through, a name bound to a plain value (the members of quotes, as yahoo() returned them) isn't bound
+    """
+    for path in sorted(values.keys(), key=lambda p: p.count('.')):
+        names = path.split('.')
+        target = scope
+        for name in names[:-1]:
+            target = target.define(name=name, local=True)
+            if not isinstance(target, Scope):
+                break
+        else:
+            symbol = target.find(name=names[-1], local=True)
+            if symbol is None or isinstance(symbol, Scope):
+                target.define(name=names[-1], value=values[path], local=True, update=True)
+
+
+def _find_sinks(scope, symbols, frames, prefix='', seen=None):
+    """
+    returns {path: frame} of the per-symbol frames in scope, the key instead of the frame for those still equal to
+    frames[key], the panel's frames as yahoo() returned them
+    """
+    seen = set() if seen is None else seen
+    sinks = {}
+    if symbols is None:
+        return sinks
+    members = scope.members()
+    for name in members.keys():
+        symbol = members[name]
+        if id(symbol) in seen or isinstance(symbol, FunctionBase):
+            continue
+        seen.add(id(symbol))
+        value = c_unbox(symbol)
+        if isinstance(value, pd.DataFrame) and len(value.columns) > 0 and value.columns.isin(symbols).all():
+            key = _panel_key(value, frames)
+            sinks[f'{prefix}{name}'] = value if key is None else key
+        if isinstance(symbol, Scope):
+            sinks.update(_find_sinks(symbol, symbols, frames, f'{prefix}{name}.', seen))
+    return sinks
+
+
+def _options():
+    option = getOptions('focal')
+    return {k: getattr(option, k) for k in option.keys() if k != 'focal'}   # 'focal' is the Focal instance
+
+
+def _pickle_scope(scope):
+    """
+    returns the global scope pickled, None if a value bound in it can't be
+    """
+    try:
+        return pickle.dumps(scope, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return None
+
+
+def _panel_items(panel, frames, symbols, lo, hi):
+    """
+    returns the panel items of symbols lo:hi that aren't in shared memory
+    """
+    names = set(symbols[lo:hi])
+    items = {}
+    for key, value in panel.items():
+        if key in frames:
+            continue
+        if isinstance(value, pd.DataFrame) and value.columns.equals(symbols):
+            value = value.iloc[:, lo:hi]
+        elif isinstance(value, dict):
+            value = {k: v for k, v in value.items() if k in names}      # first, last: per symbol
+        items[key] = value
+    return items
+
+
+def _join_sinks(sinks, frames, shards):
+    """
+    returns {path: frame} joining the shards' sinks, {path: [(frame or key of frames, lo, hi) by shard]}: the whole
+    panel's frame for a path every shard left equal to it
+    """
+    joined = {}
+    for path, values in sinks.items():
+        keys = set([v if isinstance(v, str) else None for v, lo, hi in values])
+        if len(values) == shards and len(keys) == 1 and None not in keys:
+            joined[path] = frames[keys.pop()]
+        else:
+            joined[path] = pd.concat([frames[v].iloc[:, lo:hi] if isinstance(v, str) else v for v, lo, hi in values],
+                                     axis=1)
+    return joined
+
+
+def _panel_frames(panel):
+    """
+    returns {key: frame} of the panel's items as yahoo() binds them: its frames, and its dicts by symbol (first, last)
+    as the one row frames of their Datasets
+    """
+    frames = {}
+    for key, value in panel.items():
+        if isinstance(value, dict):
+            value = pd.DataFrame(value, columns=list(value.keys()), index=[key])
+        if isinstance(value, pd.DataFrame):
+            frames[key] = value
+    return frames
+
+
+def _panel_key(value, frames):
+    """
+    returns the key of the frame in frames value is a copy of, None if there's none
+    """
+    for key, frame in frames.items():
+        if value.shape == frame.shape and value.columns.equals(frame.columns) and value.equals(frame):
+            return key
+    return None
+
+
+def _panel_tree(trees):
+    """
+    returns the index of the first tree calling a panel intrinsic, None if none does
+    """
+    for idx, t in enumerate(trees):
+        stack = [t.root]
+        seen = set()
+        while stack:
+            o = stack.pop()
+            if isinstance(o, AST):
+                if id(o) in seen:
+                    continue
+                seen.add(id(o))
+                if isinstance(o, FnCall) and isinstance(o.left, Ref) and o.left.name in _PANEL_FUNCTIONS:
+                    return idx
+                stack.extend([v for k, v in _children(o)])
+            elif isinstance(o, (list, tuple)):
+                stack.extend(o)
+    return None
+
+
+def _share(frame):
+    """
+    returns (block, SharedFrame) with the values of frame copied to a new shared memory block
+    """
+    values = frame.to_numpy()
+    shm = SharedMemory(create=True, size=max(values.nbytes, 1))
+    np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf, order='F')[:] = values
+    return shm, SharedFrame(shm.name, frame)
+
+
+def _symbols(panel):
+    if panel is None:
+        return None
+    close = panel.get('close')
+    if isinstance(close, pd.DataFrame):
+        return close.columns
+    frames = [v for v in panel.values() if isinstance(v, pd.DataFrame)]
+    return frames[0].columns if frames else None
@@ -41,6 +41,7 @@ _nodeTypeMappings = {
     'Int': VALUE_NODE,
     'List': SEQUENCE_NODE,
     'Literal': VALUE_NODE,
+    'Memo': UNARY_NODE,
     'NamedTuple': SEQUENCE_NODE,
     'Node': DEFAULT_NODE,
     'Percent': VALUE_NODE,
@@ -46,19 +46,33 @@ _defaultNodeTypeMappings = {
 }
 
 
+# (visitor class, mapping) -> {node class: (function, label)}, shared by every visitor instance with the same mapping
+_dispatch_caches = {}
+
+
 class NodeVisitor(object):
     def __init__(self, mapping=None):
         self.map2name = _defaultNodeTypeMappings if mapping is None else mapping
+        key = (type(self), tuple(self.map2name.items()) if self.map2name is not None else None)
+        self._dispatch = _dispatch_caches.setdefault(key, {})
 
     def visit(self, node):
         if node is not None:
-            label = type(node).__name__
-            method_name = f'{self.node2name(label)}'
-            visitor = getattr(self, method_name, None)
+            entry = self._dispatch.get(type(node))
+            if entry is None:
+                entry = self._resolve_visitor(type(node))
+            return entry[0](self, node, entry[1])
+
+    def _resolve_visitor(self, cls):
+        label = cls.__name__
+        method_name = f'{self.node2name(label)}'
+        visitor = getattr(type(self), method_name, None)
+        if visitor is None:
+            visitor = getattr(type(self), DEFAULT_NODE, None)
             if visitor is None:
-                method_name = DEFAULT_NODE
-                visitor = getattr(self, method_name, self.generic_visit)
-            return visitor(node, label)
+                visitor = type(self).generic_visit
+        entry = self._dispatch[cls] = (visitor, label)
+        return entry
 
     def generic_visit(self, node, label=None):
         raise Exception('No visit_{} method'.format(type(node).__name__))
@@ -0,0 +1,468 @@
+from dataclasses import dataclass
+
+from interpreter.compiler import _is_regular
+from interpreter.interpreter import Interpreter
+from runtime.conversion import c_unbox
+from runtime.environment import Environment
+from runtime.exceptions import runtime_strict_warning
+from runtime.function import Function
+from runtime.indexdict import IndexedDict
+from runtime.literals import Literal
+from runtime.scope import Block, Scope, Object, FunctionBase
+from runtime.token import Token
+from runtime.tree import Ref, Assign, Define, Generate
+
+from runtime.eval_unary import is_true
+from runtime.evaluate import BinaryOperation, evaluate_unary_operation, find_symbol, reduce_ref
+
+# opcodes.  instructions are (opcode, argument) pairs in a flat list of ints, arguments index Code.consts or Code.ops
+LOAD_CONST = 0          # push consts[arg]
+LOAD_NAME = 1           # push the symbol named by the Get node consts[arg], reducing parameterless functions
+REF_NAME = 2            # push the symbol for the Ref node consts[arg], defining it in the current scope if need be
+STORE_NAME = 3          # pop a value and assign it to the Ref node consts[arg], push the symbol
+BINARY_OP = 4           # pop left, pop right, push consts[arg].dispatch(left, right), a BinaryOperation
+UNARY_OP = 5            # pop a value, push the result of the UnaryOp node consts[arg]
+POP_TOP = 6
+JUMP = 7                # continue at ops[arg]
+POP_JUMP_IF_FALSE = 8   # pop a value, continue at ops[arg] if it is not true
+ENTER_BLOCK = 9         # enter a new scope for the Block consts[arg]
+LEAVE_BLOCK = 10
+CALL = 11               # pop arguments and function as described by consts[arg], push the result
+EVAL = 12               # run the tree walker on consts[arg], move its result from the RuntimeStack
+EXEC = 13               # run the tree walker on consts[arg], leaving the RuntimeStack as it is
+RUNTIME_PUSH = 14       # pop a value and push it onto the RuntimeStack
+RUNTIME_PEEK = 15       # push the top of the RuntimeStack
+RETURN_VALUE = 16       # pop a value and return it
+CHECK_FUNCTION = 17     # fail unless a function named consts[arg] is on top of the stack
+TAIL_CALL = 18          # CALL whose result is returned: the caller's frame is reused when that can't be observed
+
+_opnames = ['LOAD_CONST', 'LOAD_NAME', 'REF_NAME', 'STORE_NAME', 'BINARY_OP', 'UNARY_OP', 'POP_TOP', 'JUMP',
+            'POP_JUMP_IF_FALSE', 'ENTER_BLOCK', 'LEAVE_BLOCK', 'CALL', 'EVAL', 'EXEC', 'RUNTIME_PUSH', 'RUNTIME_PEEK',
+            'RETURN_VALUE', 'CHECK_FUNCTION', 'TAIL_CALL']
+_NO_ARGUMENT = [POP_TOP, LEAVE_BLOCK, RUNTIME_PUSH, RUNTIME_PEEK, RETURN_VALUE]
+
+# CALL argument kinds
+_ARG_POSITIONAL = 0     # value
+_ARG_NAMED = 1          # value, key
+_ARG_ASSIGNED = 2       # value, the name is reduced from the Ref node in the call descriptor
+
+_GEN_BINOP = '_gen_binop'
+_GEN_BLOCK = '_gen_block'
+_GEN_CONDITIONAL = '_gen_conditional'
+_GEN_DEFINE = '_gen_define'
+_GEN_FNCALL = '_gen_fncall'
+_GEN_GET = '_gen_get'
+_GEN_LITERAL = '_gen_literal'
+_GEN_REF = '_gen_ref'
+_GEN_RETURN = '_gen_return'
+_GEN_UNOP = '_gen_unop'
+
+# node types with a translation to instructions.  anything else is run through the tree walker (EVAL)
+_generatorNodeMappings = {
+    'Assign': _GEN_BINOP,
+    'BinOp': _GEN_BINOP,
+    'Block': _GEN_BLOCK,
+    'Bool': _GEN_LITERAL,
+    'Category': _GEN_LITERAL,
+    'DateDiff': _GEN_LITERAL,
+    'DateTime': _GEN_LITERAL,
+    'Define': _GEN_DEFINE,
+    'DefineChainProd': _GEN_BINOP,
+    'DefineVal': _GEN_DEFINE,
+    'DefineVar': _GEN_DEFINE,
+    'Duration': _GEN_LITERAL,
+    'Enumeration': _GEN_LITERAL,
+    'Float': _GEN_LITERAL,
+    'FnCall': _GEN_FNCALL,
+    'FnRef': _GEN_FNCALL,
+    'Get': _GEN_GET,
+    'IfThenElse': _GEN_CONDITIONAL,
+    'Index': _GEN_BINOP,
+    'Int': _GEN_LITERAL,
+    'Literal': _GEN_LITERAL,
+    'Percent': _GEN_LITERAL,
+    'Ref': _GEN_REF,
+    'Return': _GEN_RETURN,
+    'Str': _GEN_LITERAL,
+    'Time': _GEN_LITERAL,
+    'UnaryOp': _GEN_UNOP,
+}
+
+
+@dataclass
+class Code:
+    """
+    Compiled statement or function body: (opcode, argument) pairs and the constants they refer to.  Code holds no
+    references to the interpreter or the environment it was compiled for and can be pickled, e.g. into the parse
+    cache or to a worker process.
+    """
+    def __init__(self, name=None, ops=None, consts=None):
+        self.name = name
+        self.ops = [] if ops is None else ops
+        self.consts = [] if consts is None else consts
+
+    def __len__(self):
+        return len(self.ops) // 2
+
+    def disassemble(self):
+        lines = []
+        for pc in range(0, len(self.ops), 2):
+            op, arg = self.ops[pc], self.ops[pc + 1]
+            operand = f'{arg}' if op in [JUMP, POP_JUMP_IF_FALSE] else f'{arg} ({_format_const(self.consts[arg])})'
+            lines.append(f'{pc:5d} {_opnames[op]:18s} {operand if op not in _NO_ARGUMENT else ""}')
+        return '\n'.join(lines)
+
+
+class CodeGenerator:
+    """
+    Translates trees into Code.  Each node's instructions leave exactly one value on the operand stack.  Statements
+    and function bodies holding nodes with irregular stack effects (see _is_regular) are compiled to a single
+    instruction running the tree walker.  Calls whose value is the value of the function body are TAIL_CALLs.
+    """
+    def __init__(self):
+        self.code = None
+        self.common = {}        # Interpreter.common, nodes left to the tree walker
+        self._consts = None
+        self._tail = False      # the node being generated is in tail position
+
+    def statement(self, root):
+        """
+        returns Code for a tree root.  like Interpreter.apply it leaves the result on the RuntimeStack
+        """
+        self._begin(type(root).__name__)
+        if type(root).__name__ in _generatorNodeMappings and _is_regular(root):
+            self.generate(root)
+            self._emit(RUNTIME_PUSH)
+        else:
+            self._emit(EXEC, self._const(root))
+        self._emit(RUNTIME_PEEK)
+        self._emit(RETURN_VALUE)
+        return self._end()
+
+    def function(self, code, name=None):
+        """
+        returns Code for a function body
+        """
+        self._begin(name)
+        if _is_regular(code):
+            self.generate(code, tail=True)
+        else:
+            self._emit(EVAL, self._const(code))
+        self._emit(RETURN_VALUE)
+        return self._end()
+
+    def generate(self, node, tail=False):
+        method = _generatorNodeMappings.get(type(node).__name__)
+        if method is None or id(node) in self.common:     # common subexpressions are cached by the tree walker
+            self._emit(EVAL, self._const(node))
+            return
+        saved, self._tail = self._tail, tail
+        getattr(self, method)(node)
+        self._tail = saved
+
+    # -------------------
+    # translations
+    # -------------------
+    def _gen_literal(self, node):
+        self._emit(LOAD_CONST, self._const(node.value))
+
+    def _gen_get(self, node):
+        self._emit(LOAD_NAME, self._const(node))
+
+    def _gen_ref(self, node):
+        self._emit(REF_NAME, self._const(node))
+
+    def _gen_binop(self, node):
+        self.generate(node.right)
+        self.generate(node.left)
+        self._emit(BINARY_OP, self._const(BinaryOperation(node)))
+
+    def _gen_unop(self, node):
+        self.generate(node.expr)
+        self._emit(UNARY_OP, self._const(node))
+
+    def _gen_return(self, node):
+        self.generate(node.expr, tail=self._tail)
+
+    def _gen_conditional(self, node):
+        self.generate(node.test)
+        to_else = self._emit(POP_JUMP_IF_FALSE)
+        self.generate(node.then, tail=self._tail)
+        to_end = self._emit(JUMP)
+        self._patch(to_else)
+        self.generate(node.els, tail=self._tail)
+        self._patch(to_end)
+
+    def _gen_block(self, node):
+        items = [n for n in node.items() or [] if n is not None]
+        if not items:
+            self._emit(EVAL, self._const(node))
+            return
+        self._emit(ENTER_BLOCK, self._const(Block(loc=node.token.location)))
+        for item in items[:-1]:
+            self.generate(item)
+            self._emit(POP_TOP)
+        self.generate(items[-1], tail=self._tail)
+        self._emit(LEAVE_BLOCK)
+
+    def _gen_define(self, node):
+        left = node.left
+        if type(left) is not Ref or isinstance(node.right, Block):
+            self._emit(EVAL, self._const(node))
+            return
+        # the tree walker leaves the symbol it visits on the left on the RuntimeStack
+        self._emit(REF_NAME, self._const(left))
+        self._emit(RUNTIME_PUSH)
+        self.generate(node.right)
+        self._emit(STORE_NAME, self._const(left))
+
+    def _gen_fncall(self, node):
+        tail = self._tail
+        self.generate(node.left)
+        self._emit(CHECK_FUNCTION, self._const(node.left.name))    # before any argument is evaluated
+        args = node.right
+        if isinstance(args, Generate):
+            args = args.values()
+        kinds = []
+        for ref in args:
+            if isinstance(ref, Define):
+                self.generate(ref.right)
+                self.generate(ref.left)
+                kinds.append((_ARG_NAMED, None))
+            elif isinstance(ref, Assign):
+                self.generate(ref.right)
+                kinds.append((_ARG_ASSIGNED, ref.left))
+            elif isinstance(ref, Literal) or ref is None:
+                self._emit(LOAD_CONST, self._const(ref))
+                kinds.append((_ARG_POSITIONAL, None))
+            else:
+                self.generate(ref)
+                kinds.append((_ARG_POSITIONAL, None))
+        width = len(kinds) + len([k for k, _ in kinds if k == _ARG_NAMED])
+        self._emit(TAIL_CALL if tail else CALL, self._const((tuple(kinds), width)))
+
+    # -------------------
+    # emitting
+    # -------------------
+    def _begin(self, name):
+        self.code = Code(name=name)
+        self._consts = {}
+
+    def _end(self):
+        code = self.code
+        self.code = self._consts = None
+        return code
+
+    def _emit(self, op, arg=0):
+        pc = len(self.code.ops)
+        self.code.ops.extend((op, arg))
+        return pc
+
+    def _patch(self, pc):
+        self.code.ops[pc + 1] = len(self.code.ops)
+
+    def _const(self, value):
+        key = (type(value), value) if isinstance(value, (str, int, float, bool)) else id(value)
+        idx = self._consts.get(key)
+        if idx is None:
+            idx = self._consts[key] = len(self.code.consts)
+            self.code.consts.append(value)
+        return idx
+
+
+class VirtualMachine(Interpreter):
+    """
+    Bytecode back end.  Trees are compiled by CodeGenerator and run by a single dispatch loop with a private operand
+    stack.  The RuntimeStack sees the same pushes as under the tree walker, so the back ends are interchangeable.
+    Function bodies are compiled on their first call.
+
+    Calls to focal functions don't recurse in python: the caller's state is saved on a stack of frames and the loop
+    goes on with the function's code, so recursion depth is not bound by python's recursion limit.  A TAIL_CALL
+    reuses the caller's frame when the callee would see no difference (see _reusable), so tail recursive functions
+    run in constant space.
+    """
+    def __init__(self, mapping=None):
+        super().__init__(mapping)
+        self.generator = CodeGenerator()
+        self._compiled = {}     # id(node) -> (node, Code) for function bodies, keeps node alive while cached
+
+    def apply(self, environment=None):
+        if self.option.verbose:     # the node trace comes from the tree walker
+            return super().apply(environment)
+        self._init(environment)
+        if environment is None:
+            return None
+        assert environment.trees is not None, "empty trees passed via Environment to apply"
+
+        self.generator.common = self.common
+        self.run_trees(environment.trees)
+        return environment
+
+    def run_tree(self, t):
+        return self.run(self.generator.statement(t.root))
+
+    def compile(self, environment):
+        """
+        returns a list of Code, one per tree in environment
+        """
+        return [self.generator.statement(t.root) for t in environment.trees]
+
+    def compile_code(self, code, name=None):
+        entry = self._compiled.get(id(code))
+        if entry is None or entry[0] is not code:
+            entry = self._compiled[id(code)] = (code, self.generator.function(code, name))
+        return entry[1]
+
+    def call_function(self, fn, fields, values):
+        restore = Environment.enter(fn.frame(fields, values))
+        value = self.run(self.compile_code(fn.code, fn.name))
+        Environment.leave(restore)
+        return value
+
+    def run(self, code):
+        ops = code.ops
+        consts = code.consts
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        blocks = []
+        pc = 0
+        frames = []         # callers of the running function: (code, pc, operand stack, blocks, restore)
+        restore = None      # the scope to return to from the running function
+        while True:
+            op = ops[pc]
+            arg = ops[pc + 1]
+            pc += 2
+            if op == LOAD_NAME:
+                node = consts[arg]
+                symbol = find_symbol(Environment.current.scope, node)
+                if symbol is None:
+                    runtime_strict_warning(f'Symbol `{node.token.lexeme}` referenced before initialized',
+                                           loc=node.token.location)
+                elif isinstance(symbol, FunctionBase) and symbol.arity == 0:
+                    symbol = symbol.invoke(self)
+                push(symbol)
+            elif op == LOAD_CONST:
+                push(consts[arg])
+            elif op == BINARY_OP:
+                l_value = pop()
+                push(consts[arg].dispatch(l_value, pop()))
+            elif op == POP_JUMP_IF_FALSE:
+                if not is_true(c_unbox(pop()), tid=None):
+                    pc = arg
+            elif op == JUMP:
+                pc = arg
+            elif op == CHECK_FUNCTION:
+                assert stack[-1] is not None, f'Function {consts[arg]} is undefined'
+            elif op == CALL or op == TAIL_CALL:
+                fn, fields, values = self._arguments(consts[arg], stack)
+                if type(fn) is not Function:
+                    push(fn.invoke(self, IndexedDict(fields=fields, values=values)))
+                    continue
+                scope = fn.frame(fields, values)
+                if op == TAIL_CALL and frames and _reusable(Environment.current.scope, restore, scope):
+                    Environment.leave(restore)      # the running function's frame and blocks
+                    blocks = []
+                else:
+                    frames.append((code, pc, stack, blocks, restore))
+                    stack = []
+                    push = stack.append
+                    pop = stack.pop
+                    blocks = []
+                restore = Environment.enter(scope)
+                code = self.compile_code(fn.code, fn.name)
+                ops = code.ops
+                consts = code.consts
+                pc = 0
+            elif op == RETURN_VALUE:
+                if not frames:
+                    return pop()
+                value = pop()
+                Environment.leave(restore)
+                code, pc, stack, blocks, restore = frames.pop()
+                ops = code.ops
+                consts = code.consts
+                push = stack.append
+                pop = stack.pop
+                push(value)
+            elif op == UNARY_OP:
+                push(evaluate_unary_operation(consts[arg], pop()))
+            elif op == REF_NAME:
+                push(reduce_ref(ref=consts[arg]))
+            elif op == STORE_NAME:
+                push(reduce_ref(ref=consts[arg], value=pop(), update=True))
+            elif op == ENTER_BLOCK:
+                blocks.append(Environment.enter(Scope(other=consts[arg])))
+            elif op == LEAVE_BLOCK:
+                Environment.leave(blocks.pop())
+            elif op == POP_TOP:
+                pop()
+            elif op == RUNTIME_PUSH:
+                self.stack.push(pop())
+            elif op == RUNTIME_PEEK:
+                push(self.stack.peek())
+            elif op == EVAL:
+                self.visit(consts[arg])
+                push(self.stack.pop())
+            elif op == EXEC:
+                self.visit(consts[arg])
+            else:
+                assert False, f'Invalid opcode {op} at {pc - 2} in {code.name}'
+
+    # Interpreter.reduce_parameters with the arguments already evaluated onto the operand stack: pops the arguments and
+    # the function, returns the function and the fields and values of its arguments
+    def _arguments(self, call, stack):
+        kinds, width = call
+        items = stack[len(stack) - width:]
+        del stack[len(stack) - width:]
+        fn = stack.pop()
+        fields = []
+        values = []
+        if getattr(fn, 'defaults', None) is not None:
+            fields, values = fn.default_arguments()
+        pos = 0
+        for idx in range(0, len(kinds)):
+            kind, ref = kinds[idx]
+            value = c_unbox(items[pos])
+            pos += 1
+            key = None
+            if kind == _ARG_NAMED:
+                key = items[pos]
+                pos += 1
+                if isinstance(key, Object):
+                    key = key.name
+            elif kind == _ARG_ASSIGNED:
+                sym = reduce_ref(ref=ref)
+                if isinstance(sym, Object):
+                    key = sym.name
+                elif isinstance(sym, Token):    # tokens are keywords / intrinsics
+                    key = sym.lexeme
+                else:
+                    assert False, "Unexpected argument type in Define"
+            self._resolve(idx, key, value, fields, values)
+        return fn, fields, values
+
+
+# -----------------------------------
+# helpers
+# -----------------------------------
+def _reusable(scope, restore, frame):
+    # a tail call may replace the running function's frame when every scope dropped with it (the frame and the blocks
+    # entered since, up to restore) only holds names the new frame binds too: lookups can't tell the two apart
+    members = frame._members
+    while scope is not None and scope is not restore:
+        for k in scope._members.keys():
+            if k not in members:
+                return False
+        scope = scope.parent_scope
+    return scope is restore
+
+
+def _format_const(value):
+    if isinstance(value, BinaryOperation):
+        value = value.node
+    if isinstance(value, tuple):        # call descriptor
+        return f'{len(value[0])} args'
+    if hasattr(value, 'token'):
+        return f'{type(value).__name__} {value.token.format()}'
+    return f'{value!r}'
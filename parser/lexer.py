@@ -1,4 +1,6 @@
 import copy
+import re
+import sys
 from dataclasses import dataclass
 
 from parser import statedef as _
@@ -12,11 +14,40 @@ from runtime.token_ids import TK
 _MAX_TOKEN_LEN = 128
 
 
+# run scanners: for each scanning state, the set of ascii characters that are recorded and leave the state unchanged.
+# derived from the state tables so that the fast path cannot drift from cClass / tkState.
+def _build_run_scanners(states):
+    scanners = {}
+    for st in states:
+        chars = [chr(c) for c in range(1, 128) if _.tkState[st][_.cClass[c]] == st]
+        if chars:
+            scanners[int(st)] = re.compile('[' + ''.join(re.escape(c) for c in chars) + ']*')
+    return scanners
+
+
+_RUN_SCANNERS = _build_run_scanners([_.ST.IDNT, _.ST.INT, _.ST.FLOT, _.ST.WHT])
+
+# plain int copies of the tables and constants used in the fast path inner loop (IntEnum compares are slow)
+_cClass = [int(cc) for cc in _.cClass]
+_tkState = [[int(st) for st in row] for row in _.tkState]
+_ST_MAIN = int(_.ST.MAIN)
+_ST_MAX = int(_.ST.MAX)
+_CL_SPEC = int(_.CL.SPEC)
+_CL_DOT = int(_.CL.DOT)
+_TK_FLOT = int(TK.FLOT)
+_TK_INT = int(TK.INT)
+_TK_QUOT = int(TK.QUOT)
+_TK_SPEC = int(TK.SPEC)
+_TK_WHT = int(TK.WHT)
+_TK_EOL = int(TK.EOL)
+
+
 @dataclass
 class Lexer:
 
-    def __init__(self, source):
+    def __init__(self, source, fast=True):
         self.keywords = Keywords()
+        self.fast = fast    # scan identifier, number and whitespace runs in one step
         self._char = None
         self._chid = None
         self.head = 0
@@ -32,7 +63,7 @@ class Lexer:
     def __next__(self):
         if not self.has_more:
             raise StopIteration
-        tk = self._fetch()
+        tk = self._fetch_fast() if self.fast else self._fetch()
         if tk.id == TK.EOF:
             self.has_more = False
         return tk
@@ -91,6 +122,70 @@ class Lexer:
             self._has_more = False
         return tk
 
+    # same state machine as _fetch(), but identifier, number and whitespace runs are consumed with a single
+    # scan of the source, and lexemes are slices of the source rather than built up a character at a time.
+    def _fetch_fast(self):
+        fetch = False
+        tkState = _tkState
+        cClass = _cClass
+
+        while True:
+            lexeme = ""
+            cs = self._state = _ST_MAIN
+            while cs <= _ST_MAX:
+                c = self._chid
+                cc = _CL_SPEC if c > 127 else cClass[c]
+                cs = tkState[cs][cc]
+                if cs < 0:
+                    cs = -cs
+                    if cs == _TK_FLOT and cc == _CL_DOT:      # double-dot lex glob correction
+                        self.head -= 1
+                        lexeme = lexeme[:len(lexeme)-1]       # strip the '.' so we can reparse
+                        cs = _TK_INT
+                    fetch = (cs == _TK_QUOT) or (cs < _ST_MAX)
+                elif cs in _RUN_SCANNERS:
+                    lexeme += self._scan_run(_RUN_SCANNERS[cs])
+                    fetch = True
+                else:
+                    lexeme += self._char
+                    fetch = True
+                if fetch:
+                    fetch = False
+                    self.get_char()
+            self._state = cs
+            if cs == _TK_WHT:
+                continue
+            if cs == _TK_EOL:
+                self.location.line += 1
+                self.location.offset = 0
+                continue
+            break
+        tid = TK(self._chid) if cs == _TK_SPEC else TK(cs)
+        if cs != _TK_QUOT:
+            lexeme = sys.intern(lexeme)     # identifiers & operators repeat: share one string per spelling
+        # one Token and one Loc per token: keywords are copied from the keyword scope instead
+        if tid == TK.IDENT:
+            kw = self.keywords.find(name=lexeme, default=None)
+            if kw is None:
+                tk = Token(tid, tcl=TCL.IDENTIFIER, lex=lexeme, loc=Token.Loc(self.location.line, self.location.offset))
+            else:
+                tk = _copy_token(kw if isinstance(kw, Token) else kw.token)
+        else:
+            tk = Token(tid, lex=lexeme, loc=Token.Loc(self.location.line, self.location.offset)).remap2tclass()
+        self.token = tk
+        if tk.id == TK.EOF:
+            self._has_more = False
+        return tk
+
+    def _scan_run(self, scanner):
+        # consume the current character plus every following character that keeps the scanner in the same state.
+        # leaves head on the first character past the run, so the next get_char() fetches the terminator.
+        start = self.head - 1
+        end = scanner.match(self.source, self.head).end()
+        self.location.offset += end - self.head
+        self.head = end
+        return self.source[start:end]
+
     def _get_next_char(self):
         c = 0 if self.head >= self.length else ord(self.source[self.head])
         self.head += 1
@@ -106,3 +201,11 @@ class Lexer:
                 c = u16_to_tkid[c]
                 self._chid = c
         return c
+
+
+# equivalent to copy.deepcopy(tk) for the tokens produced by the lexer and found in the keyword scope
+def _copy_token(tk):
+    loc = tk.location
+    val = tk.value if tk.value is None else copy.deepcopy(tk.value)
+    return Token(tk.id, tcl=tk.t_class, lex=tk.lexeme, val=val, loc=Token.Loc(loc.line, loc.offset),
+                 reserved=tk.is_reserved)
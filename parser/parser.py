@@ -1,10 +1,10 @@
 from copy import copy
 from dataclasses import dataclass
 
-from parser.tokenstream import TokenStream
+from parser.tokenstream import TokenStream, LazyTokenStream
 from runtime.environment import Environment
 from runtime.exceptions import FocalError, getLogFacility
-from runtime.options import getOptions
+from runtime.options import getOptions, getOption
 from runtime.token_data import ADDITION_TOKENS, COMPARISON_TOKENS, FLOW_TOKENS, \
     EQUALITY_TEST_TOKENS, LOGIC_TOKENS, MULTIPLICATION_TOKENS, UNARY_TOKENS, IDENTIFIER_TYPES, ASSIGNMENT_TOKENS, \
     SET_UNARY_TOKENS, IDENTIFIER_TOKENS, IDENTIFIER_TOKENS_EX, ASSIGNMENT_TOKENS_REF, \
@@ -14,7 +14,7 @@ from runtime.token import Token
 from runtime.token_ids import TK
 from runtime.tree import UnaryOp, BinOp, Assign, Get, FnCall, Index, PropRef, Define, DefineFn, DefineVar, \
     DefineVarFn, ApplyChainProd, Ref, FnRef, Return, IfThenElse, Generate, Combine, GenerateRange, Slice, PropCall, \
-    PropSet, IndexSet
+    PropSet, IndexSet, Memo
 from runtime.scope import Block, Flow
 from runtime.function import Function
 from runtime.literals import Float, Int, Percent, Str, Bool, Literal
@@ -29,6 +29,8 @@ class ParseTree(object):
     def __init__(self, root, values=None, start=None, length=None):
         self.root = root
         self.values = values if values is not None else [root.value]
+        self.start = start      # first source line of the statement
+        self.length = length    # number of source lines spanned
 
 
 class Parser(object):
@@ -57,19 +59,24 @@ class Parser(object):
             tkid = self.peek().id
             if tkid == TK.EOF:
                 break
+            start = self.tokens.line()
             decl = self.declaration()
             tkid = self.peek().id
             if decl is not None:
                 decls = [decl] if type(decl).__name__ != "list" else decl
-                environment.trees += [ParseTree(_) for _ in decls]
+                length = self.tokens.line(-1) - start + 1
+                environment.trees += [ParseTree(_, start=start, length=length) for _ in decls]
             elif tkid != TK.EOF:  # decl is None
                 continue
-            if tkid == TK.EOF or decl.token.id == TK.EOF:
+            if tkid == TK.EOF or decl.tid == TK.EOF:
                 break
         return environment
 
     def _init(self, environment=None, source=None):
-        self.tokens = TokenStream(source=source)
+        if getOption('focal', 'stream_tokens', False):
+            self.tokens = LazyTokenStream(source=source)
+        else:
+            self.tokens = TokenStream(source=source)
         if environment is None:
             environment = Environment()
         environment.set(source=source, tokens=self.tokens, current=True)
@@ -84,6 +91,8 @@ class Parser(object):
                 return self.var()
             elif self.match1(TK.DEFINE):
                 return self.definition()
+            elif self.match1(TK.MEMO):
+                return self.memo()
             return self.statement()
         except FocalError as se:
             self.synchronize()
@@ -371,6 +380,14 @@ class Parser(object):
         self.logger.error(f"Invalid assignment target {l_expr}", op.location)
         return l_expr
 
+    def memo(self):
+        op = self.peek(-1)
+        l_expr = self.declaration()
+        if isinstance(l_expr, DefineFn) or isinstance(l_expr, DefineVarFn):
+            return Memo(token=op, expr=l_expr)
+        self.logger.error("memo expects a function definition", op.location)
+        return l_expr
+
     def var(self):
         l_expr = self.statement()  # l-value cannot include flows
         if isinstance(l_expr, Define):
@@ -454,7 +471,7 @@ class Parser(object):
             elif isinstance(decl, Assign):
                 if cid == TK.SET:
                     cid = TK.BLOCK
-            elif type(decl).__name__ in ['IfThenElse', 'Return', 'DefineFn', 'DefineVarFn', 'PropSet', 'Block', 'Flow', 'ApplyChainProd', 'Apply']:
+            elif type(decl).__name__ in ['IfThenElse', 'Return', 'DefineFn', 'DefineVarFn', 'Memo', 'PropSet', 'Block', 'Flow', 'ApplyChainProd', 'Apply']:
                 cid = TK.BLOCK
             if self.peek(-1).id in [TK.COLN]:  # declaration() eats the separator
                 cid = TK.DATAFRAME
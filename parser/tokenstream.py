@@ -1,3 +1,4 @@
+from collections import deque
 from dataclasses import dataclass
 from enum import IntEnum
 
@@ -5,6 +6,8 @@ from parser.lexer import Lexer
 from runtime.token import Token
 from runtime.token_ids import TK
 
+_DEFAULT_WINDOW = 64    # tokens retained for look-behind / seek in a LazyTokenStream
+
 
 @dataclass
 class TokenStream:
@@ -16,7 +19,7 @@ class TokenStream:
         TAIL = 3
 
     def __init__(self, source):
-        self.tokens = self._lex(source)
+        self.tokens, self.lines = self._lex(source)
         self.has_more = True
         self.location = Token.Loc.ZERO()
         self.length = len(self.tokens)
@@ -39,6 +42,13 @@ class TokenStream:
             return self.tokens[pos]
         return Token.EOF()
 
+    # the source line the token at rel was scanned on.  keyword tokens carry the keyword's own location.
+    def line(self, rel=0):
+        pos = self.pos + rel
+        if 0 <= pos < self.length:
+            return self.lines[pos]
+        return None
+
     def read1(self):
         if self.pos < self.length:
             t = self.tokens[self.pos]
@@ -59,7 +69,7 @@ class TokenStream:
             self.pos += rel
         elif whence == TokenStream.SEEK.TAIL:
             self.pos = self.length + rel - 1
-        elif whence == Lexer.SEEK.EOL:   # seek just past the next EOL (useful for sync)
+        elif whence == TokenStream.SEEK.EOL:   # seek just past the next EOL (useful for sync)
             while self.tokens[self.pos].id != TK.EOL:
                 self.pos += 1
                 if self.tokens[self.pos].id == TK.EOF:
@@ -83,5 +93,100 @@ class TokenStream:
 
     def _lex(self, source):
         lexer = Lexer(source)
-        tids = [tk for tk in lexer]
-        return tids
+        tids = []
+        lines = []
+        for tk in lexer:
+            tids.append(tk)
+            lines.append(lexer.location.line)
+        return tids, lines
+
+
+@dataclass
+class LazyTokenStream(TokenStream):
+    """
+    A TokenStream that pulls tokens from the Lexer on demand rather than lexing the whole source up front.
+    Only the most recent `window` tokens are retained, so peek(rel), seek() and tell() work within that window
+    (the parser needs one token of look-behind and one of look-ahead).  Token memory is constant in script size.
+    """
+    def __init__(self, source, window=_DEFAULT_WINDOW):
+        self.source = source
+        self.window = window
+        self.has_more = True
+        self.location = Token.Loc.ZERO()
+        self.pos = 0
+        self._start()
+
+    def peek(self, rel=0):
+        return self._token_at(self.pos + rel)
+
+    def line(self, rel=0):
+        pos = self.pos + rel
+        if self.base <= pos and self._fill(pos):
+            return self.lines[pos - self.base]
+        return None
+
+    def read1(self):
+        if self._fill(self.pos):
+            t = self.tokens[self.pos - self.base]
+            self.pos += 1
+            self.has_more = t == TK.EOF
+            return t
+        return Token.EOF()
+
+    def reset(self):
+        if self.base > 0:
+            self._start()       # the head of the stream has left the window: re-lex from the top
+        super().reset()
+
+    def seek(self, rel, whence=TokenStream.SEEK.HEAD):
+        if whence == TokenStream.SEEK.HEAD:
+            pos = rel
+        elif whence == TokenStream.SEEK.CURR:
+            pos = self.pos + rel
+        elif whence == TokenStream.SEEK.TAIL:
+            while self._fill(self.base + len(self.tokens)):
+                pass
+            pos = self.length + rel - 1
+        else:   # seek just past the next EOL (useful for sync)
+            pos = self.pos
+            while self._token_at(pos).id not in [TK.EOL, TK.EOF]:
+                pos += 1
+        if pos < self.base:
+            raise IndexError(f'seek to token {pos} is outside the buffered window ({self.base}..)')
+        self.pos = pos if self.length is None or pos <= self.length else self.length
+        self.has_more = self._token_at(self.pos).id != TK.EOF
+        return self.has_more
+
+    def _start(self):
+        self.tokens = deque(maxlen=self.window)
+        self.lines = deque(maxlen=self.window)
+        self.base = 0           # stream position of self.tokens[0]
+        self.length = None      # total number of tokens, known once the lexer is exhausted
+        self._scanner = Lexer(self.source)
+        self._lexer = iter(self._scanner)
+
+    # lex forward until the token at stream position `pos` is buffered.  returns False if the stream ends first.
+    def _fill(self, pos):
+        tokens = self.tokens
+        while pos >= self.base + len(tokens):
+            if self.length is not None:
+                return False
+            try:
+                t = next(self._lexer)
+            except StopIteration:
+                self.length = self.base + len(tokens)
+                return False
+            if len(tokens) == tokens.maxlen:
+                self.base += 1
+            tokens.append(t)
+            self.lines.append(self._scanner.location.line)
+        return True
+
+    def _token_at(self, pos):
+        if pos < 0:
+            return Token.EOF()
+        if pos < self.base:
+            raise IndexError(f'token {pos} is outside the buffered window ({self.base}..)')
+        if self._fill(pos):
+            return self.tokens[pos - self.base]
+        return Token.EOF()
@@ -0,0 +1,156 @@
+# DataFrames read in chunks of rows: read(..., chunksize=n) returns a Chunks, which the intrinsics below compute on
+# chunk by chunk, carrying the rows they need across chunk boundaries, so a flow from a file to write() holds one chunk
+# of each stage at a time.  any other function is given the chunks read into one DataFrame.
+import numpy as np
+import pandas as pd
+
+from runtime.kernels import fusable, k_clipbefore
+
+
+class Chunks:
+    """
+    A stream of DataFrames with the same columns, the rows of one DataFrame in order.  Stages are applied lazily as
+    the chunks are read.  Each read of the stream reads its source again (the file, for read()), so a symbol bound to
+    chunks can be used more than once.  symbols share a stream rather than copy it
+    """
+    __slots__ = ('_source', '_stages')
+    __hash__ = None     # not keyed by memo or common subexpressions, see memo.values_key
+
+    def __init__(self, source, stages=()):
+        self._source = source       # returns a new iterable of the chunks, for each read
+        self._stages = stages       # return a new stage, for each read
+
+    def __iter__(self):
+        chunks = iter(self._source())
+        for new_stage in self._stages:
+            chunks = map(new_stage(), chunks)
+        return chunks
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __str__(self):
+        return 'Chunks()'
+
+    def map(self, stage):
+        """
+        returns the stream of stage(chunk) for each chunk
+        """
+        return Chunks(self._source, self._stages + (lambda: stage,))
+
+    def scan(self, new_stage):
+        """
+        returns the stream of stage(chunk) for each chunk, stage = new_stage() keeping any state it needs from one
+        chunk to the next.  a new stage is made for each read of the stream
+        """
+        return Chunks(self._source, self._stages + (new_stage,))
+
+    def frame(self):
+        """
+        reads the chunks into one DataFrame
+        """
+        chunks = list(self)
+        return pd.concat(chunks) if chunks else pd.DataFrame()
+
+
+def read_chunks(args):
+    """
+    replaces the Chunks in a function's arguments (IndexedDict) by their DataFrames, for functions that don't take
+    chunks
+    """
+    values = args.values()
+    for idx in range(0, len(values)):
+        if isinstance(values[idx], Chunks):
+            values[idx] = values[idx].frame()
+    return args
+
+
+def write_csv_chunks(chunks, file):
+    header = True
+    for chunk in chunks:
+        chunk.to_csv(file, header=header)
+        header = False
+
+
+# -----------------------------------
+# stages
+# -----------------------------------
+def carry_rows(chunks, fn, rows):
+    """
+    returns fn over the chunks, fn's value at a row depending on that row and the rows rows before it.  rows < 0 (rows
+    after it) reads the chunks into one DataFrame for fn
+    """
+    if rows < 0:
+        return fn(chunks.frame())
+    return chunks.scan(lambda: carried(fn, rows))
+
+
+def carried(fn, rows):
+    """
+    returns a stage computing fn on each chunk preceded by the last rows rows read before it, then dropping those:
+    the value of fn at a row depends on that row and at most rows rows before it (delta, shift, sma)
+    """
+    carry = None
+
+    def stage(chunk):
+        nonlocal carry
+        if carry is None or rows == 0:
+            frame = chunk
+        else:
+            frame = pd.concat([carry, chunk])
+        if rows > 0:
+            carry = frame.iloc[-rows:]
+        return fn(frame).iloc[len(frame) - len(chunk):]
+    return stage
+
+
+def cumulative():
+    """
+    returns a stage computing cumsum() over the chunks: each starts from the running totals of those before
+    """
+    totals = None
+
+    def stage(chunk):
+        nonlocal totals
+        if totals is None:
+            summed = chunk.cumsum()
+            result = summed
+        else:
+            summed = pd.concat([totals, chunk]).cumsum()
+            result = summed.iloc[1:]
+        totals = summed.ffill().iloc[-1:].fillna(0)     # skipped NaN carry the total before them
+        return result
+    return stage
+
+
+def clipped_before(clip, before, fillna=None, kernel_args=None):
+    """
+    returns a stage computing clipbefore() over the chunks: columns are clipped until their first value equal to
+    before.  clip(frame) clips frame's columns as clipbefore does, the kernel does for chunks of float64 if given its
+    arguments
+    """
+    found = None
+
+    def stage(chunk):
+        nonlocal found
+        if found is None:
+            found = np.zeros(len(chunk.columns), dtype=bool)
+        if kernel_args is not None and fusable(chunk, False):
+            values = chunk.to_numpy(dtype=np.float64, copy=True)
+            done = values[:, found]
+            values = k_clipbefore(values, *kernel_args)
+            values[:, found] = done if fillna is None else np.where(np.isnan(done), fillna, done)
+            result = pd.DataFrame(values, index=chunk.index, columns=chunk.columns, copy=False)
+        else:
+            result = chunk.copy()
+            columns = chunk.columns[~found]
+            result[columns] = clip(chunk[columns])
+            if fillna is not None:
+                columns = chunk.columns[found]
+                result[columns] = chunk[columns].fillna(fillna)
+        found = found | (chunk == before).to_numpy().any(axis=0)
+        return result
+    return stage
@@ -3,6 +3,7 @@ from enum import unique, IntEnum
 from runtime.pandas import df_index, df_columns, df_axes, df_empty, df_info, df_set_flags, df_shape, df_values, \
     df_set_columns, df_head, df_set_idx_columns, df_set_at, pd_trim, df_clip, df_transpose, df_query, df_set_index, \
     df_set_idx_names
+from runtime.memo import touch
 from runtime.scope import Object
 
 # instead of using distinct types for each native type, we use a generic 'object' as a container
@@ -54,6 +55,7 @@ class Descriptor:
             fn = self.members[prop][SLOT.PUT]
             if fn is not None:
                 fn(obj, value)
+                touch(obj)
             else:
                 assert False, f"invalid operation 'set' called on property {prop}"
         elif hasattr(obj, prop):
@@ -85,6 +87,7 @@ class Descriptor:
             if fn is None:
                 assert False, f"invalid operation 'setAt' called on property {prop}"
             fn(obj, index, value)
+            touch(obj)
         else:
             assert False, f"property {prop} undefined"
 
@@ -30,6 +30,10 @@ class Environment:
         self.tokens = None
         self.logger = getLogFacility('focal')
         self.stack = RuntimeStack()
+        self.local_names = set()    # names the Resolver found bound outside the global scope
+        self.resolved = {}          # id(root) -> root of the trees the Resolver has bound
+        self.common = {}            # id(node) -> Common, pure expressions found more than once (interpreter/cse.py)
+        self.common_trees = []      # roots of the trees `common` was built from
         self.version = VERSION
         if source:
             self.lines = source.splitlines()
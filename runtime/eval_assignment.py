@@ -1,5 +1,3 @@
-from copy import deepcopy
-
 from runtime.conversion import c_box, c_to_bool, c_to_float, c_to_int, c_unbox
 from runtime.exceptions import runtime_error
 from runtime.indexdict import IndexedDict
@@ -84,6 +82,8 @@ _type2idx = {
     'timedelta': 7,
 }
 
+_assign_dispatch_cache = {}     # (op, type(l_value), type(r_value)) -> operator function, see assign_dispatch_fn
+
 # --------------------------------------------------
 #            M A N U A L   C H A N G E S 
 # --------------------------------------------------
@@ -103,12 +103,30 @@ def eval_assign_dispatch(node, left, right):
     if l_ty not in ['Object', 'Function', 'IntrinsicFunction']:    # for assignment, left is a ref not a value
         if hasattr(left, 'value'):
             l_value = left.value
-    l_ty = _type2native[type(l_value).__name__]
     r_value = right
     if hasattr(right, 'value'):
         r_value = right.value
-    r_ty = _type2native[type(r_value).__name__]
-    return eval_assign_dispatch2(node.op, l_value, r_value, l_ty, r_ty)
+    key = (node.op, type(l_value), type(r_value))
+    fn = _assign_dispatch_cache.get(key) or assign_dispatch_fn(*key)
+    if fn is not None:
+        return fn(l_value, r_value)
+
+
+def assign_dispatch_fn(tkid, l_cls, r_cls):
+    """
+    the operator function for tkid on values of python types l_cls and r_cls, None if a type has no column.
+    looked up in the dispatch table by type name on first use, then cached by type
+    """
+    key = (tkid, l_cls, r_cls)
+    if key in _assign_dispatch_cache:
+        return _assign_dispatch_cache[key]
+    l_ty = _type2native[l_cls.__name__]
+    r_ty = _type2native[r_cls.__name__]
+    fn = None
+    if l_ty in _type2idx and r_ty in _type2idx:
+        fn = _assign_dispatch_table[tkid][_type2idx[r_ty]][_type2idx[l_ty]]
+    _assign_dispatch_cache[key] = fn
+    return fn
 
 
 def eval_assign_dispatch2(tkid, l_value, r_value, l_ty=None, r_ty=None):
@@ -122,12 +140,8 @@ def eval_assign_dispatch2(tkid, l_value, r_value, l_ty=None, r_ty=None):
 def prepare_parameters(fn, args):
     _values = []
     _fields = []
-    _defaults = {}
-    if hasattr(fn, 'defaults'):
-        if fn.defaults is not None:
-            _defaults = deepcopy(fn.defaults)
-            _fields = list(_defaults.keys())
-            _values = list(_defaults.values())
+    if getattr(fn, 'defaults', None) is not None:
+        _fields, _values = fn.default_arguments()
     if args is not None:
         for idx in range(0, len(args)):
             val = args[idx]
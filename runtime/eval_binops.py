@@ -91,6 +91,8 @@ _type2idx = {
     'timedelta': 7,
 }
 
+_binops_dispatch_cache = {}     # (op, type(l_value), type(r_value)) -> operator function, see binops_dispatch_fn
+
 
 # --------------------------------------------------
 #            M A N U A L   C H A N G E S 
@@ -107,12 +109,30 @@ def eval_binops_dispatch(node, left, right):
     l_value = left
     if hasattr(left, 'value'):
         l_value = left.value
-    l_ty = type2native[type(l_value).__name__]
     r_value = right
     if hasattr(right, 'value'):
         r_value = right.value
-    r_ty = type2native[type(r_value).__name__]
-    return eval_binops_dispatch2(node.op, l_value, r_value, l_ty, r_ty)
+    key = (node.op, type(l_value), type(r_value))
+    fn = _binops_dispatch_cache.get(key) or binops_dispatch_fn(*key)
+    if fn is not None:
+        return fn(l_value, r_value)
+
+
+def binops_dispatch_fn(tkid, l_cls, r_cls):
+    """
+    the operator function for tkid on values of python types l_cls and r_cls, None if a type has no column.
+    looked up in the dispatch table by type name on first use, then cached by type
+    """
+    key = (tkid, l_cls, r_cls)
+    if key in _binops_dispatch_cache:
+        return _binops_dispatch_cache[key]
+    l_ty = type2native[l_cls.__name__]
+    r_ty = type2native[r_cls.__name__]
+    fn = None
+    if l_ty in _type2idx and r_ty in _type2idx:
+        fn = _binops_dispatch_table[tkid][_type2idx[r_ty]][_type2idx[l_ty]]
+    _binops_dispatch_cache[key] = fn
+    return fn
 
 
 def eval_binops_dispatch2(tkid, l_value, r_value, l_ty=None, r_ty=None):
@@ -7,8 +7,8 @@ from runtime.token_ids import TK
 from runtime.tree import Ref
 
 from runtime.eval_assignment import eval_assign_dispatch, _SUPPORTED_ASSIGNMENT_TOKENS
-from runtime.eval_binops import eval_binops_dispatch, _binops_dispatch_table
-from runtime.eval_boolean import eval_boolean_dispatch, _boolean_dispatch_table
+from runtime.eval_binops import eval_binops_dispatch, binops_dispatch_fn, _binops_dispatch_table
+from runtime.eval_boolean import eval_boolean_dispatch, boolean_dispatch_fn, _boolean_dispatch_table
 from runtime.eval_unary import not_literal, increment_literal, decrement_literal, negate_literal, union_literal
 
 _INTRINSIC_VALUE_TYPES = ['bool', 'float', 'int', 'str', 'timedelta']
@@ -31,16 +31,34 @@ def reduce_value(stack: RuntimeStack, node):
 
 def reduce_ref(scope=None, ref=None, value=None, idx=None, update=False):
     scope = Environment.current.scope if scope is None else scope
-    symbol = scope.define(name=ref.name, value=value, update=update)
+    address = getattr(ref, 'address', None)
+    if address is not None and address.is_global:
+        address = None
+    symbol = scope.define(name=ref.name, value=value, update=update, address=address)
     return symbol
 
 
+def find_symbol(scope, ref):
+    """
+    scope.find(ref.name), through the Address the Resolver bound ref to.  names bound from the global scope skip the
+    scopes in between unless one of them may also bind the name.
+    """
+    address = ref.address
+    if address is None:
+        return scope.find(name=ref.name)
+    if not address.is_global:
+        return scope.find_at(ref.name, address)
+    if ref.name in Environment.current.local_names:
+        return scope.find(name=ref.name)
+    return Environment.current.globals.find_at(ref.name, address)
+
+
 def reduce_get(scope=None, get=None):
     scope = Environment.current.scope if scope is None else scope
     if get.tid == TK.ANON:
         symbol = Environment.current.stack.pop()
     else:
-        symbol = scope.find(name=get.name)
+        symbol = find_symbol(scope, get)
         if symbol is None:
             runtime_strict_warning(f'Symbol `{get.token.lexeme}` referenced before initialized', loc=get.token.location)
     return symbol
@@ -97,6 +115,52 @@ def evaluate_binary_operation(node, left, right):
     return None  # fixups uses this code as well.  probably want option_strict enablement
 
 
+def binary_dispatcher(node):
+    """
+    returns a function evaluating node's operation on (l_value, r_value), as evaluate_binary_operation does, with an
+    inline cache of the operator function for the operand types it last saw
+    """
+    op = node.op
+    lookup = _dispatch_lookups.get(op)
+    l_cached = r_cached = fn_cached = None
+
+    def dispatch(l_value, r_value):
+        nonlocal l_cached, r_cached, fn_cached
+        if lookup is None or isinstance(l_value, Ref) or isinstance(r_value, Ref):
+            return evaluate_binary_operation(node, l_value, r_value)
+        if hasattr(l_value, 'value'):
+            l_value = l_value.value
+        if hasattr(r_value, 'value'):
+            r_value = r_value.value
+        l_cls = type(l_value)
+        r_cls = type(r_value)
+        if l_cls is not l_cached or r_cls is not r_cached:
+            fn_cached = lookup(op, l_cls, r_cls)
+            l_cached, r_cached = l_cls, r_cls
+        if fn_cached is not None:
+            return fn_cached(l_value, r_value)
+    return dispatch
+
+
+class BinaryOperation:
+    """
+    A node's binary_dispatcher, as a constant of compiled code.  Pickles as its node, the cache is filled again on
+    first use
+    """
+    __slots__ = ('node', 'dispatch')
+
+    def __init__(self, node):
+        self.node = node
+        self.dispatch = binary_dispatcher(node)
+
+    def __reduce__(self):
+        return BinaryOperation, (self.node,)
+
+
+_dispatch_lookups = dict([(op, boolean_dispatch_fn) for op in _boolean_dispatch_table])
+_dispatch_lookups.update([(op, binops_dispatch_fn) for op in _binops_dispatch_table])
+
+
 def evaluate_identifier(stack, node):
     left = Environment.current.scope.find(node.token.lexeme)
     stack.push(left)
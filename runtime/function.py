@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 
 from runtime.environment import Environment
+from runtime.indexdict import IndexedDict
+from runtime.memo import MemoTable, memo_key
 from runtime.scope import Scope, FunctionBase
 
 
@@ -18,10 +20,55 @@ class Function(FunctionBase):
         """
         return len(self.defaults)
 
+    def frame(self, fields, values):
+        """
+        the scope a call runs in, holding the arguments (fields and values as returned by default_arguments).  The
+        function's member table only holds its parameters, which the arguments replace, so it is not copied.
+        """
+        members = dict(zip(fields, values))
+        if None in members:     # extra positional arguments share the key None, IndexedDict keeps the first
+            members[None] = values[fields.index(None)]
+        if type(self._members) is not dict or any([k not in members for k in self._members]):    # not parameters
+            scope = Scope(other=self)
+            scope.update_members(IndexedDict(fields=fields, values=values))
+            return scope
+        scope = Scope(name=self.name, members=members)
+        scope.code = self.code
+        scope._fqname = self._fqname
+        return scope
+
     def invoke(self, interpreter, args=None):
-        scope = Scope(other=self)
-        scope.update_members(args)
+        fields, values = (None, None) if args is None else (args.keys(), args.values())
+        scope = self.frame(fields, values)
         restore = Environment.enter(scope)
         interpreter.visit(self.code)
         Environment.leave(restore)
         return interpreter.stack.pop()
+
+
+@dataclass
+class MemoFunction(Function):
+    """
+    A Function caching its results by argument, in a bounded LRU table (see runtime.memo).  Meant for functions whose
+    result only depends on their arguments: nothing else is part of the key.
+    """
+    def __init__(self, other=None, size=None):
+        super().__init__(other=other, closure=other.closure, arity=other.arity, opt=other.opt)
+        self.code = other.code
+        self.table = MemoTable(size)
+
+    @property
+    def stats(self):
+        return self.table.stats
+
+    def invoke(self, interpreter, args=None):
+        fields, values = ([], []) if args is None else (args.keys(), args.values())
+        key = memo_key(fields, values)
+        found, value = self.table.get(key)
+        if not found:
+            value = interpreter.call_function(self, fields, values)
+            self.table.put(key, value)
+        return value
+
+    def format(self, brief=True):
+        return f'memo {super().format(brief=brief)} ({self.stats})'
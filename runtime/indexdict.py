@@ -19,6 +19,8 @@ class IndexedDict(object):
     This is also used to implement the Options class, where the focus is on accessing the members by key or by property.
     In both cases, the ability to update the keys after construction is a critical feature.
 
+    Keys and values are kept in two parallel lists, in insertion order, with a hash index from each key to its
+    position.  Keyed access is constant time, keys are read as properties through __getattr__.
     """
 
     def __init__(self, items=None, fields=None, values=None, defaults=None):
@@ -33,36 +35,47 @@ class IndexedDict(object):
         elif fields is not None:
             self._fields = copy(fields)
             self._values = copy(values)
-            _items = dict(zip(self._fields, self._values))
-        self.__dict__.update(_items)
+        else:
+            self.__dict__.update(_items)    # defaults alone are properties only, not keys
+        self._index = _index_fields(self._fields)
+
+    def __getattr__(self, name):
+        index = self.__dict__.get('_index')
+        if index is None or name not in index:
+            raise AttributeError(f'{type(self).__name__} has no attribute or key {name}')
+        return self._values[index[name]]
 
     def __contains__(self, key):
-        return key in self._fields
+        return key in self._index
 
     def __getitem__(self, key):
         if isinstance(key, int):
             if key < 0 or key > len(self._values):
                 raise IndexError('Index out of range')
             return self._values[key]
-        if key not in self._fields:
+        idx = self._index.get(key)
+        if idx is None:
             raise KeyError(f'Key {key} not in dictionary')
-        key = self._fields.index(key)
-        return self._values[key]
+        return self._values[idx]
 
     def __setitem__(self, key, value):
         if isinstance(key, int):
             if key < 0 or key > len(self._values):
                 raise IndexError('Index out of range')
             self._values[key] = value
-            key = self._fields[key]
         else:
-            if key in self._fields:
-                idx = self._fields.index(key)
+            idx = self._index.get(key)
+            if idx is not None:
                 self._values[idx] = value
             else:
+                self._index[key] = len(self._fields)
                 self._fields.append(key)
                 self._values.append(value)
-        self.__dict__[key] = value
+
+    def __delitem__(self, key):
+        if key not in self._index:
+            raise KeyError(f'Key {key} not in dictionary')
+        self.remove(key)
 
     def __str__(self):
         return self.format()
@@ -72,12 +85,18 @@ class IndexedDict(object):
 
     def append(self, key=None, value=None):
         if key:
-            if key in self._fields:
+            if key in self._index:
                 raise KeyError(f'Key {key} already in dictionary')
+            self._index[key] = len(self._fields)
             self._fields.append(key)
-            self.__dict__[key] = value
         self._values.append(value)
 
+    def slot_of(self, key):
+        """
+        position of key, None if key is not in the dictionary
+        """
+        return self._index.get(key)
+
     def is_empty(self):
         return len(self._values) == 0
 
@@ -87,15 +106,23 @@ class IndexedDict(object):
     def keys(self, keys=None):              # UNDONE: iterator?
         return self._fields
 
+    def key_at(self, index):
+        """
+        key at position index, None if index is out of range
+        """
+        if index is None or index >= len(self._fields):
+            return None
+        return self._fields[index]
+
     def remove(self, key):
         if not isinstance(key, list):
             key = [key]
         for k in key:
-            if k in self._fields:
-                idx = self._fields.index(k)
+            idx = self._index.get(k)
+            if idx is not None:
                 del self._fields[idx]
                 del self._values[idx]
-                self.__dict__.pop(k, None)
+                self._index = _index_fields(self._fields)
 
     def values(self):                       # UNDONE: iterator?
         return self._values
@@ -120,14 +147,14 @@ class IndexedDict(object):
         return self._values
 
     def update(self, items):
-        self.__dict__.update(items)
-        for k in items:
-            if k in self._fields:
-                idx = self._fields.index(k)
-                self._values[idx] = items[k]
+        for k, v in zip(items.keys(), items.values()):     # iterating an IndexedDict gives its values
+            idx = self._index.get(k)
+            if idx is not None:
+                self._values[idx] = v
             else:
+                self._index[k] = len(self._fields)
                 self._fields.append(k)
-                self._values.append(items[k])
+                self._values.append(v)
 
     def format(self, brief=True):
         if not len(self._values):
@@ -143,11 +170,19 @@ class IndexedDict(object):
                         fstr += f'{self._values[idx]}'
                     fstr += ',' if idx < _lenv else ''
             else:
-                fstr = f'count={len(self.__dict__.keys())-1}'
+                fstr = f'count={len(self._index) + 1}'
             return '{' + f'{fstr}' + '}'
 
 
 # Helpers:
+def _index_fields(fields):
+    # key -> position of its first occurrence.  positional entries of parameter lists share the key None
+    index = {}
+    for idx in range(len(fields) - 1, -1, -1):
+        index[fields[idx]] = idx
+    return index
+
+
 def _rzip(*iterables):
     # zip('ABCD', 'xy') --> Cx Dy
     sentinel = object()
@@ -6,6 +6,7 @@ import numpy_financial as npf
 import pandas as pd
 import json as js
 
+from runtime.chunks import Chunks, read_chunks, write_csv_chunks
 from runtime.conversion import c_unbox, c_type
 from runtime.eval_binops import eval_binops_dispatch2, type2native
 from runtime.generators import generate_range, generate_dataframe, generate_dict, generate_list, generate_named_tuple, \
@@ -36,10 +37,15 @@ class IntrinsicFunction(FunctionBase):
     def __init__(self, name=None, members=None, closure=None, arity=None, opt=None, invoke=None, defaults=None, tid=None, loc=None, is_lvalue=False):
         super().__init__(name=name, members=members, closure=closure, arity=arity, opt=opt,
                          defaults=defaults, tid=tid, loc=loc, is_lvalue=is_lvalue)
-        self.token.is_reserved = True
         self._invoke_fn = invoke
+        self._chunked = name in _chunked_intrinsics
+        self._pure = is_pure_intrinsic(name)
 
     def invoke(self, interpreter, args=None):
+        if args is not None and not self._chunked:
+            read_chunks(args)
+        if self._pure and getattr(interpreter, 'release', None) is not None:
+            return interpreter.release(self._invoke_fn, args=args)     # other trees run meanwhile
         return self._invoke_fn(args=args)
 
 
@@ -67,6 +73,13 @@ def is_intrinsic(name):
     return name in _intrinsic_aliases
 
 
+def is_pure_intrinsic(name):
+    """
+    True for intrinsics whose result depends only on their arguments, and that don't modify them
+    """
+    return _intrinsic_aliases.get(name, name) in _pure_intrinsics
+
+
 def invoke_generator(name, args):
     return invoke_intrinsic_internal(name, args, locator='generator')
 
@@ -218,8 +231,11 @@ def do_read(args=None):
     format = 'csv'
     dframe = None
     fname = args[0]
-    if hasattr(args, 'format'):
-        format = args.format
+    if 'format' in args:    # not args.format: IndexedDict.format is a method
+        format = args['format']
+    if 'chunksize' in args and format == 'csv':
+        chunksize = args.chunksize
+        return Chunks(lambda: pd.read_csv(fname, header=0, index_col=0, chunksize=chunksize))    # read again each use
     if format == 'excel':
         dframe = pd.read_excel(fname)
     else:
@@ -316,15 +332,19 @@ def do_write(args=None):
     format = 'csv'
     o = c_unbox(args[0])
     fname = args[1]
-    if hasattr(args, 'format'):
-        format = args.format
+    if 'format' in args:
+        format = args['format']
+    if isinstance(o, Chunks) and format != 'csv':
+        o = o.frame()
     if format == 'excel':
         o.to_excel(pd.ExcelWriter(fname))
     elif format == 'pickle':
         o.to_pickle(fname)
     else:
         with open(fname, 'w') as file:
-            if isinstance(o, pd.DataFrame):
+            if isinstance(o, Chunks):
+                write_csv_chunks(o, file)
+            elif isinstance(o, pd.DataFrame):
                 if format == 'json':
                     o.to_json(file)
                 elif format == 'csv':
@@ -367,7 +387,7 @@ _intrinsic_fundesc = {
     'trim': (do_trim, 1, 3, None),
     'type': (do_typeof, 1, 1, None),
     'write': (do_write, 1, 2, None),
-    'yahoo': (do_yahoo, 1, 7, init_yahoo),
+    'yahoo': (do_yahoo, 1, 12, init_yahoo),
 
     # numpy:
     'eye': (np_identity, 1, 1, None),
@@ -416,6 +436,19 @@ _intrinsic_aliases = {
     'ident': 'identity',
 }
 
+# intrinsics that may be evaluated once for the same arguments (see interpreter/cse.py).  not those returning views
+# of their argument's data ('columns', 'values'), creating objects the caller may write to, or doing I/O.
+_pure_intrinsics = {
+    'clip', 'clipbefore', 'combine', 'cumsum', 'delay', 'delta', 'diff', 'head', 'irr', 'len', 'max', 'mean',
+    'median', 'min', 'mul', 'ret', 'shape', 'shift', 'signal', 'sma', 'sum', 'tail', 'transpose', 'union',
+}
+
+# intrinsics computing on Chunks chunk by chunk (see runtime/chunks.py).  others are given the chunks read into one
+# DataFrame
+_chunked_intrinsics = {
+    'clip', 'clipbefore', 'cumsum', 'delay', 'delta', 'diff', 'shift', 'signal', 'sma', 'write',
+}
+
 _intrinsic_not_impl = {
     # functions (intrinsics)
     "ema": (None, 1, 1, None),
@@ -0,0 +1,180 @@
+# element-wise kernels for the stages of flows (a | delta | signal | ...) fused into one pass over a DataFrame's values
+# (see interpreter/flows.py).  each computes what its intrinsic in runtime/pandas.py does, on a float64 array of the
+# DataFrame's rows, so a run of stages builds one DataFrame at its end instead of one per stage.
+import datetime as dt
+from enum import unique, IntEnum
+
+import numpy as np
+import pandas as pd
+
+
+@unique
+class KSLOT(IntEnum):
+    KERNEL = 0
+    PREPARE = 1
+    FLOATS = 2
+    WRITES = 3
+
+
+def kernel_arguments(name, args):
+    """
+    returns the arguments of intrinsic name, after the DataFrame, as its kernel takes them.  None if name has no
+    kernel or the kernel doesn't compute the same thing for these arguments
+    """
+    if name not in _kernel_desc:
+        return None
+    return _kernel_desc[name][KSLOT.PREPARE](list(args))
+
+
+def kernel(name):
+    return _kernel_desc[name][KSLOT.KERNEL]
+
+
+def floats(name):
+    """
+    True if intrinsic name returns float64 values for integers as well
+    """
+    return _kernel_desc[name][KSLOT.FLOATS]
+
+
+def writes(name):
+    """
+    True if intrinsic name's kernel writes its result over the values it is given
+    """
+    return _kernel_desc[name][KSLOT.WRITES]
+
+
+def fusable(df, floating):
+    """
+    True if kernels may be run on df's values: numbers in a float64 array, int64 as well if the first kernel floats
+    them (floating).  the rows are labelled once, as clipbefore reads them by label
+    """
+    if not isinstance(df, pd.DataFrame) or len(df.index) == 0 or not df.index.is_unique:
+        return False
+    types = _FLOATING_DTYPES if floating else _FLOAT_DTYPES
+    return all([dtype in types for dtype in df.dtypes])
+
+
+def fuse(df, kernels, copy=True):
+    """
+    runs [(kernel, args)] in turn on df's values, returns the result as a DataFrame labelled as df is.  the first
+    kernel is given a copy of the values if copy, else it must not write to them: later ones are given the values
+    returned by the one before
+    """
+    values = df.to_numpy(dtype=np.float64, copy=copy)
+    for fn, args in kernels:
+        values = fn(values, *args)
+    return pd.DataFrame(values, index=df.index, columns=df.columns, copy=False)
+
+
+# -----------------------------------
+# kernels
+# -----------------------------------
+def k_clip(values, lower, upper):
+    if upper is not None:
+        np.minimum(values, upper, out=values)
+    if lower is not None:
+        np.maximum(values, lower, out=values)
+    return values
+
+
+def k_clipbefore(values, before, lower, upper, fillna=None):
+    found = values == before
+    first = np.where(found.any(axis=0), found.argmax(axis=0), len(values))
+    before_rows = np.arange(len(values))[:, None] < first
+    np.minimum(values, upper, out=values, where=before_rows)    # upper first, as si_clipfunc
+    np.maximum(values, lower, out=values, where=before_rows)
+    if fillna is not None:
+        values[np.isnan(values)] = fillna
+    return values
+
+
+def k_cumsum(values):
+    missing = np.isnan(values)
+    values[missing] = 0
+    values = np.cumsum(values, axis=0)
+    values[missing] = np.nan
+    return values
+
+
+def k_delta(values, delay=1):
+    result = np.full(values.shape, np.nan)
+    if abs(delay) < len(values):
+        if delay > 0:
+            np.subtract(values[delay:], values[:-delay], out=result[delay:], dtype=np.float64)
+        else:
+            np.subtract(values[:delay], values[-delay:], out=result[:delay], dtype=np.float64)
+    return result
+
+
+def k_shift(values, delay):
+    result = np.zeros(values.shape)
+    if abs(delay) < len(values):
+        if delay > 0:
+            result[delay:] = values[:-delay]
+        else:
+            result[:delay] = values[-delay:]
+        result[np.isnan(result)] = 0
+    return result
+
+
+def k_signal(values):
+    return k_delta(values > 0)
+
+
+# -----------------------------------
+# arguments
+# -----------------------------------
+def _prepare_clip(args):
+    if not _numbers(args) or len(args) > 2:
+        return None
+    if len(args) == 2:
+        return None if args[0] > args[1] else tuple(args)
+    return None, (args[0] if args else None)
+
+
+def _prepare_clipbefore(args):
+    if not _numbers(args) or len(args) < 3 or len(args) > 4:
+        return None     # si_clipfunc compares to upper and lower
+    return tuple(args)
+
+
+def _prepare_delta(args):
+    if len(args) > 1:
+        return None
+    delay = args[0] if len(args) == 1 else 1
+    return (delay,) if type(delay) is int and delay != 0 else None     # shift(0) keeps integers
+
+
+def _prepare_none(args):
+    return None if len(args) > 0 else ()
+
+
+def _prepare_shift(args):
+    if len(args) != 1:
+        return None
+    delay = args[0]
+    if isinstance(delay, dt.timedelta):
+        delay = delay // dt.timedelta(days=1)    # as pd_shift
+    return (delay,) if type(delay) is int and delay != 0 else None
+
+
+def _numbers(args):
+    return all([type(a) in [float, int] and not (type(a) is float and np.isnan(a)) for a in args])
+
+
+_FLOAT_DTYPES = [np.dtype(np.float64)]
+_FLOATING_DTYPES = [np.dtype(np.float64), np.dtype(np.int64)]
+
+# intrinsics fused into flows, see runtime/pandas.py for those they stand for.  the DataFrame is the first argument.
+_kernel_desc = {
+    # name      ( kernel, prepare arguments, floats integers, writes its values )
+    'clip': (k_clip, _prepare_clip, False, True),
+    'clipbefore': (k_clipbefore, _prepare_clipbefore, False, True),
+    'cumsum': (k_cumsum, _prepare_none, False, True),
+    'delay': (k_shift, _prepare_shift, True, False),
+    'delta': (k_delta, _prepare_delta, True, False),
+    'diff': (k_delta, _prepare_delta, True, False),
+    'shift': (k_shift, _prepare_shift, True, False),
+    'signal': (k_signal, _prepare_none, True, False),
+}
@@ -76,6 +76,7 @@ _KEYWORDS = [
     # unary
     (TK.NOT, TCL.UNARY, 'not'),
     (TK.DEFINE, TCL.UNARY, 'def'),
+    (TK.MEMO, TCL.UNARY, 'memo'),       # memoized function
     (TK.VAL, TCL.UNARY, 'val'),         # immutable (default)
     (TK.VAR, TCL.UNARY, 'var'),         # non-immutable
 
@@ -0,0 +1,135 @@
+# result caches for memoized functions (memo f(x) := ...)
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+_MEMO_SIZE = 128            # default entries kept per function, see the 'memo_size' option
+
+_versions = {}              # id(obj) -> count of in place writes to obj, for the objects written to since created
+
+
+@dataclass
+class MemoStats:
+    """
+    Counters of a memoized function's cache
+    """
+    def __init__(self, capacity=_MEMO_SIZE):
+        self.capacity = capacity
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __str__(self):
+        return self.format()
+
+    def format(self, brief=True):
+        return f'hits={self.hits}, misses={self.misses}, evictions={self.evictions}, size={self.size}/{self.capacity}'
+
+
+class MemoTable:
+    """
+    Bounded least recently used map of arguments to results.  Arguments are keyed by memo_key()
+    """
+    def __init__(self, capacity=None):
+        self.capacity = _MEMO_SIZE if capacity is None else capacity
+        self.stats = MemoStats(self.capacity)
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        returns (True, result) for a cached key, else (False, None).  key None (arguments that can't be keyed) misses
+        """
+        if key is not None and key in self._entries:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return True, self._entries[key]
+        self.stats.misses += 1
+        return False, None
+
+    def put(self, key, value):
+        if key is None or self.capacity <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+        self.stats.size = len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self.stats.size = 0
+
+
+class _Identity:
+    """
+    key for a DataFrame, Series or ndarray argument: the object itself and its version.  The key holds on to the
+    object, so its id is not reused while the entry is cached
+    """
+    __slots__ = ('obj', 'version')
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.version = _versions.get(id(obj), 0)
+
+    def __eq__(self, other):
+        return type(other) is _Identity and other.obj is self.obj and other.version == self.version
+
+    def __hash__(self):
+        return hash((id(self.obj), self.version))
+
+
+def memo_key(fields, values):
+    """
+    returns a hashable key for a call's arguments, None if one of them can't be keyed
+    """
+    key = values_key(values)
+    return None if key is None else (tuple(fields), key)
+
+
+def values_key(values):
+    """
+    returns a hashable key for a list of values, None if one of them can't be keyed
+    """
+    try:
+        return tuple([_key_of(v) for v in values])
+    except TypeError:
+        return None
+
+
+def touch(obj):
+    """
+    records an in place write to obj: cached results for arguments holding obj are no longer found
+    """
+    key = id(obj)
+    if key not in _versions:
+        weakref.finalize(obj, _versions.pop, key, None)
+    _versions[key] = _versions.get(key, 0) + 1
+
+
+def _key_of(value):
+    keyer = _keyers.get(type(value))
+    if keyer is not None:
+        return keyer(value)
+    hash(value)     # TypeError for values that can't be keyed
+    return type(value), value   # 1, 1.0 and True are equal but give different results
+
+
+def _key_sequence(value):
+    return type(value), tuple([_key_of(v) for v in value])
+
+
+_keyers = {
+    list: _key_sequence,
+    tuple: _key_sequence,
+    np.ndarray: _Identity,
+    pd.DataFrame: _Identity,
+    pd.Series: _Identity,
+}
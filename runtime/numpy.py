@@ -1,6 +1,7 @@
 import numpy as np
 
 from runtime.conversion import c_unbox, c_array_unbox
+from runtime.memo import touch
 
 
 def _slice_ndarray(l_value, r_value):
@@ -22,7 +23,8 @@ def np_fill(args=None):
         x = args[1]
         y = args[2]
         a = np.ndarray((x, y))
-    return a.fill(val)
+    a.fill(val)
+    touch(a)
 
 
 def np_flatten(args=None):
@@ -5,8 +5,10 @@ import numpy_financial as npf
 import pandas as pd
 import datetime as dt
 
+from runtime.chunks import Chunks, carry_rows, clipped_before, cumulative
 from runtime.conversion import c_unbox, c_type
 from runtime.indexdict import IndexedDict
+from runtime.kernels import kernel_arguments
 from runtime.scope import Object
 from runtime.series import Series
 from runtime.token_ids import TK
@@ -315,6 +317,11 @@ def pd_clipbefore(args=None):
         upper = args[3]
     if len(args) == 5:
         fillna = args[4]
+    if isinstance(df, Chunks):
+        def clip(frame):
+            return frame.transform(si_clipfunc, before=before, upper=upper, lower=lower, fillna=fillna)
+        kernel_args = kernel_arguments('clipbefore', args.values()[1:])
+        return df.scan(lambda: clipped_before(clip, before, fillna=fillna, kernel_args=kernel_args))
     return df.transform(si_clipfunc, before=before, upper=upper, lower=lower, fillna=fillna)
 
 
@@ -343,6 +350,8 @@ def pd_clip(args=None):
     if len(args) == 3:
         lower = args[1]
         upper = args[2]
+    if isinstance(df, Chunks):
+        return df.map(lambda chunk: chunk.clip(lower=lower, upper=upper))
     return df.clip(lower=lower, upper=upper)
 
 
@@ -388,13 +397,15 @@ def pd_count(args=None):
 
 def pd_cumsum(args=None):
     a = args[0]
-    if not isinstance(a, pd.DataFrame):
-        a = pd.DataFrame(a)
     if len(args) > 1:
         axis = args[1]
     else:
         axis = 'c'
     axis = axis[0].lower()
+    if isinstance(a, Chunks):
+        return a.scan(cumulative) if axis != 'r' else a.map(lambda chunk: chunk.cumsum(axis=1))
+    if not isinstance(a, pd.DataFrame):
+        a = pd.DataFrame(a)
     return a.cumsum(axis=1 if axis == 'r' else 0)
 
 
@@ -404,6 +415,8 @@ def pd_delta(args=None):
         delay = args[1]
     else:
         delay = 1
+    if isinstance(a, Chunks):
+        return carry_rows(a, lambda frame: pdi_delta(frame, delay), _carried_rows(delay))
     if not isinstance(a, pd.DataFrame):
         a = pd.DataFrame(a)
     return pdi_delta(a, delay)
@@ -567,10 +580,12 @@ def pd_shape(args=None):
 def pd_shift(args=None):
     a = args[0]
     delay = args[1]
-    if not isinstance(a, pd.DataFrame):
-        a = pd.DataFrame(a)
     if isinstance(delay, dt.timedelta):
         delay = delay // dt.timedelta(days=1)
+    if isinstance(a, Chunks):
+        return carry_rows(a, lambda frame: pdi_shift(frame, delay), _carried_rows(delay))
+    if not isinstance(a, pd.DataFrame):
+        a = pd.DataFrame(a)
     return pdi_shift(a, delay)
 
 
@@ -580,6 +595,8 @@ def pdi_shift(a, delay):
 
 def do_signal(args=None):
     a = args[0]
+    if isinstance(a, Chunks):
+        return carry_rows(a, di_signal, 1)
     if not isinstance(a, pd.DataFrame):
         a = pd.DataFrame(a)
     return di_signal(a)
@@ -596,6 +613,8 @@ def di_signal(a):
 def pd_sma(args=None):
     a = args[0]
     window = args[1]
+    if isinstance(a, Chunks):
+        return carry_rows(a, lambda frame: pdi_sma(frame, window), _carried_rows(window, less=1))
     if not isinstance(a, pd.DataFrame):
         a = pd.DataFrame(a)
     return pdi_sma(a, window)
@@ -657,3 +676,10 @@ def pdi_trim(df, axis, values):
 
 def pd_values(args=None):
     return df_values(args[0])
+
+
+def _carried_rows(rows, less=0):
+    """
+    the rows before a row that a stage over Chunks reads: rows - less for a count of rows, else -1 (all of them)
+    """
+    return rows - less if type(rows) is int else -1
@@ -5,6 +5,8 @@ from copy import deepcopy, copy
 from dataclasses import dataclass
 from queue import SimpleQueue
 
+import pandas as pd
+
 from runtime.indexdict import IndexedDict
 from runtime.token import Token
 from runtime.token_class import TCL
@@ -12,6 +14,23 @@ from runtime.token_ids import TK
 from runtime.tree import AST, Expression
 
 
+class Address:
+    """
+    Where the Resolver expects a name to be found: `depth` scopes up from the scope searched (from the global scope if
+    is_global), at `slot` in that scope's members.  slot is a hint: it is None for scopes without positions and is
+    updated when the name has moved.
+    """
+    __slots__ = ('depth', 'slot', 'is_global')
+
+    def __init__(self, depth=0, slot=None, is_global=False):
+        self.depth = depth
+        self.slot = slot
+        self.is_global = is_global
+
+    def __repr__(self):
+        return f'Address({self.depth}, {self.slot}{", global" if self.is_global else ""})'
+
+
 @dataclass
 class Scope:
     def __init__(self, name=None, parent_scope=None, members=None, other=None, hidden=False, **kwargs):
@@ -19,8 +38,8 @@ class Scope:
         self._hidden = hidden
         self.parent_scope = parent_scope
         if other is not None:
-            self.code = copy(other.code)
-            self._name = copy(other.name)
+            self.code = other.code      # shared: code is not modified by running it
+            self._name = other.name
             self._fqname = other._fqname
             members = copy(other._members)
         else:
@@ -82,7 +101,7 @@ class Scope:
     def contains(self, token):
         return token.lexeme in self._members
 
-    def define(self, name=None, value=None, token=None, local=False, update=False):
+    def define(self, name=None, value=None, token=None, local=False, update=False, address=None):
         """
         Searches for a symbol, defining it if it does not exist.  If a symbol exists in the current scope or parent scopes, then it will
         be found and returned.  The behavior is always to define the symbol in the current scope, 'local' can be used
@@ -93,11 +112,15 @@ class Scope:
         :param value: value to assign if value is created.
         :param local: whether or not parent scopes should be examined while searching for an existing symbol.
         :param update: whether or not an existing value should be overwritten.  This is dangerous if 'local' is not False
+        :param address: (optional) the Address the Resolver bound the name to, see find_at
         :return: the found / defined / updated symbol
         """
         if token is not None:
             name = token.lexeme
-        symbol = self.find(name, local=local)
+        if address is not None and not local:
+            symbol = self.find_at(name, address)
+        else:
+            symbol = self.find(name, local=local)
         if symbol is None or update:
             if symbol is None:
                 symbol = Object(name=name, token=token)
@@ -108,9 +131,9 @@ class Scope:
                 if hasattr(value, '_members'):
                     symbol._members = deepcopy(value._members)
                 if hasattr(value, 'value'):
-                    symbol._value = deepcopy(value.value)
+                    symbol._value = _copy_value(value.value)
                 else:
-                    symbol._value = deepcopy(value)
+                    symbol._value = _copy_value(value)
             symbol.parent_scope = self
             self._members[name] = symbol
         return symbol
@@ -135,6 +158,29 @@ class Scope:
             scope = scope.parent_scope
         return default
 
+    def find_at(self, name, address, default=None):
+        """
+        find() for a name bound to an Address.  The scopes below address.depth are searched by name as find() would,
+        the scope at address.depth is indexed by address.slot.  A name not found there is searched for by name from
+        that scope on, so a stale address only costs the lookup it was meant to save.
+        """
+        scope = self
+        for _ in range(address.depth):
+            members = scope._members
+            if members is not None and name in members:
+                return members[name]
+            scope = scope.parent_scope
+            if scope is None:
+                return default
+        members = scope._members
+        if isinstance(members, IndexedDict):
+            if members.key_at(address.slot) != name:
+                address.slot = members.slot_of(name)
+            if address.slot is not None:
+                return members[address.slot]
+            scope = scope.parent_scope
+        return default if scope is None else scope.find(name, default=default)
+
     def _add_symbol(self, tkid, tcl, lex):
         tk = Token(tid=tkid, tcl=tcl, lex=lex, loc=Token.Loc())
         self._members[lex] = tk
@@ -279,6 +325,29 @@ class FunctionBase(Block):
                 self.arity = len(defaults)
         self.defaults = defaults
 
+    @property
+    def defaults(self):
+        return self._defaults
+
+    @defaults.setter
+    def defaults(self, defaults):
+        # bound once, when the function is defined: each call starts from a copy of these lists (see default_arguments)
+        self._defaults = defaults
+        self._default_fields = [] if defaults is None else list(defaults.keys())
+        self._default_values = [] if defaults is None else list(defaults.values())
+        self._copy_defaults = any([type(v) not in _immutable_types for v in self._default_values])
+
+    def default_arguments(self):
+        """
+        returns (fields, values): new lists holding the parameter names and default values, for a call to fill in
+        """
+        values = self._default_values
+        if self._copy_defaults:
+            values = [_copy_value(v) for v in values]
+        else:
+            values = list(values)
+        return list(self._default_fields), values
+
     def invoke(self, interpreter, args=None):
         assert False, f'Function {self.name} is not implemented'
 
@@ -287,6 +356,41 @@ class FunctionBase(Block):
         return f'{self.name} = {v}'
 
 
+# symbols get their own copy of the values assigned to them.  pandas objects are copied lazily: with Copy-on-Write
+# (always on from pandas 3.0) a shallow copy shares the data until either side writes to it, which makes assigning a
+# DataFrame O(1).  numpy arrays are still copied, intrinsics like fill() modify them in place.
+_PANDAS_COPY_ON_WRITE = int(pd.__version__.split('.')[0]) >= 3 or pd.get_option('mode.copy_on_write') is True
+
+
+def _copy_value(value):
+    copier = _value_copiers.get(type(value))
+    if copier is None:
+        return deepcopy(value)
+    return copier(value)
+
+
+def _copy_lazy(value):
+    if _PANDAS_COPY_ON_WRITE:
+        return value.copy(deep=False)
+    return deepcopy(value)
+
+
+def _copy_immutable(value):
+    return value
+
+
+_value_copiers = {
+    bool: _copy_immutable,
+    float: _copy_immutable,
+    int: _copy_immutable,
+    str: _copy_immutable,
+    type(None): _copy_immutable,
+    pd.DataFrame: _copy_lazy,
+    pd.Series: _copy_lazy,
+}
+_immutable_types = {t for t, copier in _value_copiers.items() if copier is _copy_immutable}
+
+
 def _dump_symbols(scope):
     print("\n\nsymbols: ")
     idx = 0
@@ -1,4 +1,3 @@
-from collections import deque
 from dataclasses import dataclass
 
 from runtime import exceptions
@@ -8,13 +7,15 @@ from runtime import exceptions
 class RuntimeStack(object):
     """
     RuntimeStack:
-    Provides stack implementation on top of deque object
+    The interpreter's operand stack, on top of a list.  push is the list's own append.  Popping an empty stack is
+    caught as it happens rather than checked for beforehand, and reported as a stack underflow
     """
     def __init__(self):
-        self._stack = deque()
+        self._stack = []
+        self.push = self._stack.append     # the list is never replaced, see clear()
 
     def is_empty(self):
-        return True if len(self._stack) == 0 else False
+        return not self._stack
 
     def depth(self):
         return len(self._stack)
@@ -23,18 +24,38 @@ class RuntimeStack(object):
         depth = -1 if depth is None else depth
         return self._stack[depth]
 
-    def push(self, x):
-        self._stack.append(x)
-
     def push_all(self, l):
-        for item in l:
-            self.push(item)
+        self._stack.extend(l)
 
     def pop(self):
-        if self.is_empty():
+        try:
+            return self._stack.pop()
+        except IndexError:
+            exceptions.runtime_error(f'Stack underflow', loc=None)
+
+    def pop2(self):
+        """
+        pops the top two values, returned in the order they were pushed
+        """
+        pop = self._stack.pop
+        try:
+            top = pop()
+            return pop(), top
+        except IndexError:
+            exceptions.runtime_error(f'Stack underflow', loc=None)
+
+    def popn(self, n):
+        """
+        pops the top n values, returned in the order they were pushed
+        """
+        if n <= 0:
+            return []
+        stack = self._stack
+        values = stack[-n:]
+        del stack[-n:]
+        if len(values) < n:
             exceptions.runtime_error(f'Stack underflow', loc=None)
-        return self._stack.pop()
+        return values
 
     def clear(self):
         self._stack.clear()
-        self._stack = deque()
\ No newline at end of file
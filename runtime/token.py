@@ -7,12 +7,20 @@ from runtime.token_ids import TK
 
 @dataclass
 class Token:
+    # tokens are created in bulk by the lexer: slots keep them (and their locations) free of a per-instance __dict__
+    __slots__ = ('id', 't_class', 'lexeme', 'value', 'location', 'is_reserved')
+
     @dataclass
     class Loc:
+        __slots__ = ('line', 'offset')
+
         def __init__(self, line=0, offset=0):
             self.line = line
             self.offset = offset
 
+        def __reduce__(self):      # compact pickles (parse cache)
+            return Token.Loc, (self.line, self.offset)
+
         @staticmethod
         def ZERO():
             return Token.Loc(0,0)
@@ -53,6 +53,7 @@ _tk2type = {
     TK.LESS: TCL.BINOP,
     TK.LIST: TCL.LITERAL,
     TK.LTE: TCL.BINOP,
+    TK.MEMO: TCL.UNARY,
     TK.MNEQ: TCL.BINOP,
     TK.MOD: TCL.BINOP,
     TK.MUL: TCL.BINOP,
@@ -139,6 +140,7 @@ _tk2glyph = {
     TK.LIST: 'list',
     TK.LESS: '<',
     TK.LTE: '<=',
+    TK.MEMO: 'memo',
     TK.MNEQ: '-=',
     TK.MUL: '*',
     TK.NAMEDTUPLE: 'ntup',
@@ -220,6 +222,7 @@ _tk2unop = {
     TK.ALL: TK.ALL,
     TK.ANY: TK.ANY,
     TK.EXCL: TK.NOT,  # !
+    TK.MEMO: TK.MEMO,
     TK.MNUS: TK.NEG,  # unary -
     TK.MNU2: TK.DECREMENT,  # unary --
     TK.NONE: TK.NONEOF,
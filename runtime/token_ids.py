@@ -157,6 +157,7 @@ class TK(IntEnum):
     IF = auto()
     IN = auto()
     INDEX = auto()  # 'index' keyword
+    MEMO = auto()  # memo f(x) := ..., memoized function definition
     MOD = auto()
     NAN = auto()
     NONE = auto()
@@ -15,11 +15,15 @@ class AST:
 
     It contains a parent reference, a token, and a value.  It is built as a Mixin
     and will pass additional args and kwargs to other superclass __init__ functions.
+
+    Nodes are slotted: every subclass declares the attributes it adds in __slots__.
     """
+    __slots__ = ('parent', 'tid', 'lexeme', 'location', '_value', '_token', '_num')
 
     def __init__(self, token=None, tid=None, value=None, parent=None, loc=None, **kwargs):
         super().__init__(**kwargs)
         self.parent = parent
+        self._token = None      # token view, built on first access
         if token is not None:
             self.tid = token.id
             self.location = token.location
@@ -37,12 +41,24 @@ class AST:
             return self.format()
         return self.__repr__()
 
+    def __getstate__(self):     # copies and pickles leave the token view behind, it is rebuilt on demand
+        slots = dict([(k, getattr(self, k)) for k in _slot_names(type(self)) if hasattr(self, k)])
+        slots['_token'] = None
+        return getattr(self, '__dict__', None), slots
+
     @property
     def token(self):
-        if self.tid:
-            return Token(tid=self.tid, tcl=_tk2type[self.tid], lex=self.lexeme, loc=self.location)
-        else:
-            return Token.NONE(self.location)
+        # the view is rebuilt when the node's fields were reassigned or the view was written to, so writes through
+        # node.token are discarded as they were when every read built a new Token
+        tk = self._token
+        if tk is None or tk.location is not self.location or tk.value is not None or tk.is_reserved or \
+                tk.id is not (self.tid or TK.NONE) or tk.lexeme is not (self.lexeme if self.tid else ''):
+            if self.tid:
+                tk = Token(tid=self.tid, tcl=_tk2type[self.tid], lex=self.lexeme, loc=self.location)
+            else:
+                tk = Token.NONE(self.location)
+            self._token = tk
+        return tk
 
     @property
     def value(self):
@@ -71,6 +87,8 @@ class AST:
 # a compound node containing a sequence of 'items'
 @dataclass
 class ASTCompound(AST):
+    __slots__ = ('_items',)
+
     def __init__(self, token=None, tid=None, value=None, parent=None, **kwargs):
         super().__init__(token=token, tid=tid, value=value, parent=parent, **kwargs)
         self._items = []
@@ -124,6 +142,8 @@ class ASTCompound(AST):
 
 @dataclass
 class Expression(ASTCompound):
+    __slots__ = ('is_lvalue',)
+
     def __init__(self, token=None, tid=None, value=None, parent=None, is_lvalue=True, **kwargs):
         super().__init__(token=token, tid=tid, value=value, parent=parent, **kwargs)
         self.is_lvalue = is_lvalue
@@ -131,6 +151,8 @@ class Expression(ASTCompound):
 
 @dataclass
 class Statement(ASTCompound):
+    __slots__ = ('is_lvalue',)
+
     def __init__(self, token=None, value=None, parent=None, is_lvalue=True, **kwargs):
         super().__init__(token=token, value=value, parent=parent, **kwargs)
         self.is_lvalue = is_lvalue
@@ -141,6 +163,8 @@ class Statement(ASTCompound):
 # -----------------------------------
 @dataclass
 class Assign(Expression):
+    __slots__ = ('left', 'right', 'op')
+
     def __init__(self, left=None, op=None, right=None, is_lvalue=None):
         super().__init__(token=op, tid=TK.ASSIGN, is_lvalue=False if is_lvalue is None else is_lvalue)
         self.left = left
@@ -165,6 +189,8 @@ class Assign(Expression):
 
 @dataclass
 class BinOp(Expression):
+    __slots__ = ('left', 'right', 'op')
+
     def __init__(self, left=None, op=None, right=None, is_lvalue=None):
         super().__init__(token=op, is_lvalue=True if is_lvalue is None else is_lvalue)
         self.left = left
@@ -202,6 +228,7 @@ class Define(Assign):
     Base of the Definition Nodes.  In its simplest form, it Defines a symbol (variable).
     The symbol need not be defined when called.
     """
+    __slots__ = ()
 
     def __init__(self, left=None, op=None, right=None, is_lvalue=None):
         """
@@ -243,10 +270,13 @@ class Define(Assign):
 
 # holds a reference
 class Ref(Expression):
+    __slots__ = ('name', 'address')
+
     def __init__(self, token, name=None, is_lvalue=True):
         super().__init__(token=token, is_lvalue=is_lvalue)
         self.from_token(token)
         self.name = name or token.lexeme
+        self.address = None     # set by the Resolver
         if token.is_reserved:
             self.is_lvalue = False
 
@@ -261,6 +291,8 @@ class Ref(Expression):
 
 @dataclass
 class TernaryOp(BinOp):
+    __slots__ = ('middle',)
+
     def __init__(self, op=None, left=None, mid=None, right=None, is_lvalue=True):
         assert op is not None, "Invalid operation passed to TernaryOp constructor"
         super().__init__(left=left, op=op, right=right, is_lvalue=is_lvalue)
@@ -269,6 +301,8 @@ class TernaryOp(BinOp):
 
 @dataclass
 class UnaryOp(Expression):
+    __slots__ = ('op', 'expr')
+
     def __init__(self, token, expr, is_lvalue=True):
         super().__init__(token=token, is_lvalue=is_lvalue)
         token.t_class = TCL.UNARY
@@ -290,6 +324,8 @@ class Apply(Define):
     equivalent to b = a, except: b does not need to exist beforehand, b can be a function,
     and operation proceeds left to right, not right to left.
     """
+    __slots__ = ()
+
     def __init__(self, left, op=None, right=None, loc=None, is_lvalue=False):
         op = Token(tid=TK.APPLY, tcl=TCL.BINOP, lex=">>", loc=loc) if op is None else op
         super().__init__(left=left, op=op, right=right, is_lvalue=is_lvalue)
@@ -310,6 +346,8 @@ class Apply(Define):
 
 @dataclass
 class ApplyChainProd(Apply):
+    __slots__ = ()
+
     def __init__(self, left, tid=None, lex=None, loc=None, is_lvalue=False):
         op = Token.APPLY(lex=lex or ">>", loc=loc)
         op.id = tid or TK.APPLY
@@ -331,6 +369,8 @@ class ApplyChainProd(Apply):
 
 @dataclass
 class Combine(Define):
+    __slots__ = ()
+
     def __init__(self, left=None, op=None, right=None, loc=None):
         super().__init__(left=left, op=op, right=right, is_lvalue=True)
         self.op = TK.COMBINE
@@ -340,6 +380,8 @@ class Combine(Define):
 
 @dataclass
 class DefineFn(Define):  # left = FnRef, op=TK, plist, right = Block
+    __slots__ = ('args',)
+
     def __init__(self, left=None, op=None, right=None, args=None):
         """
         Creates a Function Definition tree node.
@@ -377,6 +419,8 @@ class DefineFn(Define):  # left = FnRef, op=TK, plist, right = Block
 # value takes on defined range during iteration
 @dataclass
 class DefineVar(Define):
+    __slots__ = ()
+
     def __init__(self, left=None, op=None, right=None, is_lvalue=None):
         super().__init__(left=left, op=op, right=right, is_lvalue=False if is_lvalue is None else is_lvalue)
 
@@ -397,6 +441,8 @@ class DefineVar(Define):
 # value is immutable
 @dataclass
 class DefineVal(DefineVar):
+    __slots__ = ()
+
     def __init__(self, left=None, op=None, right=None, is_lvalue=None):
         super().__init__(left=left, op=op, right=right, is_lvalue=False if is_lvalue is None else is_lvalue)
 
@@ -417,6 +463,8 @@ class DefineVal(DefineVar):
 # value takes on defined range during iteration, and is evaluated each time
 @dataclass
 class DefineVarFn(DefineVar):
+    __slots__ = ('args',)
+
     def __init__(self, left=None, op=None, right=None, args=None):
         super().__init__(left=left, op=op, right=right, is_lvalue=False)
         self.args = args
@@ -442,6 +490,8 @@ class DefineVarFn(DefineVar):
 
 # dereferences to value
 class Get(Ref):
+    __slots__ = ()
+
     def __init__(self, token, name=None, is_lvalue=True):
         super().__init__(token=token, name=name, is_lvalue=is_lvalue)
 
@@ -465,6 +515,8 @@ class Get(Ref):
 
 @dataclass
 class FnRef(BinOp):
+    __slots__ = ('ref', 'name', 'paramters', 'count')
+
     def __init__(self, ref=None, parameters=None, op=None, is_lvalue=True):
         assert ref is not None, "Ref not passed to FnRef constructor"
         op = Token.FUNCTION(name=ref.name or "", loc=ref.location) if op is None else op
@@ -480,6 +532,8 @@ class FnRef(BinOp):
 
 @dataclass
 class FnCall(FnRef):
+    __slots__ = ()
+
     def __init__(self, ref=None, parameters=None, op=None, is_lvalue=True):
         assert ref is not None, "no Ref passed to FnCall constructor"
         op = Token.FNCALL(name=ref.name, loc=ref.location) if op is None else op
@@ -496,6 +550,8 @@ class Generate(Expression):
     4) Series
     5) DataFrames
     """
+    __slots__ = ('target',)
+
     def __init__(self, target=None, items=None, loc=None, is_lvalue=True):
         """
         :param name: Expression that evaluates to 'name'
@@ -524,14 +580,18 @@ class Generate(Expression):
 
 
 class GenerateRange(Generate):
+    __slots__ = ()
+
     def __init__(self, start=None, end=None, step=None, loc=None, is_lvalue=True):
         super().__init__(target=TK.RANGE, items=[start, end, step], loc=loc, is_lvalue=is_lvalue)
 
 
 @dataclass
 class IfThenElse(TernaryOp):
+    __slots__ = ()
+
     def __init__(self, test=None, then=None, els=None, is_lvalue=False):
-        op = Token.IF(loc=test.token.lexeme)
+        op = Token.IF(loc=test.token.location)
         super().__init__(op=op, left=test, right=then, mid=els, is_lvalue=is_lvalue)
 
     @property
@@ -549,6 +609,8 @@ class IfThenElse(TernaryOp):
 
 @dataclass
 class Index(FnCall):
+    __slots__ = ()
+
     def __init__(self, ref=None, parameters=None, is_lvalue=True):
         assert ref is not None, "no Ref passed to Index constructor"
         super().__init__(ref=ref, parameters=parameters, op=Token.INDEX(loc=ref.location), is_lvalue=is_lvalue)
@@ -556,6 +618,8 @@ class Index(FnCall):
 
 @dataclass
 class IndexSet(TernaryOp):
+    __slots__ = ('member', 'index')
+
     def __init__(self, ref=None, member=None, index=None, value=None, is_lvalue=True):
         assert ref is not None, "no Ref passed to PropRef constructor"
         op = Token.PUT(loc=ref.location)
@@ -567,6 +631,8 @@ class IndexSet(TernaryOp):
 
 @dataclass
 class Slice(TernaryOp):
+    __slots__ = ('start', 'end', 'step')
+
     def __init__(self, start=None, end=None, step=None, loc=None, is_lvalue=True):
         slice = Token.SLICE()
         super().__init__(op=slice, left=start, right=end, mid=step, is_lvalue=is_lvalue)
@@ -594,8 +660,21 @@ class Slice(TernaryOp):
         return f'Slice({lval} : {rval} :: {sval})'
 
 
+@dataclass
+class Memo(UnaryOp):
+    """
+    A function definition whose function caches its results (memo f(x) := ...)
+    """
+    __slots__ = ()
+
+    def __init__(self, token, expr):
+        super().__init__(token, expr)
+
+
 @dataclass
 class PropCall(FnRef):
+    __slots__ = ('member',)
+
     def __init__(self, ref=None, member=None, parameters=None, op=None, is_lvalue=True):
         assert ref is not None, "no Ref passed to FnCall constructor"
         op = Token.PROPCALL(name=ref.name, loc=ref.location) if op is None else op
@@ -605,6 +684,8 @@ class PropCall(FnRef):
 
 @dataclass
 class PropRef(BinOp):
+    __slots__ = ()
+
     def __init__(self, ref=None, member=None, op=None, is_lvalue=True):
         assert ref is not None, "no Ref passed to PropRef constructor"
         op = Token.REF(loc=ref.location) if op is None else op
@@ -613,6 +694,8 @@ class PropRef(BinOp):
 
 @dataclass
 class PropSet(TernaryOp):
+    __slots__ = ('member',)
+
     def __init__(self, ref=None, member=None, value=None, is_lvalue=True):
         assert ref is not None, "no Ref passed to PropRef constructor"
         op = Token.PUT(loc=ref.location)
@@ -626,10 +709,36 @@ class Return(UnaryOp):
     """
     Simply a Unary holder of an expression.
     """
+    __slots__ = ()
+
     def __init__(self, token, expr):
         super().__init__(token, expr)
 
 
+def node_attributes(node):
+    """
+    returns the (name, value) pairs set on node, from its slots and __dict__
+    """
+    items = [(k, getattr(node, k)) for k in _slot_names(type(node)) if hasattr(node, k)]
+    if hasattr(node, '__dict__'):
+        items.extend(vars(node).items())
+    return items
+
+
+_class_slots = {}    # class -> slot names of the class and its bases
+
+
+def _slot_names(cls):
+    names = _class_slots.get(cls)
+    if names is None:
+        names = []
+        for c in cls.__mro__:
+            slots = c.__dict__.get('__slots__', ())
+            names.extend([slots] if isinstance(slots, str) else slots)
+        names = _class_slots[cls] = [k for k in names if k not in ['__dict__', '__weakref__']]
+    return names
+
+
 def _tk_name(token):
     _tn = 'None'
     if token is not None:
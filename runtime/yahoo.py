@@ -2,8 +2,14 @@
 import io
 import math
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pandas as pd
 import requests as requests
+from requests.adapters import HTTPAdapter
 
 from runtime.conversion import c_unbox
 from runtime.factory import to_lit
@@ -29,6 +35,9 @@ yahoo_span = 'period1={}&period2={}&interval={}&events=history'
 columns = ['Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
 
 DEFAULT_SPAN_YRS = '5y'
+DEFAULT_WORKERS = 8     # quotes fetched at once
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5   # seconds before the first retry, doubled for each one after
 WEEKLY = '1wk'
 DAILY = '1d'
 
@@ -45,6 +54,9 @@ _map2freq = {
     'weekly': WEEKLY,
 }
 
+_panel = None       # quotes yahoo() returns instead of loading them, see use_panel
+_loaded = None      # the quotes yahoo() returned last, see loaded_panel
+
 
 def init_yahoo(name):
     return {'symbols': None,
@@ -53,7 +65,12 @@ def init_yahoo(name):
             'span': Duration(DEFAULT_SPAN_YRS),
             'frequency': DAILY,
             'dropna': True,
-            'offline': False
+            'offline': False,
+            'workers': DEFAULT_WORKERS,
+            'rate': None,       # requests started per second, None: no limit
+            'retries': DEFAULT_RETRIES,
+            'backoff': DEFAULT_BACKOFF,
+            'progress': True,   # report the symbols fetched on stderr
             }
 
 
@@ -64,16 +81,26 @@ def do_yahoo(args):
     :param args:
     :return: Block containing {Open, High, Low, Close, Mean, and Volume}
     """
-    symbols = c_unbox(args.symbols)
-    if isinstance(symbols, str):
-        symbols = read_symbol_list(symbols)
-    ds = get_yahoo(symbols=symbols,
-                   first=c_unbox(args.first),
-                   last=c_unbox(args.last),
-                   span=c_unbox(args.span),
-                   frequency=_map2freq[args.frequency],
-                   dropna=args.dropna,
-                   offline=args.offline)
+    global _loaded
+    if _panel is not None:
+        ds = dict(_panel)
+    else:
+        symbols = c_unbox(args.symbols)
+        if isinstance(symbols, str):
+            symbols = read_symbol_list(symbols)
+        ds = get_yahoo(symbols=symbols,
+                       first=c_unbox(args.first),
+                       last=c_unbox(args.last),
+                       span=c_unbox(args.span),
+                       frequency=_map2freq[args.frequency],
+                       dropna=args.dropna,
+                       offline=args.offline,
+                       workers=c_unbox(args.workers),
+                       rate=c_unbox(args.rate),
+                       retries=c_unbox(args.retries),
+                       backoff=c_unbox(args.backoff),
+                       progress=_print_progress if c_unbox(args.progress) else None)
+    _loaded = dict(ds)
 
     for key in ds.keys():
         val = ds[key]
@@ -88,15 +115,41 @@ def do_yahoo(args):
     return o
 
 
-def get_yahoo(symbols, first, last, span, frequency, dropna, offline):
+def use_panel(panel):
+    """
+    yahoo() returns panel (as get_yahoo does) instead of loading quotes until use_panel(None): a shard of the symbols
+    in a worker (see interpreter/shards.py), quotes loaded ahead
+    """
+    global _panel
+    _panel = panel
+
+
+def loaded_panel():
+    """
+    returns the quotes yahoo() returned last, as get_yahoo did, None if it wasn't called
+    """
+    return _loaded
+
+
+def forget_panel():
+    """
+    forgets the quotes yahoo() returned last: loaded_panel() returns None until it is called again
+    """
+    global _loaded
+    _loaded = None
+
+
+def get_yahoo(symbols, first, last, span, frequency, dropna, offline, workers=DEFAULT_WORKERS, rate=None,
+              retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, progress=None):
     result = dict()
     start = dict()
     end = dict()
     _last = math.floor(last.timestamp())
     _first = math.floor((last + span).timestamp())
     historic = dict({str: pd.DataFrame})
-    for sym, row in symbols.iterrows():
-        hist = fetch_quotes(sym, _first, _last, frequency, offline)
+    with QuoteFetcher(workers=workers, rate=rate, retries=retries, backoff=backoff, progress=progress) as fetcher:
+        fetched = fetcher.fetch_all(list(symbols.index), _first, _last, frequency, offline)
+    for sym, hist in fetched.items():
         if hist is not None and not hist.empty:
             historic[sym] = hist.copy(deep=True)
             start[sym] = hist.index[0]
@@ -131,20 +184,25 @@ def get_yahoo(symbols, first, last, span, frequency, dropna, offline):
     return result
 
 
-def fetch_quotes(symbol, start, end, freq, offline=False):
+def fetch_quotes(symbol, start, end, freq, offline=False, fetcher=None):
     quotes = pd.DataFrame()
     if offline:
         quotes = read_quotefile(symbol, freq)
     else:
-        quotes = _fetch_quotes(symbol, start, end, freq)
+        quotes = _fetch_quotes(symbol, start, end, freq, fetcher)
     return quotes
 
 
-def _fetch_quotes(symbol, start, end, interval):
+def _fetch_quotes(symbol, start, end, interval, fetcher=None):
+    if fetcher is None:
+        with QuoteFetcher(workers=1) as fetcher:
+            return _fetch_quotes(symbol, start, end, interval, fetcher)
     quotes = None
     quote_url = format_yahoo_url(symbol, start, end, interval)
-    headers = {'User-Agent': 'Mozilla/5.0'}  # yahoo is restricting to known user agents as of 06/2021
-    with requests.get(quote_url, headers=headers) as response:
+    response = fetcher.get(quote_url)
+    if response is None:
+        return None
+    with response:
         if response.status_code == 200:
             quotes = pd.read_csv(io.StringIO(response.text), index_col='Date')
         else:
@@ -152,6 +210,117 @@ def _fetch_quotes(symbol, start, end, interval):
     return quotes
 
 
+class QuoteFetcher:
+    """
+    Fetches the quotes of many symbols at once, on a pool of threads sharing one HTTP session (connections are kept
+    alive and reused).  Requests are started no faster than rate per second, and retried with exponential backoff
+    on connection errors, 429 (too many requests) and 5xx responses.  progress(done, total), if given, is called as
+    each symbol is fetched.  A session the fetcher makes is closed by close(), or on leaving a with block.
+    """
+    def __init__(self, workers=DEFAULT_WORKERS, rate=None, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                 progress=None, session=None):
+        self.workers = max(1, int(workers)) if workers is not None else DEFAULT_WORKERS
+        self.interval = 1.0 / rate if rate else 0.0
+        self.retries = retries
+        self.backoff = backoff
+        self.progress = progress
+        self.owned = session is None    # the session is made here, and closed by close()
+        self.session = session if session is not None else _create_session(self.workers)
+        self.lock = threading.Lock()
+        self.next = 0.0             # time.monotonic() the next request may start at
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self.owned:
+            self.session.close()
+
+    def fetch_all(self, symbols, start, end, freq, offline=False):
+        """
+        returns {symbol: quotes} in the order of symbols, None for the symbols whose quotes couldn't be fetched
+        """
+        quotes = {sym: None for sym in symbols}
+        if not quotes:
+            return quotes
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(quotes))) as pool:
+            futures = {pool.submit(fetch_quotes, sym, start, end, freq, offline, self): sym for sym in quotes.keys()}
+            for done, future in enumerate(as_completed(futures), 1):
+                quotes[futures[future]] = future.result()
+                if self.progress is not None:
+                    self.progress(done, len(quotes))
+        return quotes
+
+    def get(self, url):
+        """
+        returns the response to a GET of url, the last one if retries ran out.  None if no response came
+        """
+        response = None
+        for attempt in range(self.retries + 1):
+            self._wait()
+            delay = self.backoff * 2 ** attempt
+            try:
+                response = self.session.get(url, headers=_headers)
+            except requests.RequestException as e:
+                if attempt == self.retries:
+                    print(f'{url}: {e}\n')
+                    return None
+                time.sleep(delay)
+                continue
+            if (response.status_code != 429 and response.status_code < 500) or attempt == self.retries:
+                return response
+            delay = max(delay, _retry_after(response))
+            response.close()
+            time.sleep(delay)
+        return response
+
+    def _wait(self):
+        """
+        waits for the time the next request may start at, when a rate is given
+        """
+        if self.interval <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next)
+            self.next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+_headers = {'User-Agent': 'Mozilla/5.0'}  # yahoo is restricting to known user agents as of 06/2021
+
+
+def _create_session(workers):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _print_progress(done, total):
+    """
+    prints the count of the symbols fetched to stderr: in place on a terminal, else at each tenth of them
+    """
+    if sys.stderr.isatty():
+        sys.stderr.write(f'\rquotes: {done}/{total}' + ('\n' if done == total else ''))
+    elif done == total or done % max(total // 10, 1) == 0:
+        sys.stderr.write(f'quotes: {done}/{total}\n')
+    sys.stderr.flush()
+
+
+def _retry_after(response):
+    """
+    returns the seconds a Retry-After header asks to wait, 0 if there's none (or it's a date)
+    """
+    value = response.headers.get('Retry-After', '')
+    return float(value) if value.isdigit() else 0
+
+
 def zip_historic(quotes, column1, column2=None):
     h = pd.DataFrame(columns=['Date'])
     h.set_index('Date', inplace=True)
@@ -0,0 +1,13 @@
+# flows over a file read in chunks of rows, computed chunk by chunk: the same values as over the file read whole
+quotes = read('test/cases/chunks.csv', format='csv')
+chunks = read('test/cases/chunks.csv', format='csv', chunksize=5)
+chunks | cumsum | print
+quotes | cumsum | print
+chunks | delta | signal | clipbefore(_, 1, 0, 1, 0) | print
+quotes | delta | signal | clipbefore(_, 1, 0, 1, 0) | print
+chunks | sma(_, 3) | print
+
+# the chunks are read from the file again each time they are used
+chunks | delta(_, 2) | print
+quotes | delta(_, 2) | print
+chunks | count | print
@@ -0,0 +1,16 @@
+# pure expressions found in more than one statement are evaluated once for the values they read
+close = {'a': 0..6, 'b': 6..12}
+close | sma(_, 3)
+close | sma(_, 3)
+sma(close, 3) + close
+sma(close, 3) + close
+close > sma(close, 3) + close
+
+# close bound to another DataFrame
+close = {'a': 12..18, 'b': 18..24}
+sma(close, 3) + close
+close | sma(_, 3)
+
+# close written to in place
+close['a'] = 24..30
+sma(close, 3) + close
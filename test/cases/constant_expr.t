@@ -26,4 +26,9 @@
 365d / 12
 365d div 12
 365d div 12d
-365d / 12d
\ No newline at end of file
+365d / 12d
+1d * 5
+10% * 2 + 1
+if 1 < 2 then 3 else 4
+if 2 < 1 then 3 else 4
+if 1d > 1h then 1d * 2 else 1h
\ No newline at end of file
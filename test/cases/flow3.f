@@ -0,0 +1,11 @@
+# stages with kernels (delta, signal, clipbefore, ...) run as one pass over a DataFrame's values
+close = {'a': [1.0, 3.0, 2.0, 5.0, 4.0, 6.0, 1.0], 'b': [2.0, 1.0, 0.5, 3.0, 3.5, 2.0, 4.0]}
+close | delta | signal | clipbefore(_, 1, 0, 1, 0)
+close | delta(_, 2) | signal
+close | shift(_, -1) | delta | cumsum
+close | clip(_, 1.5, 3) | cumsum | delay(_, 1d)
+
+# integers: delta and signal return floats, clip keeps integers and is run by pandas
+close = {'a': 0..7, 'b': 7..14}
+close | delta | cumsum
+close | clip(_, 3, 9)
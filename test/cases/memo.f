@@ -0,0 +1,20 @@
+memo fib(n) := {
+    if n < 2 then
+        return n
+    else
+        return fib(n - 1) + fib(n - 2)
+}
+
+memo scale(x, factor=2) := {
+    x * factor
+}
+
+memo var double(x) := x * 2
+
+print(fib(50))
+print(fib(50))
+print(scale(3))
+print(scale(3, factor=3))
+print(scale(3))
+print(double(4))
+print(double(4.0))
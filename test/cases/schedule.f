@@ -0,0 +1,13 @@
+# independent trees run at once with workers > 1 (interpreter/schedule.py): the output and values are those of the
+# trees run in order
+quotes = read('test/cases/schedule.csv', format='csv')
+quotes | sma(_, 3) | fast
+quotes | sma(_, 5) | slow
+quotes | delta | signal | entries
+quotes | shift(_, 1) | delta(_, 2) | cumsum | drift
+print('indicators')
+fast - slow | signal | cross
+print(fast)
+print(entries)
+print(drift)
+print(cross)
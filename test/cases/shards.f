@@ -0,0 +1,11 @@
+# a strategy run on shards of the panel's symbols with shards > 1 (interpreter/shards.py): the output and names it
+# leaves are those of the run in one process.  the panel stands in for yahoo(), see test_setup.test_panels
+print('loading')
+period = 5
+quotes = yahoo(symbols='portfolio.csv', span=-5y)
+(open, close, high, low, atr, volume, first, last) = quotes
+close | sma(_, period) | fast
+close | sma(_, 10) | slow
+fast - slow | signal | clipbefore(_, 1, 0, 1, 0) | signals
+signals | mul(_, -atr) | trades
+trades | cumsum | results
@@ -1,7 +1,7 @@
 import os
 import traceback
 from abc import abstractmethod, ABC
-from multiprocessing import SimpleQueue
+from collections import deque
 
 from runtime.environment import Environment
 from interpreter.treeprint import print_forest, print_node
@@ -180,10 +180,9 @@ def _dump_tokens(env):
 def _dump_symbols(logger, scope, print_keywords=False):
     logger.print("\n\nsymbols: ")
     idx = 0
-    q = SimpleQueue()
-    q.put(scope)
-    while not q.empty():
-        s = q.get()
+    q = deque([scope])
+    while q:
+        s = q.popleft()
         if s._members is None or len(s._members) == 0:
             continue
         if hasattr(s, 'token'):
@@ -193,7 +192,7 @@ def _dump_symbols(logger, scope, print_keywords=False):
         for k in s._members.keys():
             v = s._members[k]
             if type(v).__name__ == 'Object':
-                q.put(v)
+                q.append(v)
                 logger.print(f'{idx:5d}:  `{k}`: {v.qualname} : Object({v.token})')
                 idx += 1
 
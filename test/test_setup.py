@@ -8,6 +8,8 @@ test_data = {
     'blocks': 'blocks.t',
     'boolean': 'boolean.t',
     'boolean_var': 'boolean_var.t',
+    'chunks': 'chunks.f',
+    'common': 'common.f',
     'constant_expr': 'constant_expr.t',
     'datasets': 'datasets.f',
     'declaration': 'declaration.t',
@@ -20,6 +22,7 @@ test_data = {
     'factorial': 'factorial.f',
     'flow': 'flow.p',
     'flow2': 'flow2.f',
+    'flow3': 'flow3.f',
     'functions_decl': 'functions_decl.f',
     'functions_invoke': 'functions_invoke.t',
     'grouping': 'grouping.t',
@@ -31,17 +34,20 @@ test_data = {
     'language_expr': 'language_expr.t',
     'lifting': 'lifting.t',
     'lists': 'lists.t',
+    'memo': 'memo.f',
     'none': 'none.t',
     'parameters': 'parameters.t',
     'prime': 'prime.t',
     'properties': 'properties.t',
     'ranges': 'ranges.t',
+    'schedule': 'schedule.f',
     'sequences': 'sequences.t',
     'series': 'series.t',
     'set_operations': 'set_operations.t',
     'set_parameters': 'set_parameters.t',
     'set_unary': 'set_unary.t',
     'sets': 'sets.t',
+    'shards': 'shards.f',
     'simple': 'simple.p',
     'simple2': 'simple2.p',
     'simpler': 'simpler.p',
@@ -56,3 +62,16 @@ test_data = {
     'var': 'var.t',
     # 'yahoo2': 'yahoo2.f',
 }
+
+# focal options a test is run with, after it is run without them: its output and values must be the same both ways,
+# and it must not warn with them
+test_options = {
+    'schedule': {'workers': 4},
+    'shards': {'shards': 4},
+}
+
+# quotes yahoo() returns in a test instead of loading them (runtime/yahoo.py use_panel): closing prices, by test/cases
+# file
+test_panels = {
+    'shards': 'shards.csv',
+}
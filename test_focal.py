@@ -1,15 +1,23 @@
 #!/Volumes/HD2/Lab/Repository/jimc/python3.9/bin/python3
 # test semantic analysis
+import contextlib
+import io
 import sys
+import warnings
 from abc import ABC
 
+import pandas as pd
+
 from interpreter.console import FocalConsole
 from interpreter.fixups import Fixups
 from interpreter.interpreter import Interpreter
 from parser.parser import Parser
+from runtime.conversion import c_unbox
 from runtime.exceptions import getLogFacility
+from runtime.options import getOptions
+from runtime.yahoo import use_panel
 from test.suite_runner import TestSuiteRunner, _dump_environment
-from test.test_setup import test_data
+from test.test_setup import test_data, test_options, test_panels
 
 _test_suite = True       # False is useful for debugging, interactive.  True for test suites
 _skip_tests = [
@@ -73,9 +81,26 @@ class SemanticAnalysisTestRunner(TestSuiteRunner, ABC):
         self.test = True
 
     def run_unprotected_test(self, environment, name, test_source):
-        console = FocalConsole()
-        focal = console.focal
-        console.run_script(test_source)
+        options = test_options.get(name)
+        panel = test_panels.get(name)
+        use_panel(_quote_panel(panel) if panel is not None else None)
+        try:
+            if options is not None:
+                expected = _run_quietly(test_source)
+                with _options_set(options), warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter('always')
+                    focal, output = _run_quietly(test_source)
+                sys.stdout.write(output)
+                if output != expected[1] or _values(focal) != _values(expected[0]):
+                    raise AssertionError(f'{name} run with {options} differs from its run without them')
+                if caught:
+                    raise AssertionError(f'{name} run with {options} warns: {caught[0].message}')
+            else:
+                console = FocalConsole()
+                focal = console.focal
+                console.run_script(test_source)
+        finally:
+            use_panel(None)
         _dump_environment(focal.environment,
                           label='post',
                           print_tokens=False,
@@ -85,6 +110,51 @@ class SemanticAnalysisTestRunner(TestSuiteRunner, ABC):
                           print_keywords=False)
 
 
+def _run_quietly(test_source):
+    """
+    runs a test script, returns its Focal and what it printed
+    """
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        console = FocalConsole()
+        console.run_script(test_source)
+    return console.focal, out.getvalue()
+
+
+@contextlib.contextmanager
+def _options_set(options):
+    option = getOptions('focal')
+    saved = {k: option[k] for k in options if k in option}
+    for k, v in options.items():
+        option[k] = v
+    try:
+        yield
+    finally:
+        for k in options:
+            if k in saved:
+                option[k] = saved[k]
+            else:
+                del option[k]
+
+
+def _quote_panel(fname):
+    """
+    returns quotes as get_yahoo does, made up from the closing prices in test/cases/fname
+    """
+    close = pd.read_csv(f'./test/cases/{fname}', index_col='Date', parse_dates=True)
+    return {'open': close.shift(1).bfill(), 'close': close, 'high': close + 1, 'low': close - 1,
+            'atr': close.diff().abs().bfill(), 'volume': (close * 100).astype('int64'),
+            'first': {c: close.index[0] for c in close.columns}, 'last': {c: close.index[-1] for c in close.columns}}
+
+
+def _values(focal):
+    """
+    returns {name: value as printed} of the names in the global scope
+    """
+    members = focal.environment.globals.members()
+    return {k: str(c_unbox(members[k])) for k in members.keys()}
+
+
 # this is only for execution under debugger or via command-line
 if __name__ == '__main__':
     args = sys.argv[1:]
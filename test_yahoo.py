@@ -0,0 +1,141 @@
+#!/Volumes/HD2/Lab/Repository/jimc/python3.9/bin/python3
+# test fetching quotes (runtime/yahoo.py QuoteFetcher) from a local stub of the yahoo download server
+#   python test_yahoo.py
+import contextlib
+import io
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+import runtime.yahoo as yahoo
+from runtime.yahoo import QuoteFetcher
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    answers /download/<symbol>?... with quotes whose Close is the symbol's number (s3: 3).  a symbol in replies is
+    answered (status, Retry-After) for each of its first requests, in turn; delays[symbol] is the seconds it takes
+    to answer
+    """
+    replies = {}
+    delays = {}
+    requests = {}       # symbol -> [time.monotonic() of each request]
+    lock = threading.Lock()
+
+    def do_GET(self):
+        symbol = self.path.split('?')[0].rsplit('/', 1)[-1]
+        with self.lock:
+            times = self.requests.setdefault(symbol, [])
+            times.append(time.monotonic())
+            replies = self.replies.get(symbol, [])
+            reply = replies[len(times) - 1] if len(times) <= len(replies) else None
+        time.sleep(self.delays.get(symbol, 0))
+        if reply is not None:
+            status, retry_after = reply
+            self.send_response(status)
+            if retry_after is not None:
+                self.send_header('Retry-After', retry_after)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        n = int(symbol[1:])
+        body = f'Date,Open,High,Low,Close,Adj Close,Volume\n2000-01-03,{n},{n},{n},{n},{n},100\n'.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class QuoteFetcherTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = yahoo.yahoo_base
+        yahoo.yahoo_base = f'http://127.0.0.1:{cls.server.server_address[1]}/download'
+
+    @classmethod
+    def tearDownClass(cls):
+        yahoo.yahoo_base = cls.base
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubHandler.replies = {}
+        StubHandler.delays = {}
+        StubHandler.requests = {}
+
+    def fetch(self, symbols, workers=4, retries=3, backoff=0.01):
+        with QuoteFetcher(workers=workers, retries=retries, backoff=backoff) as fetcher:
+            return fetcher.fetch_all(symbols, 0, 1, yahoo.DAILY)
+
+    def test_symbol_order(self):
+        symbols = [f's{n}' for n in range(8)]
+        StubHandler.delays = {s: 0.04 * (8 - n) for n, s in enumerate(symbols)}    # the first answered last
+        quotes = self.fetch(symbols, workers=8)
+        self.assertEqual(list(quotes.keys()), symbols)
+        for n, s in enumerate(symbols):
+            self.assertEqual(quotes[s]['Close'].iloc[0], n)
+
+    def test_retry_unavailable(self):
+        StubHandler.replies = {'s1': [(503, None), (503, None)]}
+        quotes = self.fetch(['s0', 's1', 's2'], backoff=0.05)
+        self.assertEqual(quotes['s1']['Close'].iloc[0], 1)
+        times = StubHandler.requests['s1']
+        self.assertEqual(len(times), 3)
+        self.assertGreaterEqual(times[1] - times[0], 0.05)      # backoff, doubled for each retry
+        self.assertGreaterEqual(times[2] - times[1], 0.1)
+        self.assertEqual(len(StubHandler.requests['s0']), 1)
+
+    def test_retry_after(self):
+        StubHandler.replies = {'s0': [(429, '1')]}
+        quotes = self.fetch(['s0'])
+        self.assertEqual(quotes['s0']['Close'].iloc[0], 0)
+        times = StubHandler.requests['s0']
+        self.assertEqual(len(times), 2)
+        self.assertGreaterEqual(times[1] - times[0], 1.0)       # not the backoff of 0.01s
+
+    def test_retries_run_out(self):
+        StubHandler.replies = {'s0': [(503, '0')] * 3}
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            quotes = self.fetch(['s0', 's1'], retries=2)
+        self.assertIsNone(quotes['s0'])
+        self.assertEqual(quotes['s1']['Close'].iloc[0], 1)
+        self.assertEqual(len(StubHandler.requests['s0']), 3)
+        self.assertIn('response = 503', out.getvalue())
+
+    def test_no_progress(self):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            self.fetch(['s0', 's1'])
+        self.assertEqual(out.getvalue(), '')
+
+    def test_get_yahoo(self):
+        StubHandler.replies = {'s1': [(503, None)]}
+        reported = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            quotes = yahoo.get_yahoo(pd.DataFrame(index=['s0', 's1']), None, pd.Timestamp('2001-01-01'),
+                                     pd.Timedelta(days=-365), yahoo.DAILY, True, False, workers=2, retries=0,
+                                     backoff=0.01, progress=lambda done, total: reported.append((done, total)))
+        self.assertEqual(list(quotes['close'].columns), ['s0'])     # s1 isn't retried
+        self.assertEqual(len(StubHandler.requests['s1']), 1)
+        self.assertEqual(reported, [(1, 2), (2, 2)])
+
+    def test_print_progress(self):
+        with contextlib.redirect_stderr(io.StringIO()) as err, contextlib.redirect_stdout(io.StringIO()) as out:
+            for done in range(1, 21):
+                yahoo._print_progress(done, 20)
+        self.assertEqual(out.getvalue(), '')
+        self.assertEqual(err.getvalue().splitlines()[-1], 'quotes: 20/20')
+        self.assertEqual(len(err.getvalue().splitlines()), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
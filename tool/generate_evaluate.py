@@ -125,6 +125,9 @@ class GenerateEvalDispatch:
         self.o.define_dict(name='_type2native', style=TY.DICT, data=_type2native)
         self.o.blank_line()
         self.o.define_dict(name='_type2idx', style=TY.DICT, data=cross(_type2native, enum(_COLUMNS, lower=True)))
+        self.o.blank_line()
+        self.o.print(f'_{name}_dispatch_cache = {{}}     # (op, type(l_value), type(r_value)) -> operator function, '
+                     f'see {name}_dispatch_fn')
         self.o.banner("MANUAL CHANGES")
         if insert_fixup_dispatch:
             self.o.print("def is_supported_binop(op):\n"
@@ -150,21 +153,42 @@ class GenerateEvalDispatch:
         self.o.define_fn(f'eval_{name}_dispatch', 'node, left, right')
         self.o.l_print(0, "    l_value = left\n")
         if self.is_assign_style:
-            self.o.l_print(0, "    l_ty = _type2native[type(l_value).__name__]\n")
-            self.o.l_print(0, "    if l_ty != 'Object':    # for assignment, left is a ref not a value")
+            self.o.l_print(0, "    l_ty = type(l_value).__name__\n")
+            self.o.l_print(0, "    if l_ty not in ['Object', 'Function', 'IntrinsicFunction']:    "
+                              "# for assignment, left is a ref not a value")
             indent = 1
         else:
             indent = 0
 
         self.o.l_print(indent, "    if hasattr(left, 'value'):\n"
                                "        l_value = left.value\n")
-        self.o.l_print(indent, "    l_ty = _type2native[type(l_value).__name__]\n")
-
         self.o.l_print(0, "    r_value = right\n")
         self.o.l_print(0, "    if hasattr(right, 'value'):\n"
                           "        r_value = right.value\n"
-                          "    r_ty = _type2native[type(r_value).__name__]\n")
-        self.o.l_print(0, f"    return eval_{name}_dispatch2(node.op, l_value, r_value, l_ty, r_ty)")
+                          "    key = (node.op, type(l_value), type(r_value))\n"
+                          f"    fn = _{name}_dispatch_cache.get(key) or {name}_dispatch_fn(*key)\n"
+                          "    if fn is not None:\n"
+                          "        return fn(l_value, r_value)")
+        self.write_dispatch_fn(name)
+
+    def write_dispatch_fn(self, name):
+        self.o.blank_line(2)
+        self.o.define_fn(f'{name}_dispatch_fn', 'tkid, l_cls, r_cls')
+        self.o.l_print(0, '    """\n'
+                          '    the operator function for tkid on values of python types l_cls and r_cls, None if a type '
+                          'has no column.\n'
+                          '    looked up in the dispatch table by type name on first use, then cached by type\n'
+                          '    """\n'
+                          "    key = (tkid, l_cls, r_cls)\n"
+                          f"    if key in _{name}_dispatch_cache:\n"
+                          f"        return _{name}_dispatch_cache[key]\n"
+                          "    l_ty = _type2native[l_cls.__name__]\n"
+                          "    r_ty = _type2native[r_cls.__name__]\n"
+                          "    fn = None\n"
+                          "    if l_ty in _type2idx and r_ty in _type2idx:\n"
+                          f"        fn = _{name}_dispatch_table[tkid][_type2idx[r_ty]][_type2idx[l_ty]]\n"
+                          f"    _{name}_dispatch_cache[key] = fn\n"
+                          "    return fn")
 
     def write_dispatch_inner(self, name):
         self.o.blank_line(2)